@@ -0,0 +1,383 @@
+"""
+Term Frequency Index for HomeWatch
+
+Persistent word-cloud index, so /api/analytics/wordcloud never re-reads and
+re-tokenizes the corpus:
+- Stemmed term counts are partitioned by source (news, survey, posts) and
+  sentiment label, stored in the term_frequencies table and mirrored in
+  memory
+- News articles and survey answers are synced by content key when their
+  files change; stored sentiment results (posts) are picked up
+  incrementally by id
+- Queries merge the requested partitions and take the top k terms; they
+  only read memory, while syncing runs at startup and in a background
+  thread (see start)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SOURCES = ('news', 'survey', 'posts')
+SENTIMENT_LABELS = ('positive', 'negative', 'neutral', 'unknown')
+
+# Survey columns holding free-text answers
+SURVEY_TEXT_COLUMNS = [
+    'What challenges have you faced (or expect to face) when trying to access affordable housing? (Select all that apply)',
+    'In your opinion, what is the biggest weakness in Malaysia\'s current affordable housing policies?',
+    'What improvements would you like to see in future housing policies?'
+]
+
+
+class TermFrequencyIndex:
+    """
+    Word frequency index partitioned by (source, sentiment label)
+    """
+
+    def __init__(self, db_manager, sentiment_analyzer, dataset_analyzer, news_path: str,
+                 posts_page_size: int = 1000):
+        """
+        Args:
+            db_manager: DatabaseManager persisting the index
+            sentiment_analyzer: SentimentAnalyzer providing the word cloud
+                engine and labels for news articles
+            dataset_analyzer: DatasetAnalyzer holding the survey DataFrame
+            news_path: Path of the news corpus JSON file
+            posts_page_size: Stored sentiment results indexed per query batch
+        """
+        self.db_manager = db_manager
+        self.sentiment_analyzer = sentiment_analyzer
+        self.dataset_analyzer = dataset_analyzer
+        self.news_path = news_path
+        self.posts_page_size = posts_page_size
+
+        self._partitions: Dict[Tuple[str, str], Counter] = {}
+        self._document_counts: Counter = Counter()
+        self._merged: Dict[Tuple, Tuple[int, Counter, int]] = {}  # query -> (version, counts, documents)
+        self._version = 0
+        self._loaded = False
+        self._news_mtime = None
+        self._survey_synced = False
+        self._lock = threading.RLock()  # in-memory partitions
+        self._sync_lock = threading.RLock()  # serializes load/refresh/rebuild
+        self._refresh_requested = threading.Event()
+        self._pending_rebuilds = set()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @property
+    def engine(self):
+        return self.sentiment_analyzer.wordcloud_engine
+
+    # ------------------------------------------------------------------
+    # Loading and syncing
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Load the persisted index into memory"""
+        with self._sync_lock:
+            partitions = {}
+            for source, label, term, count in self.db_manager.get_term_frequencies():
+                partitions.setdefault((source, label), Counter())[term] = count
+            document_counts = Counter({
+                (source, label): count
+                for source, label, count in self.db_manager.get_term_index_document_counts()
+            })
+
+            with self._lock:
+                self._partitions = partitions
+                self._document_counts = document_counts
+                self._invalidate()
+            self._loaded = True
+
+        logger.info(f"Loaded term index: {len(self._partitions)} partitions, "
+                    f"{sum(self._document_counts.values())} documents")
+
+    def refresh(self):
+        """Bring every source up to date (cheap when nothing changed)"""
+        with self._sync_lock:
+            if not self._loaded:
+                self.load()
+
+            try:
+                news_mtime = os.path.getmtime(self.news_path)
+            except OSError:
+                news_mtime = None
+            if news_mtime != self._news_mtime:
+                self._sync_source('news', self._news_documents())
+                self._news_mtime = news_mtime
+
+            if not self._survey_synced:
+                self._sync_source('survey', self._survey_documents())
+                self._survey_synced = True
+
+            self._index_new_posts()
+
+    def rebuild(self, source: Optional[str] = None):
+        """
+        Drop and re-index one source (or all of them)
+
+        Args:
+            source: Source partition to rebuild; None rebuilds everything
+        """
+        with self._sync_lock:
+            for name in ([source] if source else SOURCES):
+                self.db_manager.clear_term_index(name)
+            self.load()
+            if source in (None, 'news'):
+                self._news_mtime = None
+            if source in (None, 'survey'):
+                self._survey_synced = False
+            self.refresh()
+
+    def start(self, interval: float = 60.0):
+        """
+        Load the index and keep it fresh from a background thread
+
+        The thread syncs right away, then every interval seconds or sooner
+        when request_refresh is called.
+
+        Args:
+            interval: Seconds between refreshes
+        """
+        if self._thread is not None:
+            return
+        self.load()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, args=(interval,),
+                                        name='term-index-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._refresh_requested.set()
+
+    def request_refresh(self):
+        """Have the background thread sync now instead of at the next interval"""
+        self._refresh_requested.set()
+
+    def request_rebuild(self, source: str):
+        """
+        Have the background thread rebuild a source instead of syncing it
+
+        Used when stored documents change in place (e.g. rescored posts),
+        which an incremental sync cannot pick up.
+
+        Args:
+            source: Source partition to rebuild
+        """
+        with self._lock:
+            self._pending_rebuilds.add(source)
+        self._refresh_requested.set()
+
+    def _refresh_loop(self, interval: float):
+        while not self._stopping.is_set():
+            with self._lock:
+                rebuilds, self._pending_rebuilds = self._pending_rebuilds, set()
+            try:
+                for source in rebuilds:
+                    self.rebuild(source)
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Term index refresh failed: {str(e)}")
+            self._refresh_requested.wait(interval)
+            self._refresh_requested.clear()
+        self._thread = None
+
+    def _sync_source(self, source: str, documents: List[Tuple[str, str, str]]):
+        """
+        Index new documents of a file-backed source
+
+        Documents are identified by a content key; if any indexed document is
+        gone, the source is rebuilt because counts cannot be subtracted per
+        document.
+        """
+        indexed = self.db_manager.get_term_index_documents(source)
+        current = {doc_key for doc_key, _, _ in documents}
+
+        if set(indexed) - current:
+            logger.info(f"Documents removed from {source}; rebuilding its term index")
+            self.db_manager.clear_term_index(source)
+            self.load()
+            indexed = {}
+
+        new_documents = [
+            (doc_key, text, label() if callable(label) else label, None)
+            for doc_key, text, label in documents if doc_key not in indexed
+        ]
+        if new_documents:
+            self._add_documents(source, new_documents)
+            logger.info(f"Indexed {len(new_documents)} new {source} documents")
+
+    def _index_new_posts(self):
+        """Index stored sentiment results added since the last query"""
+        high_water = self.db_manager.get_term_index_high_water('posts')
+        _, max_id = self.db_manager.get_sentiment_id_range()
+
+        while high_water < max_id:
+            rows = self.db_manager.get_sentiment_texts(high_water, max_id, self.posts_page_size)
+            if not rows:
+                break
+
+            self._add_documents('posts', [
+                (f"posts:{row['id']}", row['text'], row['sentiment_label'], row['id'])
+                for row in rows
+            ])
+            high_water = rows[-1]['id']
+
+    def _add_documents(self, source: str, documents: List[Tuple[str, str, str, Optional[int]]]):
+        """Count terms of new documents and persist them with their counts"""
+        increments: Dict[Tuple[str, str], Counter] = {}
+        records = []
+
+        for doc_key, text, label, source_id in documents:
+            label = label if label in SENTIMENT_LABELS else 'unknown'
+            increments.setdefault((source, label), Counter()).update(self.engine.count_terms([text]))
+            records.append((doc_key, source, label, source_id))
+
+        self.db_manager.add_term_index_documents(records, [
+            (partition_source, label, term, count)
+            for (partition_source, label), counts in increments.items()
+            for term, count in counts.items()
+        ])
+
+        with self._lock:
+            # Replace rather than update counters: queries may hold the old ones
+            for partition, counts in increments.items():
+                self._partitions[partition] = self._partitions.get(partition, Counter()) + counts
+            self._document_counts.update(Counter((source, label) for _, source, label, _ in records))
+            self._invalidate()
+
+    def _invalidate(self):
+        self._version += 1
+        self._merged.clear()
+
+    # ------------------------------------------------------------------
+    # Source documents
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _content_key(source: str, text: str) -> str:
+        return f"{source}:{hashlib.sha1(text.encode('utf-8')).hexdigest()}"
+
+    def _news_documents(self) -> List[Tuple[str, str, object]]:
+        """News articles as (doc_key, text, label) with labels computed on demand"""
+        if not os.path.exists(self.news_path):
+            return []
+
+        with open(self.news_path, 'r', encoding='utf-8') as f:
+            articles = json.load(f)
+
+        documents = []
+        seen = set()
+        for article in articles:
+            text = (article.get('title', '') + ' ' + article.get('content', '')).strip()
+            if not text:
+                continue
+            doc_key = self._content_key('news', text)
+            if doc_key in seen:
+                continue
+            seen.add(doc_key)
+            # Only newly indexed articles pay for sentiment analysis
+            documents.append((doc_key, text, lambda text=text: self._label_text(text)))
+        return documents
+
+    def _label_text(self, text: str) -> str:
+        try:
+            return self.sentiment_analyzer.analyze(text, source='news', mode='cascade')['sentiment_label']
+        except Exception as e:
+            logger.warning(f"Could not label document for term index: {str(e)}")
+            return 'unknown'
+
+    def _survey_documents(self) -> List[Tuple[str, str, str]]:
+        """Survey rows as (doc_key, text, label) using the respondent's own sentiment rating"""
+        df = self.dataset_analyzer.df
+        if df is None:
+            return []
+
+        columns = [column for column in SURVEY_TEXT_COLUMNS if column in df.columns]
+        labels = df['sentiment_category'] if 'sentiment_category' in df.columns else None
+
+        documents = []
+        for position, (index, row) in enumerate(df[columns].iterrows()):
+            answers = [str(value) for value in row.tolist() if isinstance(value, str) and value != '']
+            if not answers:
+                continue
+            text = ' '.join(answers)
+            label = str(labels.loc[index]).lower() if labels is not None else 'unknown'
+            documents.append((self._content_key('survey', f"{position}\x00{text}"), text, label))
+        return documents
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def term_counts(self, sources: Iterable[str] = SOURCES,
+                    labels: Optional[Iterable[str]] = None) -> Tuple[Counter, int]:
+        """
+        Merge the raw term counts of the selected partitions
+
+        Args:
+            sources: Source partitions to include
+            labels: Sentiment labels to include (None for all)
+
+        Returns:
+            Tuple of (merged Counter, number of documents)
+        """
+        key = (tuple(sorted(set(sources))), tuple(sorted(set(labels))) if labels else None)
+
+        with self._lock:
+            cached = self._merged.get(key)
+            if cached is not None and cached[0] == self._version:
+                return cached[1], cached[2]
+
+            selected = [
+                partition for partition in self._partitions
+                if partition[0] in key[0] and (key[1] is None or partition[1] in key[1])
+            ]
+            if len(selected) == 1:
+                merged = self._partitions[selected[0]]
+            else:
+                merged = Counter()
+                for partition in selected:
+                    merged.update(self._partitions[partition])
+            documents = sum(self._document_counts[partition] for partition in selected)
+
+            self._merged[key] = (self._version, merged, documents)
+            return merged, documents
+
+    def top_terms(self, sources: Iterable[str] = SOURCES, labels: Optional[Iterable[str]] = None,
+                  limit: int = 100) -> Tuple[Dict[str, int], int]:
+        """
+        Most frequent terms across the selected partitions
+
+        Reads the in-memory index only; it is kept current by start (or by
+        calling refresh).
+
+        Args:
+            sources: Source partitions to include
+            labels: Sentiment labels to include (None for all)
+            limit: Maximum number of words
+
+        Returns:
+            Tuple of (word frequencies with housing terms boosted, number of documents)
+        """
+        counts, documents = self.term_counts(sources, labels)
+        return self.engine.top_terms(counts, limit), documents
+
+    def stats(self) -> Dict:
+        """Documents and distinct terms per partition"""
+        with self._lock:
+            return {
+                f"{source}/{label}": {
+                    'documents': self._document_counts[(source, label)],
+                    'terms': len(counts)
+                }
+                for (source, label), counts in sorted(self._partitions.items())
+            }
@@ -11,7 +11,7 @@ Features:
 - RESTful API endpoints
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -20,13 +20,19 @@ import logging
 from datetime import datetime, timedelta, timezone
 import json
 import sqlite3
+import threading
+import time
 
 # Import custom modules
-from sentiment.analyzer import SentimentAnalyzer
+from sentiment.analyzer import SentimentAnalyzer, ANALYSIS_MODES
+from sentiment.cache import SentimentCache
+from sentiment.dedup import NearDuplicateIndex
 from data.processors import DataProcessor
 from data.dataset_analyzer import DatasetAnalyzer
 from analytics.generator import AnalyticsGenerator
+from analytics.term_index import SENTIMENT_LABELS, SOURCES as TERM_INDEX_SOURCES, TermFrequencyIndex
 from database.manager import DatabaseManager
+from jobs.manager import JobManager
 
 # Configure logging
 logging.basicConfig(
@@ -58,11 +64,47 @@ limiter = Limiter(
 limiter.init_app(app)
 
 # Initialize services
-sentiment_analyzer = SentimentAnalyzer()
+db_manager = DatabaseManager()
+sentiment_cache = SentimentCache(
+    max_entries=int(os.getenv('SENTIMENT_CACHE_SIZE', 10000)),
+    db_manager=db_manager if os.getenv('SENTIMENT_CACHE_PERSIST', 'true').lower() == 'true' else None,
+    max_db_entries=int(os.getenv('SENTIMENT_CACHE_DB_MAX_ROWS', 100000))
+)
+# Near-duplicates of cached texts reuse their results; a threshold of 0 disables this
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('SENTIMENT_NEAR_DUPLICATE_THRESHOLD', 0.9))
+near_duplicate_index = NearDuplicateIndex(
+    threshold=NEAR_DUPLICATE_THRESHOLD,
+    max_entries=int(os.getenv('SENTIMENT_NEAR_DUPLICATE_INDEX_SIZE', 100000))
+) if NEAR_DUPLICATE_THRESHOLD > 0 else None
+sentiment_analyzer = SentimentAnalyzer(cache=sentiment_cache, dedup_index=near_duplicate_index)
 data_processor = DataProcessor()
 dataset_analyzer = DatasetAnalyzer()
 analytics_generator = AnalyticsGenerator()
-db_manager = DatabaseManager()
+term_index = TermFrequencyIndex(
+    db_manager, sentiment_analyzer, dataset_analyzer,
+    news_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dataset', 'news.json')
+)
+
+
+def _on_job_results_stored(job_type, finished):
+    """Keep the term index in step with results stored by analysis jobs"""
+    if job_type == 'rescore':
+        # Rescored rows change label in place, which only a rebuild picks up
+        if finished:
+            term_index.request_rebuild('posts')
+    else:
+        term_index.request_refresh()
+
+
+job_manager = JobManager(sentiment_analyzer, db_manager, on_results_stored=_on_job_results_stored)
+
+# Settings row holding the combine weights last set through /api/sentiment/reweight
+COMBINE_WEIGHTS_SETTING = 'sentiment_combine_weights'
+
+# Word cloud 'type' values kept for existing clients; sentiment labels
+# ('positive', 'negative', ...) are also accepted as types and filter by label
+WORDCLOUD_SOURCE_ALIASES = {'social': 'survey'}
+TERM_INDEX_REFRESH_INTERVAL = float(os.getenv('TERM_INDEX_REFRESH_INTERVAL', 60))
 
 @app.route('/')
 def health_check():
@@ -120,7 +162,10 @@ def analyze_sentiment():
     {
         "text": "string",
         "source": "user_post|news|social_media",
-        "metadata": {"optional": "data"}
+        "metadata": {"optional": "data"},
+        "mode": "full|cascade (optional)",
+        "debug": false (optional; adds per-stage timings_ms to the result),
+        "long_document": false (optional; score long texts as sentence-bounded chunks)
     }
     """
     try:
@@ -132,12 +177,22 @@ def analyze_sentiment():
         text = data['text']
         source = data.get('source', 'user_post')
         metadata = data.get('metadata', {})
+        mode = data.get('mode')
+        debug = bool(data.get('debug', False))
+        long_document = bool(data.get('long_document', False))
+        
+        if mode is not None and mode not in ANALYSIS_MODES:
+            return jsonify({'error': f"Mode must be one of: {', '.join(ANALYSIS_MODES)}"}), 400
         
         # Perform sentiment analysis
-        result = sentiment_analyzer.analyze(text, source, metadata)
+        if long_document:
+            result = sentiment_analyzer.analyze_document(text, source, metadata, mode=mode)
+        else:
+            result = sentiment_analyzer.analyze(text, source, metadata, mode=mode, debug=debug)
         
         # Store result in database
         db_manager.store_sentiment_result(result)
+        term_index.request_refresh()
         
         logger.info(f"Sentiment analysis completed for source: {source}")
         
@@ -162,7 +217,9 @@ def analyze_sentiment_batch():
         "texts": [
             {"text": "string", "id": "unique_id", "metadata": {}},
             ...
-        ]
+        ],
+        "mode": "full|cascade (optional)",
+        "format": "records|columnar (optional, default records)"
     }
     """
     try:
@@ -172,21 +229,30 @@ def analyze_sentiment_batch():
             return jsonify({'error': 'Texts array is required'}), 400
         
         texts = data['texts']
+        mode = data.get('mode')
+        result_format = data.get('format', 'records')
         
         if len(texts) > 100:
             return jsonify({'error': 'Maximum 100 texts per batch'}), 400
         
-        results = sentiment_analyzer.analyze_batch(texts)
+        if mode is not None and mode not in ANALYSIS_MODES:
+            return jsonify({'error': f"Mode must be one of: {', '.join(ANALYSIS_MODES)}"}), 400
+        
+        if result_format not in ('records', 'columnar'):
+            return jsonify({'error': 'Format must be one of: records, columnar'}), 400
         
-        # Store results in database
-        for result in results:
-            db_manager.store_sentiment_result(result)
+        columnar = result_format == 'columnar'
+        results = sentiment_analyzer.analyze_batch(texts, mode=mode, columnar=columnar)
+        
+        # Store results in database (items that failed to analyze are skipped)
+        db_manager.store_sentiment_results(list(results))
+        term_index.request_refresh()
         
         logger.info(f"Batch sentiment analysis completed for {len(texts)} texts")
         
         return jsonify({
             'success': True,
-            'results': results,
+            'results': results.to_columns() if columnar else results,
             'count': len(results),
             'timestamp': datetime.now(timezone.utc).isoformat()
         })
@@ -195,6 +261,294 @@ def analyze_sentiment_batch():
         logger.error(f"Batch sentiment analysis error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+# Streaming batch analysis: items scored (and stored) per chunk, and the
+# longest accepted input line
+STREAM_CHUNK_SIZE = int(os.getenv('SENTIMENT_STREAM_CHUNK_SIZE', 64))
+STREAM_MAX_LINE_BYTES = int(os.getenv('SENTIMENT_STREAM_MAX_LINE_BYTES', 64 * 1024))
+
+def _iter_ndjson_items(stream, max_line_bytes):
+    """
+    Parse NDJSON from a request stream one line at a time
+    
+    Yields:
+        (line_number, item, error) tuples; item is None when the line is invalid
+    """
+    line_number = 0
+    
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            break
+        line_number += 1
+        
+        if len(line) > max_line_bytes and not line.endswith(b'\n'):
+            # Skip the rest of an oversized line without buffering it
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line_bytes)
+            yield line_number, None, f"Line exceeds {max_line_bytes} bytes"
+            continue
+        
+        line = line.strip()
+        if not line:
+            continue
+        
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {str(e)}"
+            continue
+        
+        if not isinstance(item, dict):
+            yield line_number, None, 'Each line must be a JSON object'
+            continue
+        
+        yield line_number, item, None
+
+@app.route('/api/sentiment/stream', methods=['POST'])
+@limiter.limit("10 per minute")
+def analyze_sentiment_stream():
+    """
+    Streaming batch sentiment analysis over NDJSON, without an item cap
+    
+    Expected body (Content-Type: application/x-ndjson), one object per line:
+        {"text": "string", "id": "unique_id", "metadata": {}}
+    
+    Query parameters:
+        mode: full|cascade (optional)
+        chunk_size: items scored and stored together (optional)
+    
+    Response (application/x-ndjson): one result per input line in input
+    order, written as each chunk is scored, then a final summary line:
+        {"summary": {"count": n, "stored": n, "errors": n}}
+    """
+    mode = request.args.get('mode')
+    if mode is not None and mode not in ANALYSIS_MODES:
+        return jsonify({'error': f"Mode must be one of: {', '.join(ANALYSIS_MODES)}"}), 400
+    
+    chunk_size = max(1, min(request.args.get('chunk_size', STREAM_CHUNK_SIZE, type=int), 1000))
+    stream = request.stream
+    
+    def generate():
+        summary = {'count': 0, 'stored': 0, 'errors': 0}
+        chunk = []
+        
+        def flush():
+            results = sentiment_analyzer.analyze_batch(chunk, mode=mode, workers=0, columnar=True)
+            records = results.to_list()
+            chunk.clear()
+            
+            try:
+                summary['stored'] += db_manager.store_sentiment_results(records)
+                term_index.request_refresh()
+            except Exception as e:
+                logger.error(f"Streaming sentiment storage error: {str(e)}")
+            
+            summary['count'] += len(records)
+            summary['errors'] += len(results.errors)
+            return ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records)
+        
+        for line_number, item, error in _iter_ndjson_items(stream, STREAM_MAX_LINE_BYTES):
+            if error is not None:
+                # Keep output in input order
+                if chunk:
+                    yield flush()
+                summary['count'] += 1
+                summary['errors'] += 1
+                yield json.dumps({'id': f"line_{line_number}", 'error': error}) + '\n'
+                continue
+            
+            item.setdefault('id', f"line_{line_number}")
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield flush()
+        
+        if chunk:
+            yield flush()
+        
+        logger.info(f"Streaming sentiment analysis completed: {summary}")
+        yield json.dumps({'summary': summary}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/sentiment/cache/stats', methods=['GET'])
+@limiter.limit("30 per minute")
+def get_sentiment_cache_stats():
+    """Get hit, miss and eviction counters for the sentiment result cache"""
+    try:
+        return jsonify({
+            'success': True,
+            'stats': sentiment_cache.stats(),
+            'near_duplicates': near_duplicate_index.stats() if near_duplicate_index is not None else None,
+            'analyzer_version': sentiment_analyzer.lexicon_version(),
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"Sentiment cache stats error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/sentiment/reweight', methods=['POST'])
+@limiter.limit("5 per minute")
+def reweight_sentiment():
+    """
+    Change the scorer weights and re-blend every stored result
+    
+    Uses the component scores kept with each result, so nothing is
+    re-analyzed. Results stored before component scores were kept are
+    left unchanged.
+    
+    Expected payload:
+    {
+        "weights": {"vader": 0.4, "textblob": 0.3, "housing": 0.3}
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('weights'), dict):
+            return jsonify({'error': 'Weights object is required'}), 400
+        
+        try:
+            weights = sentiment_analyzer.set_combine_weights(data['weights'])
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Restored at startup, so results stored after a restart use the same blend
+        db_manager.save_setting(COMBINE_WEIGHTS_SETTING, weights)
+        
+        start = time.perf_counter()
+        updated = db_manager.reweight_sentiment_results(weights, sentiment_analyzer.sentiment_thresholds)
+        elapsed = time.perf_counter() - start
+        
+        # Labels of stored posts may have changed
+        term_index.request_rebuild('posts')
+        
+        return jsonify({
+            'success': True,
+            'weights': weights,
+            'updated': updated,
+            'seconds': elapsed,
+            'analyzer_version': sentiment_analyzer.lexicon_version(),
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"Sentiment reweight error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/sentiment/stats/stages', methods=['GET'])
+@limiter.limit("30 per minute")
+def get_sentiment_stage_stats():
+    """
+    Get per-stage latency histograms of the sentiment pipeline
+    
+    Query parameters:
+        stage: Optional comma-separated stages to include
+    """
+    try:
+        stages = request.args.get('stage')
+        return jsonify({
+            'success': True,
+            'enabled': sentiment_analyzer.metrics.enabled,
+            'stages': sentiment_analyzer.metrics.snapshot(stages.split(',') if stages else None),
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"Sentiment stage stats error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/jobs', methods=['POST'])
+@limiter.limit("10 per minute")
+def submit_analysis_job():
+    """
+    Submit a background sentiment analysis job
+    
+    Expected payload:
+    {
+        "type": "batch|corpus|rescore",
+        "texts": [{"text": "string", "id": "unique_id", "metadata": {}}, ...],  (batch)
+        "path": "news.json",  (corpus, relative to the dataset directory)
+        "mode": "full|cascade (optional)",
+        "source": "string (optional)"
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'type' not in data:
+            return jsonify({'error': 'Job type is required'}), 400
+        
+        job = job_manager.submit(data['type'], data)
+        
+        return jsonify({
+            'success': True,
+            'job': job,
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        }), 202
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Job submission error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/jobs', methods=['GET'])
+@limiter.limit("60 per minute")
+def list_analysis_jobs():
+    """List recent analysis jobs (optional ?status= and ?limit=)"""
+    try:
+        status = request.args.get('status')
+        limit = max(1, min(request.args.get('limit', 50, type=int), 500))
+        
+        return jsonify({
+            'success': True,
+            'jobs': job_manager.list_jobs(status, limit),
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"Job listing error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@limiter.limit("120 per minute")
+def get_analysis_job(job_id):
+    """Poll job status, progress, throughput and ETA"""
+    try:
+        job = job_manager.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job,
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"Job status error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+@limiter.limit("30 per minute")
+def cancel_analysis_job(job_id):
+    """Cancel a queued or running job"""
+    try:
+        job = job_manager.cancel(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job,
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"Job cancellation error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/api/data/news', methods=['GET'])
 @limiter.limit("20 per minute")
 def get_news_data():
@@ -225,10 +579,10 @@ def get_news_data():
         # Limit results
         limited_articles = news_data[:limit]
         
-        # Analyze sentiment for each article
+        # Analyze sentiment for each article (long articles in chunks)
         processed_articles = []
         for article in limited_articles:
-            sentiment_result = sentiment_analyzer.analyze(
+            sentiment_result = sentiment_analyzer.analyze_document(
                 article.get('content', ''),
                 source='news',
                 metadata={
@@ -718,82 +1072,49 @@ def get_dataset_info():
 @limiter.limit("30 per minute")
 def get_wordcloud_data():
     """
-    Generate word cloud data from sentiment analysis text
+    Generate word cloud data from the term frequency index
     Returns word frequency data for frontend word cloud generation
+    
+    Query parameters:
+        type: 'all', or comma-separated sources ('news', 'social'/'survey', 'posts')
+            and/or sentiment labels ('positive', 'negative', ...) across all sources
+        sentiment: Optional comma-separated labels ('positive', 'negative', 'neutral')
+        limit: Maximum number of words (default 100)
     """
     try:
         # Get parameters
-        data_type = request.args.get('type', 'all')  # 'all', 'positive', 'negative', 'news', 'social'
+        data_type = request.args.get('type', 'all')
         limit = int(request.args.get('limit', 100))
         sentiment_filter = request.args.get('sentiment')
         
-        # Get text data based on type
-        texts = []
-        
-        if data_type in ['all', 'news']:
-            # Get news data from JSON file
-            try:
-                import json
-                import os
-                news_file_path = os.path.join(os.path.dirname(__file__), 'dataset', 'news.json')
-                if os.path.exists(news_file_path):
-                    with open(news_file_path, 'r', encoding='utf-8') as f:
-                        news_articles = json.load(f)
-                    
-                    # Limit the number of articles processed
-                    news_articles = news_articles[:limit] if limit < len(news_articles) else news_articles
-                    
-                    for article in news_articles:
-                        # Combine title and content for text analysis
-                        article_text = (article.get('title', '') + ' ' + article.get('content', '')).strip()
-                        if article_text:
-                            # For news data, we don't have pre-computed sentiment, so add all texts
-                            # The sentiment filtering will be handled by the word cloud generation
-                            texts.append(article_text)
-            except Exception as e:
-                logger.warning(f"Could not load news data: {e}")
-        
-        if data_type in ['all', 'social']:
-            # Get social data (from survey responses or community posts)
-            try:
-                # Try to get CSV data
-                df = dataset_analyzer.df
-                if df is not None:
-                    # Filter by sentiment if specified
-                    if sentiment_filter:
-                        # Map sentiment filter to the column values
-                        if sentiment_filter == 'positive':
-                            df_filtered = df[df['sentiment_score'] > 0.1]
-                        elif sentiment_filter == 'negative':
-                            df_filtered = df[df['sentiment_score'] < -0.1]
-                        else:
-                            df_filtered = df[(df['sentiment_score'] >= -0.1) & (df['sentiment_score'] <= 0.1)]
-                    else:
-                        df_filtered = df
-                    
-                    # Get text from relevant columns that contain responses
-                    text_columns = [
-                        'What challenges have you faced (or expect to face) when trying to access affordable housing? (Select all that apply)',
-                        'In your opinion, what is the biggest weakness in Malaysia\'s current affordable housing policies?',
-                        'What improvements would you like to see in future housing policies?'
-                    ]
-                    for col in text_columns:
-                        if col in df_filtered.columns:
-                            # Get non-null, non-empty responses
-                            responses = df_filtered[col].dropna()
-                            responses = responses[responses != '']  # Remove empty strings
-                            texts.extend(responses.tolist())
-            except Exception as e:
-                logger.warning(f"Could not load dataset for wordcloud: {e}")
-        
-        # Process texts for word cloud
-        word_freq = sentiment_analyzer.generate_wordcloud_data(texts, max_words=limit)
+        sources = []
+        labels = [label.strip() for label in sentiment_filter.split(',')] if sentiment_filter else []
+        for name in data_type.split(','):
+            name = name.strip()
+            if name == 'all':
+                sources.extend(TERM_INDEX_SOURCES)
+            elif name in SENTIMENT_LABELS:
+                labels.append(name)
+            else:
+                sources.append(WORDCLOUD_SOURCE_ALIASES.get(name, name))
+        sources = sources or list(TERM_INDEX_SOURCES)
+        labels = labels or None
+        
+        invalid = [source for source in sources if source not in TERM_INDEX_SOURCES]
+        invalid += [label for label in labels or [] if label not in SENTIMENT_LABELS]
+        if invalid:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown word cloud filter: {', '.join(invalid)}"
+            }), 400
+        
+        word_freq, total_texts = term_index.top_terms(sources, labels, limit)
         
         return jsonify({
             'success': True,
             'data': {
                 'words': word_freq,
-                'total_texts': len(texts),
+                'total_texts': total_texts,
                 'type': data_type,
                 'sentiment_filter': sentiment_filter
             }
@@ -851,6 +1172,31 @@ if __name__ == '__main__':
     # Initialize database
     db_manager.initialize()
     
+    # Stored results were re-blended with the last weights set at runtime; keep using them
+    saved_weights = db_manager.get_setting(COMBINE_WEIGHTS_SETTING)
+    if saved_weights:
+        try:
+            sentiment_analyzer.set_combine_weights(saved_weights)
+            logger.info(f"Restored sentiment combine weights {sentiment_analyzer.combine_weights}")
+        except (TypeError, ValueError) as e:
+            logger.error(f"Ignoring saved sentiment combine weights {saved_weights}: {str(e)}")
+    
+    # Drop persisted sentiment results from older analyzer versions
+    sentiment_cache.purge_stale(sentiment_analyzer.lexicon_version())
+    sentiment_cache.prune()
+    sentiment_analyzer.load_near_duplicate_index()
+    
+    # Load NLP resources (fetching missing NLTK data) in the background so the first request is fast
+    if os.getenv('SENTIMENT_WARMUP', 'true').lower() == 'true':
+        threading.Thread(target=sentiment_analyzer.warm_up, kwargs={'download_missing': True},
+                         name='sentiment-warmup', daemon=True).start()
+    
+    # Resume analysis jobs interrupted by the last shutdown
+    job_manager.start()
+    
+    # Load the word cloud index, then index new news, survey and stored posts in the background
+    term_index.start(TERM_INDEX_REFRESH_INTERVAL)
+    
     # Start the application
     # port = int(os.getenv('PORT', 5001))  # Changed from 5000 to 5001 to avoid macOS AirPlay conflict
     port = 5001
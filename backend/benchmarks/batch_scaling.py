@@ -0,0 +1,53 @@
+"""
+Benchmark SentimentAnalyzer.analyze_batch across worker process counts
+
+Replicates the news corpus into a large batch and reports docs/sec for the
+in-process path and for each requested process-pool size.
+
+Usage (from the backend directory):
+    python -m benchmarks.batch_scaling [--scale N] [--workers 1 2 4] [--chunk-size N]
+"""
+
+import argparse
+import os
+import time
+
+from sentiment.analyzer import SentimentAnalyzer
+from benchmarks.common import load_news_texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=int, default=5, help='copies of the news corpus in the batch')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, os.cpu_count() or 1}), help='worker counts to measure')
+    parser.add_argument('--chunk-size', type=int, default=64, help='items per worker task')
+    args = parser.parse_args()
+    
+    documents = load_news_texts() * args.scale
+    batch = [{'id': f"news_{i}", 'text': text} for i, text in enumerate(documents)]
+    print(f"Batch: {len(batch)} articles, {os.cpu_count()} CPUs")
+    
+    analyzer = SentimentAnalyzer(batch_chunk_size=args.chunk_size)
+    baseline = None
+    
+    for workers in args.workers:
+        if workers > 1:
+            # Start the pool outside the timed region
+            analyzer.analyze_batch(batch[:args.chunk_size * workers + 1], workers=workers)
+        
+        start = time.perf_counter()
+        results = analyzer.analyze_batch(batch, workers=workers)
+        elapsed = time.perf_counter() - start
+        
+        assert [result['id'] for result in results] == [item['id'] for item in batch]
+        throughput = len(batch) / elapsed
+        baseline = baseline or throughput
+        print(f"workers={workers}: {throughput:.1f} docs/sec ({throughput / baseline:.2f}x)")
+    
+    if analyzer._batch_runner is not None:
+        analyzer._batch_runner.shutdown()
+
+
+if __name__ == '__main__':
+    main()
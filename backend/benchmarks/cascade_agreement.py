@@ -0,0 +1,64 @@
+"""
+Agreement report for cascade ("fast mode") sentiment scoring
+
+Scores dataset/news.json in full and cascade mode and reports how often the
+cascade label matches the full-mode label, how often TextBlob was skipped
+and the per-document cost of each mode, for one or more uncertainty bands.
+
+Usage (from the backend directory):
+    python -m benchmarks.cascade_agreement [--bands 0.05 0.15 0.3]
+"""
+
+import argparse
+import time
+from collections import Counter
+
+from sentiment.analyzer import SentimentAnalyzer
+from benchmarks.common import load_news_texts
+
+LABELS = ('positive', 'neutral', 'negative')
+
+
+def score_all(analyzer: SentimentAnalyzer, documents, mode: str):
+    """Analyze every document in one mode, returning results and elapsed seconds"""
+    start = time.perf_counter()
+    results = [analyzer.analyze(text, source='news', mode=mode) for text in documents]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bands', type=float, nargs='+', default=[0.05, 0.15, 0.3],
+                        help='cascade uncertainty bands to evaluate')
+    args = parser.parse_args()
+    
+    analyzer = SentimentAnalyzer()
+    documents = load_news_texts()
+    analyzer.analyze(documents[0])
+    
+    full_results, full_seconds = score_all(analyzer, documents, 'full')
+    full_labels = [result['sentiment_label'] for result in full_results]
+    print(f"Corpus: {len(documents)} articles; full mode {full_seconds / len(documents) * 1000:.2f} ms/doc")
+    print(f"Full-mode labels: {dict(Counter(full_labels))}")
+    
+    for band in args.bands:
+        analyzer.cascade_band = band
+        cascade_results, cascade_seconds = score_all(analyzer, documents, 'cascade')
+        cascade_labels = [result['sentiment_label'] for result in cascade_results]
+        
+        agreement = sum(a == b for a, b in zip(full_labels, cascade_labels)) / len(documents)
+        textblob_runs = sum('textblob' in result['scorers_run'] for result in cascade_results)
+        confusion = Counter(zip(full_labels, cascade_labels))
+        
+        print(f"\nband={band}: agreement {agreement:.1%}, TextBlob ran on "
+              f"{textblob_runs}/{len(documents)} docs, "
+              f"{cascade_seconds / len(documents) * 1000:.2f} ms/doc "
+              f"({full_seconds / cascade_seconds:.2f}x vs full)")
+        print("  full \\ cascade  " + '  '.join(f"{label:>8}" for label in LABELS))
+        for full_label in LABELS:
+            row = '  '.join(f"{confusion[(full_label, label)]:>8}" for label in LABELS)
+            print(f"  {full_label:>14}  {row}")
+
+
+if __name__ == '__main__':
+    main()
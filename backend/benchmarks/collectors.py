@@ -0,0 +1,194 @@
+"""
+Benchmark concurrent news collection against a local HTTP stand-in
+
+Starts one local HTTP server per simulated news site (each port is a
+separate host to the HTTP client), each serving an RSS feed and article
+pages after an artificial --latency. With --error-rate, that share of
+requests first answers 503 so retries are exercised. Times the previous
+sequential collection loop (feed, then each article page followed by a
+fixed 0.5 s sleep) against NewsCollector.collect_articles with its thread
+pool and the HttpClient's per-host token buckets, checks both return the
+same articles, and prints the client's per-host metrics.
+
+Usage (from the backend directory):
+    python -m benchmarks.collectors [--hosts 4] [--entries 6] [--latency 0.1] [--workers 8]
+        [--rate 2] [--burst 1] [--error-rate 0]
+"""
+
+import argparse
+import logging
+import os
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlsplit
+
+from data.collectors import NewsCollector
+from data.http_client import HostPolicy, HttpClient
+
+KEYWORDS = ['housing', 'rumah']
+SERVED_LOCK = threading.Lock()
+
+
+def make_handler(entries, latency: float, error_rate: float, seed: int, served=None, padding: int = 0,
+                 feed_size: Optional[int] = None):
+    """
+    Handler class for one simulated site
+
+    entries is the number of feed entries, or a callable returning the
+    current number so a feed can grow between runs; entry i is published i
+    minutes after a fixed time a day ago, and the feed lists the newest
+    feed_size entries (all by default). Pages carry an ETag and a fixed
+    Last-Modified and answer conditional requests with 304. Article pages
+    get about `padding` bytes of sidebar markup. Response body bytes are
+    added to served['bytes'].
+    """
+    rng = random.Random(seed)
+    failed = set()
+    start = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(days=1)
+    published = format_datetime(start, usegmt=True)
+    served = {} if served is None else served
+    sidebar = f"<div class='sidebar'>{'<p>Related listing</p>' * (padding // 22)}</div>"
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            # Fail a share of paths once each; the retry then succeeds
+            if self.path not in failed and rng.random() < error_rate:
+                failed.add(self.path)
+                self.send_error(503)
+                return
+            base = f"http://{self.headers['Host']}"
+            if self.path == '/rss.xml':
+                count = entries() if callable(entries) else entries
+                items = ''.join(
+                    f"<item><title>Affordable housing update {index}</title>"
+                    f"<link>{base}/article/{index}</link>"
+                    f"<description>Housing scheme news {index}</description>"
+                    f"<pubDate>{format_datetime(start + timedelta(minutes=index), usegmt=True)}</pubDate></item>"
+                    for index in reversed(range(max(0, count - (feed_size or count)), count))
+                )
+                body = f"<?xml version='1.0'?><rss version='2.0'><channel><title>{base}</title>{items}</channel></rss>"
+                content_type = 'application/rss+xml'
+            elif self.path.startswith('/article/'):
+                body = (f"<html><body><div class='article-content'><p>Full story {self.path}: "
+                        f"the rumah mampu milik programme opened new applications.</p></div>"
+                        f"{sidebar}</body></html>")
+                content_type = 'text/html'
+            else:
+                self.send_error(404)
+                return
+
+            payload = body.encode('utf-8')
+            etag = f'"{zlib.crc32(payload):08x}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', published)
+            self.end_headers()
+            self.wfile.write(payload)
+            with SERVED_LOCK:
+                served['bytes'] = served.get('bytes', 0) + len(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StandInHandler
+
+
+def legacy_collect(collector: NewsCollector, keywords, cutoff_date):
+    """Previous NewsCollector.collect_articles loop over RSS sources"""
+    articles = []
+    for source_info in collector.sources.values():
+        for article in collector._collect_from_rss(source_info['rss_url'], source_info['name'], keywords, cutoff_date):
+            article['content'] = collector._extract_article_content(article['url']) or article['summary']
+            articles.append(article)
+            time.sleep(0.5)
+    return articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hosts', type=int, default=4, help='simulated news sites')
+    parser.add_argument('--entries', type=int, default=6, help='matching RSS entries per site')
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds each response is delayed')
+    parser.add_argument('--workers', type=int, default=8, help='NewsCollector thread pool size')
+    parser.add_argument('--rate', type=float, default=2.0, help='requests per second allowed per host')
+    parser.add_argument('--burst', type=int, default=1, help='token bucket capacity per host')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests first answered with 503')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    os.environ.pop('NEWSAPI_KEY', None)
+
+    def start_servers():
+        servers = [ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.entries, args.latency,
+                                                                      args.error_rate, args.seed + index))
+                   for index in range(args.hosts)]
+        for server in servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return servers, {
+            f"site_{index}": {
+                'rss_url': f"http://127.0.0.1:{server.server_address[1]}/rss.xml",
+                'base_url': f"http://127.0.0.1:{server.server_address[1]}",
+                'name': f"Site {index}"
+            }
+            for index, server in enumerate(servers)
+        }
+
+    # Fresh servers per run so both see the same injected failures
+    servers, sources = start_servers()
+    try:
+        legacy_collector = NewsCollector(max_workers=1, http_client=HttpClient(HostPolicy(rate=0), max_retries=0))
+        legacy_collector.sources = sources
+        start = time.perf_counter()
+        legacy = legacy_collect(legacy_collector, KEYWORDS, datetime.now() - timedelta(days=7))
+        legacy_time = time.perf_counter() - start
+    finally:
+        for server in servers:
+            server.shutdown()
+
+    servers, sources = start_servers()
+    try:
+        client = HttpClient(HostPolicy(rate=args.rate, burst=args.burst), backoff_base=0.2)
+        collector = NewsCollector(max_workers=args.workers, http_client=client)
+        collector.sources = sources
+        start = time.perf_counter()
+        concurrent = collector.collect_articles(KEYWORDS, limit=args.hosts * args.entries)
+        concurrent_time = time.perf_counter() - start
+    finally:
+        for server in servers:
+            server.shutdown()
+
+    print(f"{args.hosts} hosts x {args.entries} articles, {args.latency * 1000:.0f} ms latency, "
+          f"{args.rate:g} requests/sec per host (burst {args.burst}), {args.error_rate:.0%} first-try 503s")
+    print(f"sequential + 0.5s sleep  {legacy_time:6.2f}s  {len(legacy)} articles, "
+          f"{sum(article['content'] != article['summary'] for article in legacy)} with full content")
+    print(f"concurrent ({args.workers} workers)   {concurrent_time:6.2f}s  {len(concurrent)} articles, "
+          f"{sum(article['content'] != article['summary'] for article in concurrent)} with full content "
+          f"({legacy_time / concurrent_time:.1f}x)")
+    if not args.error_rate:
+        # Ports differ between runs, so compare by site and path
+        same = (sorted((a['source'], urlsplit(a['url']).path, a['content']) for a in legacy) ==
+                sorted((a['source'], urlsplit(a['url']).path, a['content']) for a in concurrent))
+        print(f"same articles and content: {same}")
+    for host, stats in client.stats().items():
+        print(f"  {host:<16} {stats['requests']:>3} requests  {stats['retries']:>2} retries  "
+              f"statuses {stats['statuses']}  p50 {stats['latency']['p50_ms']:6.1f} ms  "
+              f"p95 {stats['latency']['p95_ms']:6.1f} ms  throttled {stats['throttled_seconds']:5.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark columnar batch results against per-item dictionaries
+
+Scoring is done once up front, so the numbers show only what the result
+format costs: assembling N results from the analyzer output and encoding
+them, for the default list of nested dictionaries versus
+ColumnarBatchResult (columnar JSON and NDJSON). Peak memory held by the
+assembled batch is reported alongside.
+
+Usage (from the backend directory):
+    python -m benchmarks.columnar_batch [--items N] [--repeat N]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from sentiment.analyzer import SentimentAnalyzer
+from sentiment.columnar import ColumnarBatchBuilder
+from benchmarks.common import load_news_texts
+
+
+def build_records(analyzer: SentimentAnalyzer, items, analyses):
+    """Per-item dictionaries, as analyze_batch returns by default"""
+    results = []
+    for item, analysis in zip(items, analyses):
+        result = analyzer._build_result(item['text'], 'user_post', {'batch_id': item['id']}, analysis)
+        result['id'] = item['id']
+        results.append(result)
+    return results
+
+
+def build_columnar(items, analyses):
+    """Column arrays, as analyze_batch(columnar=True) returns"""
+    builder = ColumnarBatchBuilder(len(items))
+    for item, analysis in zip(items, analyses):
+        builder.add(item['id'], item['text'], 'user_post', {'batch_id': item['id']}, analysis)
+    return builder.build()
+
+
+def measure(func, repeat: int):
+    """Fastest wall time over ``repeat`` runs and peak traced memory of one run"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=10000, help='batch size')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per variant (best is reported)')
+    args = parser.parse_args()
+    
+    analyzer = SentimentAnalyzer()
+    documents = load_news_texts()
+    distinct = [analyzer._analyze_text(text, 'full') for text in documents]
+    
+    items = [{'text': documents[index % len(documents)], 'id': f"item_{index}"} for index in range(args.items)]
+    analyses = [distinct[index % len(documents)] for index in range(args.items)]
+    print(f"Batch: {args.items} items ({len(documents)} distinct articles, scored up front)")
+    
+    variants = {
+        'records build': lambda: build_records(analyzer, items, analyses),
+        'columnar build': lambda: build_columnar(items, analyses),
+        'records + json.dumps': lambda: json.dumps(build_records(analyzer, items, analyses),
+                                                   separators=(',', ':')),
+        'columnar + to_json': lambda: build_columnar(items, analyses).to_json(),
+        'columnar + to_ndjson': lambda: build_columnar(items, analyses).to_ndjson(),
+    }
+    
+    for name, variant in variants.items():
+        seconds, peak = measure(variant, args.repeat)
+        output = variant()
+        size = f", {len(output) / 1024:6.0f} KiB output" if isinstance(output, str) else ''
+        print(f"{name:>22}: {seconds * 1000:8.1f} ms, peak {peak / 1024 / 1024:6.1f} MiB{size}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Shared helpers for HomeWatch benchmarks
+
+Benchmarks are run from the backend directory as modules, e.g.
+``python -m benchmarks.tokenization``
+"""
+
+import json
+import os
+import time
+from typing import Callable, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NEWS_PATH = os.path.join(BACKEND_DIR, 'dataset', 'news.json')
+SURVEY_PATH = os.path.join(BACKEND_DIR, 'dataset', 'HomeWatch Sentiment Survey: Affordable Housing in Malaysia.csv')
+
+
+def load_news_texts(path: str = NEWS_PATH) -> List[str]:
+    """Load article bodies from the bundled news corpus"""
+    with open(path, 'r', encoding='utf-8') as f:
+        articles = json.load(f)
+    
+    return [article.get('content', '') for article in articles if article.get('content')]
+
+
+def load_survey_texts(path: str = SURVEY_PATH) -> List[str]:
+    """Load the free-text answers of the bundled survey, one text per response"""
+    import pandas as pd
+    from analytics.term_index import SURVEY_TEXT_COLUMNS
+    
+    df = pd.read_csv(path)
+    columns = [column for column in SURVEY_TEXT_COLUMNS if column in df.columns]
+    texts = []
+    for row in df[columns].itertuples(index=False):
+        answers = [value for value in row if isinstance(value, str) and value.strip()]
+        if answers:
+            texts.append(' '.join(answers))
+    return texts
+
+
+def time_per_document(func: Callable[[str], object], documents: List[str], repeat: int = 3) -> Dict[str, float]:
+    """
+    Time ``func`` over every document and report the best run
+    
+    Args:
+        func: Callable invoked once per document
+        documents: Documents to feed through ``func``
+        repeat: Number of full passes; the fastest pass is reported
+        
+    Returns:
+        Dictionary with total seconds, per-document milliseconds and docs/sec
+    """
+    best = float('inf')
+    
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document in documents:
+            func(document)
+        best = min(best, time.perf_counter() - start)
+    
+    return {
+        'total_seconds': best,
+        'ms_per_doc': best / len(documents) * 1000,
+        'docs_per_sec': len(documents) / best if best else 0.0
+    }
+
+
+def print_comparison(label: str, before: Dict[str, float], after: Dict[str, float]):
+    """Print a before/after line for a benchmark"""
+    speedup = before['ms_per_doc'] / after['ms_per_doc'] if after['ms_per_doc'] else 0.0
+    print(f"{label}: before {before['ms_per_doc']:.3f} ms/doc, "
+          f"after {after['ms_per_doc']:.3f} ms/doc ({speedup:.2f}x)")
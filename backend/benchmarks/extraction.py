@@ -0,0 +1,105 @@
+"""
+Benchmark article text extraction over saved HTML pages
+
+Extracts every page in benchmarks/fixtures/articles (news pages in the
+layouts of six Malaysian sites, one of them without a known content
+container) with the previous full html.parser parse and selector loop,
+and with ArticleExtractor, once with a fresh extractor (domains not yet
+learned) and then repeatedly with the learned per-domain selectors. Each
+page's domain comes from its canonical link. Checks all paths return
+the same text.
+
+Usage (from the backend directory):
+    python -m benchmarks.extraction [--repeat 20] [--dir benchmarks/fixtures/articles]
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+from data.extraction import ArticleExtractor
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'articles')
+CANONICAL_RE = re.compile(rb"<link rel=['\"]canonical['\"] href=['\"]([^'\"]+)")
+
+
+def legacy_extract(html):
+    """Previous NewsCollector._extract_article_content parsing"""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    content_selectors = [
+        'article .content',
+        '.article-content',
+        '.story-content',
+        '.post-content',
+        '[itemprop="articleBody"]'
+    ]
+
+    for selector in content_selectors:
+        content_div = soup.select_one(selector)
+        if content_div:
+            content = content_div.get_text(strip=True)
+            return content[:2000]
+
+    paragraphs = soup.find_all('p')
+    if paragraphs:
+        content = ' '.join([p.get_text(strip=True) for p in paragraphs[:10]])
+        return content[:2000]
+
+    return None
+
+
+def load_pages(directory):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        with open(path, 'rb') as f:
+            html = f.read()
+        match = CANONICAL_RE.search(html)
+        pages.append((os.path.basename(path), match.group(1).decode() if match else '', html))
+    return pages
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help='passes over the pages per measurement')
+    parser.add_argument('--dir', default=FIXTURES_DIR, help='directory of saved .html pages')
+    args = parser.parse_args()
+
+    pages = load_pages(args.dir)
+    total_kb = sum(len(html) for _, _, html in pages) / 1024
+
+    legacy, legacy_time = timed(lambda: [legacy_extract(html) for _, _, html in pages], args.repeat)
+    cold, cold_time = timed(lambda: [ArticleExtractor().extract(html, url) for _, url, html in pages], args.repeat)
+    extractor = ArticleExtractor()
+    for _, url, html in pages:
+        extractor.extract(html, url)
+    warm, warm_time = timed(lambda: [extractor.extract(html, url) for _, url, html in pages], args.repeat)
+
+    count = len(pages)
+    print(f"{count} pages, {total_kb:.0f} KiB, parser {extractor.parser}")
+    print(f"previous full parse        {legacy_time * 1000 / count:6.2f} ms/page")
+    print(f"candidate containers only  {cold_time * 1000 / count:6.2f} ms/page ({legacy_time / cold_time:.1f}x)")
+    print(f"learned domain selectors   {warm_time * 1000 / count:6.2f} ms/page ({legacy_time / warm_time:.1f}x)")
+    print(f"same text: {legacy == cold == warm}")
+    for (name, _, _), previous, current in zip(pages, legacy, warm):
+        if previous != current:
+            print(f"  differs: {name}")
+    stats = extractor.stats()
+    print(f"domain hits {stats['domain_hits']}, misses {stats['domain_misses']}, fallbacks {stats['fallbacks']}")
+    for domain, selector in sorted(stats['domain_selectors'].items()):
+        print(f"  {domain:<28} {selector}")
+
+
+if __name__ == '__main__':
+    main()
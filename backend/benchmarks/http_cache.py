@@ -0,0 +1,87 @@
+"""
+Benchmark repeated news collection through the conditional-GET HTTP cache
+
+Serves RSS feeds and article pages from the local stand-in sites of
+benchmarks.collectors (ETag / Last-Modified, 304 on a match) and runs
+NewsCollector.collect_articles three times: without a cache, with a cold
+cache, then again with the article TTL disabled (every page revalidated
+and answered 304) and enabled (pages not requested at all). Reports wall
+time, body bytes downloaded, article pages parsed and the cache counters,
+and checks every run returns the same articles.
+
+Usage (from the backend directory):
+    python -m benchmarks.http_cache [--hosts 4] [--entries 6] [--latency 0.1] [--page-kb 50]
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+from data.collectors import NewsCollector
+from data.http_cache import HttpCache
+from data.http_client import HostPolicy, HttpClient
+from benchmarks.collectors import KEYWORDS, make_handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hosts', type=int, default=4, help='simulated news sites')
+    parser.add_argument('--entries', type=int, default=6, help='matching RSS entries per site')
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds each response is delayed')
+    parser.add_argument('--page-kb', type=int, default=50, help='filler markup per article page')
+    parser.add_argument('--rate', type=float, default=0, help='requests per second allowed per host (0: unlimited)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    os.environ.pop('NEWSAPI_KEY', None)
+
+    served = {}
+    servers = [ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.entries, args.latency, 0.0, index,
+                                                                  served, args.page_kb * 1024))
+               for index in range(args.hosts)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    sources = {
+        f"site_{index}": {
+            'rss_url': f"http://127.0.0.1:{server.server_address[1]}/rss.xml",
+            'base_url': f"http://127.0.0.1:{server.server_address[1]}",
+            'name': f"Site {index}"
+        }
+        for index, server in enumerate(servers)
+    }
+
+    def run(label, cache, article_ttl):
+        client = HttpClient(HostPolicy(rate=args.rate, burst=args.hosts * args.entries), cache=cache)
+        collector = NewsCollector(http_client=client)
+        collector.sources = sources
+        collector.article_cache_ttl = article_ttl
+        served['bytes'] = 0
+        start = time.perf_counter()
+        articles = collector.collect_articles(KEYWORDS, limit=args.hosts * args.entries)
+        elapsed = time.perf_counter() - start
+        requests_sent = sum(stats['requests'] for stats in client.stats().values())
+        print(f"{label:<28} {elapsed:6.2f}s  {requests_sent:>3} requests  {served['bytes'] / 1024:8.1f} KiB  "
+              f"{collector.extractor.stats()['pages']:>3} pages parsed")
+        return sorted((article['url'], article['content']) for article in articles)
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = HttpCache(os.path.join(directory, 'http_cache.db'))
+            print(f"{args.hosts} hosts x {args.entries} articles, {args.latency * 1000:.0f} ms latency")
+            baseline = run('no cache', None, 0)
+            cold = run('cold cache', cache, 0)
+            revalidated = run('warm, revalidate all (304)', cache, 0)
+            fresh = run('warm, article TTL 1 day', cache, 24 * 3600)
+            print(f"same articles and content: {baseline == cold == revalidated == fresh}")
+            print(f"cache: {cache.stats()}")
+    finally:
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark incremental news collection with per-source high-water marks
+
+Serves growing RSS feeds from the local stand-in sites of
+benchmarks.collectors: each feed lists its newest --feed-size entries
+and gains --new entries per site before every run. Runs
+NewsCollector.collect_articles over the same days_back window without
+collection state, and with a DatabaseManager (temporary SQLite file)
+keeping high-water marks. Reports per-run time, article pages fetched
+and articles returned, and counts duplicates across the incremental runs
+and entries they never returned. With a --limit below the entries
+published between runs, the backlog grows until entries scroll off the
+feeds, which full-window collection cannot avoid either.
+
+Usage (from the backend directory):
+    python -m benchmarks.incremental [--hosts 4] [--feed-size 50] [--new 5] [--runs 5] [--limit 1000]
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from data.collectors import NewsCollector
+from data.http_client import HostPolicy, HttpClient
+from database.manager import DatabaseManager
+from benchmarks.collectors import KEYWORDS, make_handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hosts', type=int, default=4, help='simulated news sites')
+    parser.add_argument('--feed-size', type=int, default=50, help='entries listed by each feed')
+    parser.add_argument('--new', type=int, default=5, help='entries published per site before each run')
+    parser.add_argument('--runs', type=int, default=5, help='collection runs after the first')
+    parser.add_argument('--limit', type=int, default=1000, help='collect_articles limit')
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds each response is delayed')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    os.environ.pop('NEWSAPI_KEY', None)
+
+    published = {'count': args.feed_size}
+    servers = [ThreadingHTTPServer(('127.0.0.1', 0), make_handler(lambda: published['count'], args.latency, 0.0,
+                                                                  index, feed_size=args.feed_size))
+               for index in range(args.hosts)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    sources = {
+        f"site_{index}": {
+            'rss_url': f"http://127.0.0.1:{server.server_address[1]}/rss.xml",
+            'base_url': f"http://127.0.0.1:{server.server_address[1]}",
+            'name': f"Site {index}"
+        }
+        for index, server in enumerate(servers)
+    }
+
+    def make_collector(db_manager):
+        collector = NewsCollector(http_client=HttpClient(HostPolicy(rate=0)), db_manager=db_manager)
+        collector.sources = sources
+        return collector
+
+    def run(collector):
+        before = sum(stats['requests'] for stats in collector.http.stats().values())
+        start = time.perf_counter()
+        articles = collector.collect_articles(KEYWORDS, limit=args.limit, days_back=7)
+        elapsed = time.perf_counter() - start
+        pages = sum(stats['requests'] for stats in collector.http.stats().values()) - before - args.hosts
+        return articles, elapsed, pages
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            os.environ['DB_PATH'] = os.path.join(directory, 'homewatch.db')
+            full = make_collector(None)
+            incremental = make_collector(DatabaseManager())
+
+            print(f"{args.hosts} hosts, feeds list {args.feed_size} entries, +{args.new} per site per run, "
+                  f"limit {args.limit}")
+            print(f"{'run':>3}  {'full window':>28}  {'incremental':>28}")
+            collected = []
+            totals = {'full': 0.0, 'incremental': 0.0}
+            for index in range(args.runs + 1):
+                if index:
+                    published['count'] += args.new
+                full_articles, full_time, full_pages = run(full)
+                new_articles, new_time, new_pages = run(incremental)
+                collected.extend((article['source'], urlsplit(article['url']).path) for article in new_articles)
+                totals['full'] += full_time
+                totals['incremental'] += new_time
+                print(f"{index:>3}  {full_time:6.2f}s {full_pages:>4} pages {len(full_articles):>4} articles  "
+                      f"{new_time:6.2f}s {new_pages:>4} pages {len(new_articles):>4} articles")
+
+            expected = {(f"Site {host}", f"/article/{entry}") for host in range(args.hosts)
+                        for entry in range(published['count'])}
+            print(f"total {totals['full']:6.2f}s full window, {totals['incremental']:6.2f}s incremental "
+                  f"({totals['full'] / totals['incremental']:.1f}x)")
+            print(f"incremental runs: {len(collected)} articles, {len(collected) - len(set(collected))} duplicates, "
+                  f"{len(expected - set(collected))} of {len(expected)} entries never returned")
+    finally:
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
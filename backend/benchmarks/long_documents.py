@@ -0,0 +1,69 @@
+"""
+Benchmark chunked scoring of long documents
+
+Builds documents of increasing word counts by joining consecutive news
+articles and times SentimentAnalyzer.analyze (whole text) against
+analyze_document (sentence-bounded chunks, scored in-process and on a
+process pool). Also reports how far the chunked compound score is from
+the whole-text score.
+
+Usage (from the backend directory):
+    python -m benchmarks.long_documents [--words 1000,2000,4000,8000] [--workers N] [--chunk-chars N]
+"""
+
+import argparse
+import os
+import time
+
+from sentiment.analyzer import SentimentAnalyzer
+from benchmarks.common import load_news_texts
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--words', default='1000,2000,4000,8000', help='comma-separated document lengths in words')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='process pool size for chunks')
+    parser.add_argument('--chunk-chars', type=int, default=None, help='override the chunk length')
+    args = parser.parse_args()
+
+    words = ' '.join(load_news_texts()).split()
+    analyzer = SentimentAnalyzer()
+    analyzer.warm_up()
+    print(f"{os.cpu_count()} CPUs, chunks of {args.chunk_chars or analyzer.document_chunk_chars} chars")
+
+    if args.workers > 1:
+        # Start the pool outside the timed region
+        analyzer.analyze_document(' '.join(words[:2000]), workers=args.workers, chunk_chars=args.chunk_chars)
+
+    for count in [int(value) for value in args.words.split(',')]:
+        # Shift the window per size so the sentiment cache never serves a repeat
+        text = ' '.join(words[count:count * 2])
+        whole, whole_time = timed(lambda: analyzer.analyze(text, source='news'))
+        chunked, chunked_time = timed(
+            lambda: analyzer.analyze_document(text, workers=0, chunk_chars=args.chunk_chars)
+        )
+        line = (f"{count:>6} words: whole {whole_time * 1000:8.1f} ms | chunked {chunked_time * 1000:7.1f} ms "
+                f"({whole_time / chunked_time:5.1f}x, {len(chunked.get('chunks', []))} chunks)")
+
+        if args.workers > 1:
+            _, pooled_time = timed(
+                lambda: analyzer.analyze_document(text, workers=args.workers, chunk_chars=args.chunk_chars)
+            )
+            line += f" | {args.workers} workers {pooled_time * 1000:7.1f} ms ({whole_time / pooled_time:5.1f}x)"
+
+        line += (f" | compound whole {whole['scores']['compound']:+.3f} chunked {chunked['scores']['compound']:+.3f}, "
+                 f"label {whole['sentiment_label']}/{chunked['sentiment_label']}")
+        print(line)
+
+    if analyzer._batch_runner is not None:
+        analyzer._batch_runner.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark near-duplicate result reuse during a collection burst
+
+Builds a burst from the distinct news articles in which a share of the
+documents are edited copies of earlier ones (a few words swapped, a
+byline appended), as syndicated or re-posted articles are. The burst is
+analyzed with the sentiment cache alone (exact matches only) and with the
+cache plus a MinHash/LSH NearDuplicateIndex. Reports time, how many
+results were reused, and how often a reused label differs from a fresh
+analysis.
+
+Usage (from the backend directory):
+    python -m benchmarks.near_duplicates [--duplicate-share 0.3] [--threshold 0.9]
+"""
+
+import argparse
+import logging
+import random
+import time
+
+from sentiment.analyzer import SentimentAnalyzer
+from sentiment.cache import SentimentCache
+from sentiment.dedup import NearDuplicateIndex
+from data.processors import DataProcessor
+from benchmarks.common import load_news_texts
+
+BYLINES = ('Reported by Bernama.', 'Additional reporting by staff.', 'Updated with comments.', 'Read more online.')
+
+
+def edited_copy(text: str, rng: random.Random) -> str:
+    """A copy of text with a few words replaced and a byline appended"""
+    words = text.split()
+    for _ in range(max(1, len(words) // 200)):
+        words[rng.randrange(len(words))] = rng.choice(words)
+    return ' '.join(words) + ' ' + rng.choice(BYLINES)
+
+
+def build_burst(duplicate_share: float, seed: int):
+    """Each distinct news article once, interleaved with edited copies of earlier ones"""
+    rng = random.Random(seed)
+    # news.json repeats some articles; keep one of each so only the copies are near-duplicates
+    originals = DataProcessor().deduplicate([{'id': index, 'combined_text': text}
+                                             for index, text in enumerate(load_news_texts())])
+    originals = [item['combined_text'] for item in originals]
+    copies = round(len(originals) * duplicate_share / (1 - duplicate_share))
+
+    burst = list(originals)
+    for _ in range(copies):
+        position = rng.randrange(1, len(burst) + 1)
+        source = rng.choice([text for text in burst[:position] if text in originals] or originals[:1])
+        burst.insert(position, edited_copy(source, rng))
+    return burst
+
+
+def run(burst, dedup_index):
+    analyzer = SentimentAnalyzer(cache=SentimentCache(max_entries=len(burst)), dedup_index=dedup_index)
+    analyzer.warm_up()
+    start = time.perf_counter()
+    results = [analyzer.analyze(text, source='news') for text in burst]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duplicate-share', type=float, default=0.3, help='share of edited copies')
+    parser.add_argument('--threshold', type=float, default=0.9, help='Jaccard similarity threshold')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    burst = build_burst(args.duplicate_share, args.seed)
+
+    exact, exact_time = run(burst, None)
+    index = NearDuplicateIndex(args.threshold)
+    near, near_time = run(burst, index)
+
+    reused = [position for position, result in enumerate(near) if 'near_duplicate_of' in result]
+    differing = sum(near[position]['sentiment_label'] != exact[position]['sentiment_label'] for position in reused)
+    compound_error = max((abs(near[position]['scores']['compound'] - exact[position]['scores']['compound'])
+                          for position in reused), default=0.0)
+
+    print(f"{len(burst)} documents, {args.duplicate_share:.0%} edited copies, "
+          f"threshold {args.threshold} ({index.bands} bands x {index.rows} rows)")
+    print(f"cache only        {exact_time:7.2f}s ({len(burst) / exact_time:7.1f} docs/sec)")
+    print(f"cache + MinHash   {near_time:7.2f}s ({len(burst) / near_time:7.1f} docs/sec, "
+          f"{exact_time / near_time:.2f}x), {len(reused)} results reused")
+    print(f"reused labels differing from a fresh analysis: {differing}, "
+          f"max compound difference {compound_error:.3f}")
+
+
+if __name__ == '__main__':
+    main()
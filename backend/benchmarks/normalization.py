@@ -0,0 +1,92 @@
+"""
+Benchmark the shared text normalizer on the news corpus
+
+Compares the previous normalization code paths against TextNormalizer:
+- DataProcessor.process_item text cleaning: four clean_text calls per item
+  (title, summary, content and the re-cleaned raw concatenation) versus
+  cleaning each field once and joining the results
+- SentimentAnalyzer._preprocess_text: five re.sub passes on string
+  patterns versus precompiled patterns gated on their required literals
+
+Usage (from the backend directory):
+    python -m benchmarks.normalization [--repeat N]
+"""
+
+import argparse
+import html
+import json
+import re
+import unicodedata
+
+from sentiment.normalizer import TextNormalizer
+from benchmarks.common import NEWS_PATH, print_comparison, time_per_document
+
+
+def legacy_clean_text(text: str) -> str:
+    """Previous DataProcessor.clean_text"""
+    if not text:
+        return ""
+    text = html.unescape(text)
+    text = unicodedata.normalize('NFKD', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def legacy_process_item_text(item: dict):
+    """Previous text handling in DataProcessor.process_item"""
+    content = item.get('content', '')
+    title = item.get('title', '')
+    summary = item.get('summary', item.get('description', ''))
+    cleaned = (legacy_clean_text(content), legacy_clean_text(title), legacy_clean_text(summary))
+    combined_text = f"{title} {summary} {content}".strip()
+    return cleaned, legacy_clean_text(combined_text)
+
+
+def process_item_text(item: dict):
+    """Current text handling in DataProcessor.process_item"""
+    content = TextNormalizer.clean(item.get('content', ''))
+    title = TextNormalizer.clean(item.get('title', ''))
+    summary = TextNormalizer.clean(item.get('summary', item.get('description', '')))
+    return (content, title, summary), TextNormalizer.join(title, summary, content)
+
+
+def legacy_preprocess_text(text: str) -> str:
+    """Previous SentimentAnalyzer._preprocess_text"""
+    text = text.lower()
+    text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '', text)
+    text = re.sub(r'(\+?6?01[0-46-9]-*[0-9]{7,8})', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    text = re.sub(r'[^\w\s\.\!\?\,\-]', ' ', text)
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='passes over the corpus (best is reported)')
+    args = parser.parse_args()
+    
+    with open(NEWS_PATH, 'r', encoding='utf-8') as f:
+        articles = json.load(f)
+    texts = [article.get('content', '') for article in articles if article.get('content')]
+    print(f"Corpus: {len(articles)} articles from dataset/news.json")
+    
+    for article in articles:
+        assert legacy_process_item_text(article) == process_item_text(article)
+    for text in texts:
+        assert legacy_preprocess_text(text) == TextNormalizer.for_analysis(text)
+    
+    print_comparison(
+        'process_item cleaning',
+        time_per_document(legacy_process_item_text, articles, args.repeat),
+        time_per_document(process_item_text, articles, args.repeat)
+    )
+    print_comparison(
+        'analysis preprocessing',
+        time_per_document(legacy_preprocess_text, texts, args.repeat),
+        time_per_document(TextNormalizer.for_analysis, texts, args.repeat)
+    )
+
+
+if __name__ == '__main__':
+    main()
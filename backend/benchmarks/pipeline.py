@@ -0,0 +1,92 @@
+"""
+Benchmark the lazy DataProcessor pipeline against the list-based stages
+
+Runs process_batch -> filter_by_relevance -> deduplicate ->
+sort_by_relevance[:k] and the equivalent DataProcessor.pipeline(top_k=k)
+over a lazily generated stream of news and survey items (synthetic items
+are resampled sentences, as in benchmarks.suite),
+reporting wall time, peak traced memory and the pipeline's per-stage
+counters, and checks both return the same items.
+
+Usage (from the backend directory):
+    python -m benchmarks.pipeline [--scale 20] [--top-k 100] [--dedup-window 10000]
+"""
+
+import argparse
+import logging
+import random
+import time
+import tracemalloc
+
+from data.processors import DataProcessor
+from sentiment.resources import SENTENCE_BOUNDARY_RE
+from benchmarks.suite import load_corpus
+
+
+def stream_corpus(corpus, scale, seed):
+    """Yield the corpus and synthetic items built like benchmarks.suite.scale_corpus, one at a time"""
+    rng = random.Random(seed)
+    sentences = {}
+    for item in corpus:
+        sentences.setdefault(item['source'], []).extend(
+            sentence for sentence in SENTENCE_BOUNDARY_RE.split(item['content']) if sentence.strip()
+        )
+
+    yield from (dict(item) for item in corpus)
+    for index in range(len(corpus) * (scale - 1)):
+        template = corpus[index % len(corpus)]
+        length = len(SENTENCE_BOUNDARY_RE.split(template['content']))
+        yield {
+            'id': f"synthetic_{index}",
+            'title': template['title'],
+            'content': ' '.join(rng.choices(sentences[template['source']], k=length)),
+            'source': template['source']
+        }
+
+
+def measure(run):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=int, default=20, help='corpus scale factor')
+    parser.add_argument('--top-k', type=int, default=100, help='items kept by the final ordering step')
+    parser.add_argument('--dedup-window', type=int, default=10000, help='unique items the pipeline compares against')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Per-item warnings (e.g. over-long articles) would drown the report
+    logging.basicConfig(level=logging.ERROR)
+    processor = DataProcessor()
+    corpus = load_corpus()
+    count = len(corpus) * max(1, args.scale)
+
+    def lists():
+        processed = processor.process_batch(list(stream_corpus(corpus, args.scale, args.seed)))
+        relevant = processor.filter_by_relevance(processed)
+        unique = processor.deduplicate(relevant)
+        return processor.sort_by_relevance(unique)[:args.top_k]
+
+    pipeline = processor.pipeline(stream_corpus(corpus, args.scale, args.seed), top_k=args.top_k,
+                                  dedup_window=args.dedup_window)
+    listed, list_time, list_peak = measure(lists)
+    streamed, stream_time, stream_peak = measure(lambda: list(pipeline))
+
+    print(f"{count} items, top {args.top_k}")
+    print(f"lists    {list_time:6.2f}s  peak {list_peak / 2 ** 20:7.1f} MiB")
+    print(f"pipeline {stream_time:6.2f}s  peak {stream_peak / 2 ** 20:7.1f} MiB")
+    for stage in pipeline.stats():
+        print(f"  {stage['name']:<12} in {stage['items_in']:>7}  out {stage['items_out']:>7}  {stage['seconds']:6.2f}s")
+    same = [item['id'] for item in listed] == [item['id'] for item in streamed]
+    print(f"same top {args.top_k}: {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark top-k relevance ranking in DataProcessor.sort_by_relevance
+
+Ranks synthetic candidates (housing keywords, published dates within the
+last 60 days in naive and UTC 'Z' form, engagement counts) with the
+previous full sort, whose key re-read the clock and re-parsed the date on
+every call, and with sort_by_relevance with and without top_k. Reports
+the time spent scoring alone so the remaining cost of the selection is
+visible.
+
+Usage (from the backend directory):
+    python -m benchmarks.relevance [--candidates 1000000] [--top-k 100]
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from data.processors import DataProcessor
+
+
+def legacy_sort_by_relevance(items):
+    """Previous DataProcessor.sort_by_relevance"""
+    def calculate_relevance(item):
+        score = 0
+        score += len(item.get('housing_keywords', [])) * 10
+        try:
+            published_date = datetime.fromisoformat(item.get('published_date', ''))
+            days_old = (datetime.now() - published_date).days
+            score += max(0, 30 - days_old)
+        except:
+            pass
+        engagement = item.get('engagement', {})
+        if isinstance(engagement, dict):
+            score += engagement.get('likes', 0) * 0.1
+            score += engagement.get('shares', 0) * 0.2
+            score += engagement.get('comments', 0) * 0.1
+        return score
+
+    return sorted(items, key=calculate_relevance, reverse=True)
+
+
+def make_candidates(count: int, seed: int):
+    rng = random.Random(seed)
+    now = datetime.now()
+    keywords = ['affordable housing', 'pr1ma', 'housing loan', 'property market']
+    candidates = []
+    for index in range(count):
+        published = now - timedelta(hours=rng.randrange(60 * 24))
+        if index % 4 == 0:
+            published_date = published.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        else:
+            published_date = published.isoformat()
+        candidates.append({
+            'id': index,
+            'housing_keywords': keywords[:rng.randrange(len(keywords) + 1)],
+            'published_date': published_date,
+            'engagement': {'likes': rng.randrange(200), 'shares': rng.randrange(50), 'comments': rng.randrange(80)}
+        })
+    return candidates
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--candidates', type=int, default=1000000, help='items to rank')
+    parser.add_argument('--top-k', type=int, default=100, help='items kept by top-k selection')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    processor = DataProcessor()
+    candidates = make_candidates(args.candidates, args.seed)
+    print(f"{args.candidates} candidates, top {args.top_k}")
+
+    _, legacy_time = timed(lambda: legacy_sort_by_relevance(candidates)[:args.top_k])
+    _, scan_time = timed(lambda: sum(1 for _ in processor._score_relevance(candidates, datetime.now())))
+    _, full_time = timed(lambda: processor.sort_by_relevance(candidates)[:args.top_k])
+    top, top_time = timed(lambda: processor.sort_by_relevance(candidates, top_k=args.top_k))
+
+    print(f"previous full sort      {legacy_time:6.2f}s")
+    print(f"scoring scan only       {scan_time:6.2f}s")
+    print(f"sort_by_relevance       {full_time:6.2f}s")
+    print(f"sort_by_relevance top-k {top_time:6.2f}s ({legacy_time / top_time:.1f}x vs previous, "
+          f"{top_time - scan_time:+.2f}s over the scan)")
+    print(f"best score {top[0]['relevance_score']:.1f}, {args.top_k}th {top[-1]['relevance_score']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
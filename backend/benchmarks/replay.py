@@ -0,0 +1,176 @@
+"""
+Benchmark collector throughput offline by replaying recorded HTTP exchanges
+
+Without --fixtures, first records a fixture file: NewsCollector runs
+against the local stand-in news sites of benchmarks.collectors and
+SocialMediaCollector against a stand-in Twitter search API, through a
+RecordTransport; the stand-ins are then shut down. With --fixtures, an
+existing recording (e.g. made with HTTP_TRANSPORT=record against the live
+sites) is replayed with the collectors' default sources instead.
+
+Then replays the fixtures through a ReplayTransport with the given latency
+and injected failures for each --workers count, reporting articles per
+second, the transport's counters and retries, and checks every replay
+returns what was recorded. The last worker count runs twice to show that
+injected failures, and so results, repeat exactly.
+
+Usage (from the backend directory):
+    python -m benchmarks.replay [--fixtures path.jsonl] [--workers 1,2,4,8] [--latency 0.1]
+        [--error-rate 0.1] [--connection-error-rate 0.05] [--rate 0] [--seed 0]
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from data.collectors import NewsCollector, SocialMediaCollector
+from data.http_client import HostPolicy, HttpClient
+from data.transport import RecordTransport, ReplayTransport
+from benchmarks.collectors import KEYWORDS, make_handler
+
+HASHTAGS = ['PR1MA', 'RumahMampu']
+
+
+class TwitterStandInHandler(BaseHTTPRequestHandler):
+    """Recent-search responses built from SocialMediaCollector's demo posts"""
+
+    def do_GET(self):
+        demo = SocialMediaCollector(http_client=HttpClient())._get_demo_twitter_posts()
+        tweets = [
+            {
+                'id': str(1000 + index),
+                'text': post['content'],
+                'author_id': str(index),
+                'created_at': post['posted_date'],
+                'public_metrics': {'like_count': post['engagement']['likes'],
+                                   'retweet_count': post['engagement']['retweets'],
+                                   'reply_count': post['engagement']['replies']}
+            }
+            for index, post in enumerate(demo)
+        ]
+        users = [{'id': str(index), 'username': post['author'], 'name': post['author_name']}
+                 for index, post in enumerate(demo)]
+        payload = json.dumps({'data': tweets, 'includes': {'users': users},
+                              'meta': {'newest_id': tweets[-1]['id'], 'result_count': len(tweets)}}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def article_keys(articles):
+    return sorted((article['source'], article['url'], article['content']) for article in articles)
+
+
+def post_keys(posts):
+    return sorted((post['id'], post['author'], post['content']) for post in posts)
+
+
+def record(path, hosts, entries):
+    """Record news and Twitter collection from local stand-ins; returns sources and what was collected"""
+    servers = [ThreadingHTTPServer(('127.0.0.1', 0), make_handler(entries, 0.02, 0.0, index))
+               for index in range(hosts)]
+    twitter = ThreadingHTTPServer(('127.0.0.1', 0), TwitterStandInHandler)
+    for server in servers + [twitter]:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    sources = {
+        f"site_{index}": {
+            'rss_url': f"http://127.0.0.1:{server.server_address[1]}/rss.xml",
+            'base_url': f"http://127.0.0.1:{server.server_address[1]}",
+            'name': f"Site {index}"
+        }
+        for index, server in enumerate(servers)
+    }
+    twitter_url = f"http://127.0.0.1:{twitter.server_address[1]}/2"
+
+    try:
+        transport = RecordTransport(path)
+        client = HttpClient(HostPolicy(rate=0), transport=transport)
+        collector = NewsCollector(http_client=client)
+        collector.sources = sources
+        articles = collector.collect_articles(KEYWORDS, limit=hosts * entries)
+        social = SocialMediaCollector(http_client=client)
+        social.twitter_api_url = twitter_url
+        posts = social.collect_posts('twitter', HASHTAGS)
+    finally:
+        for server in servers + [twitter]:
+            server.shutdown()
+    print(f"recorded {transport.stats()['recorded']} exchanges to {path} from {hosts} stand-in sites "
+          f"and a stand-in Twitter API")
+    return sources, twitter_url, articles, posts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fixtures', help='recorded JSON-lines fixtures to replay (default: record new ones)')
+    parser.add_argument('--hosts', type=int, default=4, help='stand-in news sites to record from')
+    parser.add_argument('--entries', type=int, default=12, help='feed entries per stand-in site')
+    parser.add_argument('--workers', default='1,2,4,8', help='comma-separated NewsCollector pool sizes')
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds per replayed response (-1: recorded)')
+    parser.add_argument('--error-rate', type=float, default=0.1, help='share of attempts answered 503')
+    parser.add_argument('--connection-error-rate', type=float, default=0.05, help='share of attempts failing to connect')
+    parser.add_argument('--rate', type=float, default=0, help='requests per second per host (0: unlimited)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    os.environ.pop('NEWSAPI_KEY', None)
+    os.environ.setdefault('TWITTER_BEARER_TOKEN', 'replay')
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.fixtures:
+            path, sources, twitter_url, expected_articles, expected_posts = args.fixtures, None, None, None, None
+        else:
+            path = os.path.join(directory, 'http.jsonl')
+            sources, twitter_url, expected_articles, expected_posts = record(path, args.hosts, args.entries)
+
+        def replay(workers):
+            transport = ReplayTransport(path, latency=None if args.latency < 0 else args.latency,
+                                        error_rate=args.error_rate,
+                                        connection_error_rate=args.connection_error_rate, seed=args.seed)
+            client = HttpClient(HostPolicy(rate=args.rate, burst=1, pool_size=workers), transport=transport,
+                                backoff_base=0.05)
+            collector = NewsCollector(max_workers=workers, http_client=client)
+            if sources is not None:
+                collector.sources = sources
+            social = SocialMediaCollector(http_client=client)
+            if twitter_url is not None:
+                social.twitter_api_url = twitter_url
+            start = time.perf_counter()
+            articles = collector.collect_articles(KEYWORDS, limit=10000)
+            elapsed = time.perf_counter() - start
+            posts = social.collect_posts('twitter', HASHTAGS)
+            retries = sum(stats['retries'] for stats in client.stats().values())
+            return articles, posts, elapsed, transport.stats(), retries
+
+        latency = 'recorded latency' if args.latency < 0 else f"{args.latency * 1000:.0f} ms latency"
+        print(f"replaying with {latency}, {args.error_rate:.0%} 503s, "
+              f"{args.connection_error_rate:.0%} connection errors, seed {args.seed}")
+        worker_counts = [int(value) for value in args.workers.split(',')]
+        runs = []
+        for workers in worker_counts + worker_counts[-1:]:
+            articles, posts, elapsed, stats, retries = replay(workers)
+            runs.append((article_keys(articles), post_keys(posts), stats))
+            print(f"  {workers:>2} workers  {elapsed:6.2f}s  {len(articles) / elapsed:7.1f} articles/s  "
+                  f"{len(articles)} articles  {len(posts)} posts  {retries:>3} retries  "
+                  f"served {stats['served']}  503 {stats['errors']}  "
+                  f"connect {stats['connection_errors']}  missing {stats['missing']}")
+
+        if expected_articles is not None:
+            same = all(keys == article_keys(expected_articles) and posts == post_keys(expected_posts)
+                       for keys, posts, _ in runs)
+            print(f"every replay matches the recording: {same}")
+        print(f"repeat run identical (results and injected failures): {runs[-1] == runs[-2]}")
+
+
+if __name__ == '__main__':
+    main()
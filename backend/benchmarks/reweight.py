@@ -0,0 +1,102 @@
+"""
+Benchmark bulk re-weighting of stored sentiment results
+
+Fills a temporary SQLite database with synthetic sentiment results
+(component scores drawn with a seeded RNG, a third of them without
+TextBlob as in cascade mode), re-weights the whole table with
+DatabaseManager.reweight_sentiment_results and checks a sample of rows
+against SentimentAnalyzer._combine_scores and _determine_sentiment.
+
+Usage (from the backend directory):
+    python -m benchmarks.reweight [--rows N] [--weights vader=0.5,textblob=0.2,housing=0.3]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from database.manager import COMPONENT_SCORERS, DatabaseManager
+from sentiment.analyzer import SentimentAnalyzer
+
+
+def synthetic_scores(rng: random.Random, with_textblob: bool):
+    """Random per-scorer scores shaped like analyzer output"""
+    scores = {}
+    for scorer in COMPONENT_SCORERS:
+        if scorer == 'textblob' and not with_textblob:
+            scores['textblob'] = None
+            continue
+        compound = rng.uniform(-1, 1)
+        positive, negative = max(compound, 0.0), max(-compound, 0.0)
+        scores['housing_context' if scorer == 'housing' else scorer] = {
+            'compound': compound, 'positive': positive, 'negative': negative,
+            'neutral': 1 - (positive + negative)
+        }
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000, help='sentiment results in the table')
+    parser.add_argument('--weights', default='vader=0.5,textblob=0.2,housing=0.3', help='new combine weights')
+    parser.add_argument('--sample', type=int, default=1000, help='rows checked against the analyzer')
+    args = parser.parse_args()
+
+    analyzer = SentimentAnalyzer()
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['DB_TYPE'] = 'sqlite'
+        os.environ['DB_PATH'] = os.path.join(directory, 'reweight.db')
+        db_manager = DatabaseManager()
+
+        start = time.perf_counter()
+        analyzed_at = datetime.utcnow().isoformat()
+        batch = []
+        for index in range(args.rows):
+            scores = synthetic_scores(rng, with_textblob=index % 3 != 0)
+            combined = analyzer._combine_scores(scores['vader'], scores['textblob'], scores['housing_context'])
+            label, confidence = analyzer._determine_sentiment(combined)
+            batch.append({
+                'text': f"document {index}", 'source': 'benchmark', 'sentiment_label': label,
+                'confidence': confidence, 'scores': {**combined, **scores}, 'analyzed_at': analyzed_at
+            })
+            if len(batch) == 50000:
+                db_manager.store_sentiment_results(batch)
+                batch = []
+        db_manager.store_sentiment_results(batch)
+        print(f"Loaded {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+        weights = analyzer.set_combine_weights(dict(pair.split('=', 1) for pair in args.weights.split(',')))
+        start = time.perf_counter()
+        updated = db_manager.reweight_sentiment_results(weights, analyzer.sentiment_thresholds)
+        elapsed = time.perf_counter() - start
+        print(f"Re-weighted {updated} rows to {weights} in {elapsed:.2f}s ({updated / elapsed:,.0f} rows/sec)")
+
+        # Compare a random sample with the analyzer's own blending
+        rng = random.Random(1)
+        columns = ', '.join(f"{scorer}_{key}" for scorer in COMPONENT_SCORERS
+                            for key in ('compound', 'positive', 'negative', 'neutral'))
+        mismatches = 0
+        with db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            for row_id in rng.sample(range(1, args.rows + 1), min(args.sample, args.rows)):
+                cursor.execute(f'SELECT sentiment_label, confidence, compound_score, {columns} '
+                               f'FROM sentiment_results WHERE id = ?', (row_id,))
+                row = cursor.fetchone()
+                components = {
+                    scorer: None if row[f"{scorer}_compound"] is None else
+                    {key: row[f"{scorer}_{key}"] for key in ('compound', 'positive', 'negative', 'neutral')}
+                    for scorer in COMPONENT_SCORERS
+                }
+                combined = analyzer._combine_scores(components['vader'], components['textblob'], components['housing'])
+                expected = (*analyzer._determine_sentiment(combined), combined['compound'])
+                mismatches += expected != (row['sentiment_label'], row['confidence'], row['compound_score'])
+        print(f"Sampled {min(args.sample, args.rows)} rows: {mismatches} differ from the analyzer")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark SentimentAnalyzer startup latency
+
+Each measurement runs in a fresh interpreter so import and resource
+loading costs are not hidden by an earlier run. Reports the time to import
+the analyzer module, construct a SentimentAnalyzer, and return the first
+analyze() result, with and without an explicit warm_up() beforehand.
+
+Usage (from the backend directory):
+    python -m benchmarks.startup [--repeat N]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+from benchmarks.common import BACKEND_DIR
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from sentiment.analyzer import SentimentAnalyzer
+imported = time.perf_counter()
+analyzer = SentimentAnalyzer()
+constructed = time.perf_counter()
+warm = 0.0
+if sys.argv[1] == 'warm':
+    analyzer.warm_up()
+    warm = time.perf_counter() - constructed
+    constructed = time.perf_counter()
+analyzer.analyze('Harga rumah PR1MA di Selangor semakin mampu milik. Affordable housing is welcome!')
+done = time.perf_counter()
+print(json.dumps({
+    'import': imported - start,
+    'init': constructed - imported - warm,
+    'warm_up': warm,
+    'first_analyze': done - constructed,
+}))
+"""
+
+
+def run_probe(variant: str) -> dict:
+    """Run one startup measurement in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, variant],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='fresh interpreters per variant (best is reported)')
+    args = parser.parse_args()
+
+    for variant in ('cold', 'warm'):
+        runs = [run_probe(variant) for _ in range(args.repeat)]
+        best = min(runs, key=lambda run: sum(run.values()))
+        total = sum(best.values())
+        print(f"{variant:>5}: import {best['import'] * 1000:7.1f} ms | "
+              f"init {best['init'] * 1000:7.1f} ms | "
+              f"warm_up {best['warm_up'] * 1000:7.1f} ms | "
+              f"first analyze {best['first_analyze'] * 1000:7.1f} ms | "
+              f"total {total * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
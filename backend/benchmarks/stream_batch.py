@@ -0,0 +1,106 @@
+"""
+Benchmark the streaming NDJSON sentiment endpoint
+
+Posts N items to /api/sentiment/stream through the WSGI app. The
+request body is generated lazily and the response is consumed line by
+line, so the traced peak memory reflects the server side only. Peak
+memory should stay flat as N grows.
+
+Usage (from the backend directory):
+    python -m benchmarks.stream_batch [--items N [N ...]]
+"""
+
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from werkzeug.test import EnvironBuilder
+
+from benchmarks.common import load_news_texts
+
+
+class NDJSONBody(io.RawIOBase):
+    """Readable request body that renders NDJSON lines on demand"""
+
+    def __init__(self, texts, count: int):
+        self.texts = texts
+        self.count = count
+        self.index = 0
+        self.pending = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.pending and self.index < self.count:
+            item = {'id': f"item_{self.index}", 'text': self.texts[self.index % len(self.texts)]}
+            self.pending = (json.dumps(item) + '\n').encode('utf-8')
+            self.index += 1
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+    def content_length(self) -> int:
+        return sum(
+            len((json.dumps({'id': f"item_{index}", 'text': self.texts[index % len(self.texts)]}) + '\n')
+                .encode('utf-8'))
+            for index in range(self.count)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, nargs='+', default=[1000, 4000], help='batch sizes to post')
+    args = parser.parse_args()
+    
+    os.environ.setdefault('DB_PATH', os.path.join(tempfile.mkdtemp(), 'stream_benchmark.db'))
+    os.environ.setdefault('SENTIMENT_CACHE_PERSIST', 'false')
+    import app as server
+    
+    # Use short texts (article titles) so scoring is cheap enough to run large batches
+    texts = [text.split('.')[0][:200] for text in load_news_texts()]
+    
+    def make_environ(count: int) -> dict:
+        body = NDJSONBody(texts, count)
+        environ = EnvironBuilder('/api/sentiment/stream', method='POST',
+                                 content_type='application/x-ndjson').get_environ()
+        environ['wsgi.input'] = io.BufferedReader(body)
+        environ['CONTENT_LENGTH'] = str(body.content_length())
+        return environ
+    
+    def post(environ: dict):
+        return server.app.wsgi_app(environ, lambda status, headers, exc_info=None: None)
+    
+    # Load NLP resources and fill the result cache before measuring
+    server.sentiment_analyzer.warm_up()
+    for _ in post(make_environ(len(texts))):
+        pass
+    
+    for count in args.items:
+        environ = make_environ(count)
+        tracemalloc.start()
+        start = time.perf_counter()
+        first_line = None
+        lines = 0
+        response = post(environ)
+        for chunk in response:
+            lines += chunk.count(b'\n')
+            if first_line is None:
+                first_line = time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        response.close()
+        
+        print(f"{count:>7} items: {elapsed:6.2f}s ({count / elapsed:7.0f} items/s), "
+              f"first result after {first_line * 1000:6.1f} ms, peak {peak / 1024 / 1024:6.1f} MiB, "
+              f"{lines} lines out")
+
+
+if __name__ == '__main__':
+    main()
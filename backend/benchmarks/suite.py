@@ -0,0 +1,263 @@
+"""
+Sentiment throughput benchmark suite
+
+Measures docs/sec and p50/p95/p99 per-document latency for:
+- analyze: SentimentAnalyzer.analyze, one document per call
+- analyze_batch: SentimentAnalyzer.analyze_batch in batches of --batch-size
+- wordcloud: SentimentAnalyzer.generate_wordcloud_data over batches of texts
+- process_batch: DataProcessor.process_batch over batches of items
+
+The corpus is dataset/news.json plus the survey's free-text answers. Scale
+factors above 1 add synthetic documents built from corpus sentences with a
+seeded RNG, so a 10x or 100x run has realistic vocabulary and is identical
+between runs. For batched workloads the latency of a document is its
+batch's time divided by the batch size.
+
+Results are written as JSON (--output). Passing a previous result file as
+--baseline compares each workload and exits with status 1 when throughput
+drops or p95 latency grows by more than --threshold percent.
+
+Usage (from the backend directory):
+    python -m benchmarks.suite [--scales 1,10,100] [--workloads analyze,wordcloud]
+        [--output results.json] [--baseline baseline.json] [--threshold 10]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from sentiment.analyzer import SentimentAnalyzer
+from sentiment.resources import SENTENCE_BOUNDARY_RE
+from data.processors import DataProcessor
+from benchmarks.common import BACKEND_DIR, NEWS_PATH, load_survey_texts
+
+WORKLOADS = ('analyze', 'analyze_batch', 'wordcloud', 'process_batch')
+PERCENTILES = (50, 95, 99)
+
+
+def load_corpus() -> List[Dict]:
+    """News articles and survey responses as DataProcessor-style items"""
+    with open(NEWS_PATH, 'r', encoding='utf-8') as f:
+        articles = json.load(f)
+
+    corpus = [
+        {
+            'id': f"news_{index}",
+            'title': article.get('title', ''),
+            'content': article.get('content', ''),
+            'source': 'news'
+        }
+        for index, article in enumerate(articles) if article.get('content')
+    ]
+    corpus.extend(
+        {'id': f"survey_{index}", 'title': '', 'content': text, 'source': 'survey'}
+        for index, text in enumerate(load_survey_texts())
+    )
+    return corpus
+
+
+def scale_corpus(corpus: List[Dict], scale: int, seed: int) -> List[Dict]:
+    """
+    Grow the corpus to ``scale`` times its size
+
+    Each synthetic document follows an original one (cycling through the
+    corpus) and keeps its source and sentence count, with sentences drawn
+    at random from documents of the same source.
+    """
+    if scale <= 1:
+        return list(corpus)
+
+    rng = random.Random(seed)
+    sentences = {}
+    titles = {}
+    for item in corpus:
+        sentences.setdefault(item['source'], []).extend(
+            sentence for sentence in SENTENCE_BOUNDARY_RE.split(item['content']) if sentence.strip()
+        )
+        if item['title']:
+            titles.setdefault(item['source'], []).append(item['title'])
+
+    scaled = list(corpus)
+    for index in range(len(corpus) * (scale - 1)):
+        template = corpus[index % len(corpus)]
+        source = template['source']
+        length = len(SENTENCE_BOUNDARY_RE.split(template['content']))
+        scaled.append({
+            'id': f"synthetic_{index}",
+            'title': rng.choice(titles[source]) if source in titles else '',
+            'content': ' '.join(rng.choices(sentences[source], k=length)),
+            'source': source
+        })
+    return scaled
+
+
+def document_text(item: Dict) -> str:
+    return f"{item['title']} {item['content']}".strip()
+
+
+def run_workload(name: str, items: List[Dict], batch_size: int, mode: Optional[str]) -> List[float]:
+    """
+    Run one workload over the items
+
+    Returns:
+        Per-document latencies in seconds
+    """
+    analyzer = SentimentAnalyzer(mode=mode)
+    analyzer.warm_up()
+    texts = [document_text(item) for item in items]
+
+    if name == 'analyze':
+        run, units, batch_size = (lambda chunk: analyzer.analyze(chunk[0])), texts, 1
+    elif name == 'analyze_batch':
+        units = [{'id': item['id'], 'text': text} for item, text in zip(items, texts)]
+        run = analyzer.analyze_batch
+    elif name == 'wordcloud':
+        run, units = analyzer.generate_wordcloud_data, texts
+    else:
+        processor = DataProcessor()
+        run, units = processor.process_batch, items
+
+    # Untimed call so lazily built resources are loaded before timing
+    run(units[:batch_size])
+    return time_batches(run, units, batch_size)
+
+
+def time_batches(run: Callable[[List], object], units: List, batch_size: int) -> List[float]:
+    """Time ``run`` over consecutive batches and spread each batch's time over its documents"""
+    latencies = []
+    for start in range(0, len(units), batch_size):
+        chunk = units[start:start + batch_size]
+        began = time.perf_counter()
+        run(chunk)
+        latencies.extend([(time.perf_counter() - began) / len(chunk)] * len(chunk))
+    return latencies
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    values = np.asarray(latencies)
+    seconds = float(values.sum())
+    return {
+        'docs': len(latencies),
+        'seconds': seconds,
+        'docs_per_sec': len(latencies) / seconds if seconds else 0.0,
+        **{f"p{percent}_ms": float(np.percentile(values, percent)) * 1000 for percent in PERCENTILES}
+    }
+
+
+def environment() -> Dict:
+    """Machine and revision the results were produced on"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """
+    Compare results with a baseline run
+
+    Returns:
+        Descriptions of the regressions beyond ``threshold`` percent
+    """
+    regressions = []
+    limit = threshold / 100
+
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            print(f"{key:<22} no baseline")
+            continue
+
+        throughput = current['docs_per_sec'] / previous['docs_per_sec'] - 1 if previous['docs_per_sec'] else 0.0
+        latency = current['p95_ms'] / previous['p95_ms'] - 1 if previous['p95_ms'] else 0.0
+        flags = []
+        if throughput < -limit:
+            flags.append(f"throughput {throughput:+.1%}")
+        if latency > limit:
+            flags.append(f"p95 {latency:+.1%}")
+
+        status = 'REGRESSION ' + ', '.join(flags) if flags else 'ok'
+        print(f"{key:<22} docs/sec {throughput:+7.1%}  p95 {latency:+7.1%}  {status}")
+        if flags:
+            regressions.append(f"{key}: {', '.join(flags)}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workloads', default=','.join(WORKLOADS), help='comma-separated workloads to run')
+    parser.add_argument('--scales', default='1,10,100', help='comma-separated corpus scale factors')
+    parser.add_argument('--batch-size', type=int, default=100, help='documents per call for batched workloads')
+    parser.add_argument('--mode', choices=('full', 'cascade'), help='analysis mode (default: SENTIMENT_MODE)')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per workload (fastest is reported)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for synthetic scale-ups')
+    parser.add_argument('--output', help='write results JSON to this path')
+    parser.add_argument('--baseline', help='results JSON of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=10.0, help='regression threshold in percent')
+    args = parser.parse_args()
+
+    # Per-item warnings (e.g. over-long articles) would drown the report
+    logging.basicConfig(level=logging.ERROR)
+
+    workloads = [name.strip() for name in args.workloads.split(',')]
+    unknown = [name for name in workloads if name not in WORKLOADS]
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(unknown)}")
+    scales = [int(scale) for scale in args.scales.split(',')]
+
+    corpus = load_corpus()
+    print(f"Corpus: {len(corpus)} documents (news.json + survey answers), {os.cpu_count()} CPUs")
+
+    results = {}
+    for scale in scales:
+        items = scale_corpus(corpus, scale, args.seed)
+        for name in workloads:
+            runs = [summarize(run_workload(name, items, args.batch_size, args.mode)) for _ in range(args.repeat)]
+            summary = min(runs, key=lambda run: run['seconds'])
+            results[f"{name}@{scale}x"] = summary
+            print(f"{name + '@' + str(scale) + 'x':<22} {summary['docs']:>7} docs  "
+                  f"{summary['docs_per_sec']:9.1f} docs/sec  p50 {summary['p50_ms']:8.3f} ms  "
+                  f"p95 {summary['p95_ms']:8.3f} ms  p99 {summary['p99_ms']:8.3f} ms")
+
+    report = {
+        'environment': environment(),
+        'settings': {key: getattr(args, key) for key in ('batch_size', 'mode', 'repeat', 'seed')},
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.baseline} (threshold {args.threshold:g}%):")
+        regressions = compare(results, baseline['results'], args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:g}%")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark shared tokenization in SentimentAnalyzer.analyze
+
+Compares the per-document cost of tokenizing the cleaned text once for all
+scorers and extractors against the previous behaviour, where the housing
+context scorer, keyword extractor, relevance scorer and region extractor
+each ran ``word_tokenize`` on their own.
+
+Usage (from the backend directory):
+    python -m benchmarks.tokenization [--repeat N]
+"""
+
+import argparse
+
+from sentiment.analyzer import AnalysisContext, SentimentAnalyzer
+from sentiment.phrase_matcher import PhraseMatcher
+from benchmarks.common import load_news_texts, print_comparison, time_per_document
+
+
+def analyze_with_repeated_tokenization(analyzer: SentimentAnalyzer, text: str):
+    """Reproduce the old pipeline: one tokenization per consumer"""
+    cleaned_text = analyzer._preprocess_text(text)
+    
+    vader_scores = analyzer._analyze_vader(cleaned_text)
+    textblob_scores = analyzer._analyze_textblob(cleaned_text)
+    housing_scores = analyzer._analyze_housing_context(AnalysisContext.from_text(cleaned_text))
+    combined_scores = analyzer._combine_scores(vader_scores, textblob_scores, housing_scores)
+    
+    keywords = analyzer._extract_keywords(AnalysisContext.from_text(cleaned_text))
+    analyzer._calculate_housing_relevance(AnalysisContext.from_text(cleaned_text), keywords)
+    analyzer._extract_region(AnalysisContext.from_text(cleaned_text))
+    analyzer._extract_program(AnalysisContext(cleaned_text, [], set(), PhraseMatcher.tokenize(cleaned_text)))
+    
+    return analyzer._determine_sentiment(combined_scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='passes over the corpus (best is reported)')
+    args = parser.parse_args()
+    
+    analyzer = SentimentAnalyzer()
+    documents = load_news_texts()
+    print(f"Corpus: {len(documents)} articles from dataset/news.json")
+    
+    # Warm up lazily loaded lexicons before timing
+    analyzer.analyze(documents[0])
+    
+    before = time_per_document(
+        lambda text: analyze_with_repeated_tokenization(analyzer, text), documents, args.repeat
+    )
+    after = time_per_document(analyzer.analyze, documents, args.repeat)
+    print_comparison('analyze', before, after)
+    
+    cleaned = [analyzer._preprocess_text(text) for text in documents]
+    tokenize_before = time_per_document(
+        lambda text: [AnalysisContext.from_text(text) for _ in range(4)], cleaned, args.repeat
+    )
+    tokenize_after = time_per_document(AnalysisContext.from_text, cleaned, args.repeat)
+    print_comparison('tokenization only', tokenize_before, tokenize_after)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark word cloud term counting
+
+Compares WordCloudEngine against the previous generate_wordcloud_data,
+which rebuilt the stopword set on every call, tokenized the whole corpus
+with word_tokenize and stemmed every token occurrence. Input is every
+article in dataset/news.json (title + content) plus the survey free-text
+answers, as served by /api/analytics/wordcloud?type=all.
+
+Usage (from the backend directory):
+    python -m benchmarks.wordcloud [--repeat N] [--max-words N]
+"""
+
+import argparse
+import string
+import time
+from collections import Counter
+
+from sentiment import resources
+from sentiment.wordcloud import CUSTOM_STOPWORDS, HOUSING_BOOST_TERMS, WordCloudEngine
+from data.dataset_analyzer import DatasetAnalyzer
+from benchmarks.common import NEWS_PATH
+
+SURVEY_TEXT_COLUMNS = [
+    'What challenges have you faced (or expect to face) when trying to access affordable housing? (Select all that apply)',
+    'In your opinion, what is the biggest weakness in Malaysia\'s current affordable housing policies?',
+    'What improvements would you like to see in future housing policies?'
+]
+
+
+def legacy_generate_wordcloud_data(texts, max_words=100):
+    """The previous implementation: per-occurrence tokenizing and stemming"""
+    all_text = ' '.join(texts).lower()
+    cleaned_text = all_text.translate(str.maketrans('', '', string.punctuation + string.digits))
+    words = resources.word_tokenize(cleaned_text)
+    
+    stop_words = set(resources.get_english_stopwords())
+    stop_words.update(set(CUSTOM_STOPWORDS))
+    
+    filtered_words = [
+        word for word in words
+        if len(word) > 3 and word not in stop_words and word.isalpha() and not word.isdigit()
+    ]
+    
+    from nltk.stem import PorterStemmer
+    stemmer = PorterStemmer()
+    top_words = dict(Counter(stemmer.stem(word) for word in filtered_words).most_common(max_words))
+    
+    for word in top_words:
+        if any(keyword in word for keyword in HOUSING_BOOST_TERMS):
+            top_words[word] = int(top_words[word] * 1.5)
+    
+    return top_words
+
+
+def load_texts():
+    """News articles plus survey answers, as the word cloud endpoint collects them"""
+    import json
+    with open(NEWS_PATH, 'r', encoding='utf-8') as f:
+        texts = [(article.get('title', '') + ' ' + article.get('content', '')).strip() for article in json.load(f)]
+    
+    df = DatasetAnalyzer().df
+    for column in SURVEY_TEXT_COLUMNS:
+        if df is not None and column in df.columns:
+            responses = df[column].dropna()
+            texts.extend(responses[responses != ''].tolist())
+    
+    return [text for text in texts if text]
+
+
+def best_time(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='runs per variant (best is reported)')
+    parser.add_argument('--max-words', type=int, default=100, help='words returned')
+    args = parser.parse_args()
+    
+    texts = load_texts()
+    print(f"Corpus: {len(texts)} texts, {sum(len(text) for text in texts) / 1024:.0f} KiB")
+    
+    engine = WordCloudEngine()
+    legacy = legacy_generate_wordcloud_data(texts, args.max_words)
+    cold_start = time.perf_counter()
+    current = engine.generate(texts, args.max_words)
+    cold = time.perf_counter() - cold_start
+    print(f"Identical output: {legacy == current}")
+    
+    before = best_time(lambda: legacy_generate_wordcloud_data(texts, args.max_words), args.repeat)
+    after = best_time(lambda: engine.generate(texts, args.max_words), args.repeat)
+    fresh = best_time(lambda: WordCloudEngine().generate(texts, args.max_words), args.repeat)
+    
+    print(f"before: {before * 1000:8.1f} ms")
+    print(f"after (empty memo): {fresh * 1000:8.1f} ms ({before / fresh:.1f}x), first call {cold * 1000:.1f} ms")
+    print(f"after (warm memo):  {after * 1000:8.1f} ms ({before / after:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
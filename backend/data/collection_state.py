@@ -0,0 +1,106 @@
+"""
+Incremental Collection State for HomeWatch Collectors
+
+Per-source high-water marks persisted through DatabaseManager, so a
+collection run only handles entries that appeared since the previous run:
+- last_published: publish time up to which the source has been handled
+- seen_ids: ids handled within the overlap before that mark, so entries
+  sharing or straddling the mark are not collected twice
+- cursor: an API cursor token (e.g. Twitter's newest_id)
+
+Entries are filtered by the search terms (keywords, hashtags) of a run, so
+state is kept per source and term set (see state_key): a run with other
+terms starts from the full window instead of skipping entries that were
+only examined, and dropped, for different terms.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_SEEN_IDS = 1000
+
+
+def state_key(source: str, terms: Iterable[str]) -> str:
+    """Key of a source's state for a set of search terms, e.g. 'rss:thestar:1a2b3c4d5e6f'"""
+    normalized = '\n'.join(sorted({term.strip().lower() for term in terms}))
+    return f"{source}:{hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12]}"
+
+
+@dataclass
+class SourceState:
+    """High-water mark of one source, plus the entries examined in the current run"""
+    source: str
+    last_published: Optional[datetime] = None
+    seen_ids: Dict[str, str] = field(default_factory=dict)
+    cursor: Optional[str] = None
+    examined: Dict[str, datetime] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def load(cls, db_manager, source: str) -> 'SourceState':
+        """Saved state of a source, or an empty one (full window) if none or on error"""
+        try:
+            saved = db_manager.get_collection_state(source)
+        except Exception as e:
+            logger.warning(f"Could not load collection state for {source}: {str(e)}")
+            saved = None
+        if not saved:
+            return cls(source)
+        return cls(source, saved['last_published'], dict(saved['seen_ids']), saved['cursor'])
+
+    def save(self, db_manager):
+        try:
+            db_manager.save_collection_state(self.source, self.last_published, self.seen_ids, self.cursor)
+        except Exception as e:
+            logger.warning(f"Could not save collection state for {self.source}: {str(e)}")
+
+    def window_start(self, cutoff: datetime, overlap: timedelta) -> datetime:
+        """Oldest publish time worth examining: the cutoff, or the mark less the overlap"""
+        if self.last_published is None:
+            return cutoff
+        return max(cutoff, self.last_published - overlap)
+
+    def is_new(self, entry_id: str) -> bool:
+        return entry_id not in self.seen_ids
+
+    def examine(self, entry_id: str, published: datetime):
+        """Record an entry handled in this run, whether or not it was kept"""
+        self.examined[entry_id] = published
+
+    def advance(self, pending: Iterable[str], overlap: timedelta, max_seen: int = MAX_SEEN_IDS):
+        """
+        Move the mark past the entries examined in this run
+
+        Args:
+            pending: Examined ids that were not handed to the caller (e.g.
+                cut by a limit); the mark stays low enough for the next run
+                to examine them again
+            overlap: How far before the mark entries are still examined
+            max_seen: Most ids kept, newest first
+        """
+        pending = {entry_id for entry_id in pending if entry_id in self.examined}
+        handled = {entry_id: published for entry_id, published in self.examined.items() if entry_id not in pending}
+
+        if pending:
+            mark = min(self.examined[entry_id] for entry_id in pending)
+        else:
+            marks = list(handled.values())
+            if self.last_published is not None:
+                marks.append(self.last_published)
+            mark = max(marks, default=None)
+
+        seen = dict(self.seen_ids)
+        seen.update((entry_id, published.isoformat()) for entry_id, published in handled.items())
+        if mark is not None:
+            floor = (mark - overlap).isoformat()
+            seen = {entry_id: published for entry_id, published in seen.items() if published >= floor}
+        if len(seen) > max_seen:
+            seen = dict(sorted(seen.items(), key=lambda item: item[1], reverse=True)[:max_seen])
+
+        self.last_published = mark
+        self.seen_ids = seen
+        self.examined = {}
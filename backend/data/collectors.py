@@ -8,16 +8,19 @@ Collects data from various sources:
 - Forum discussions
 """
 
-import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import zip_longest
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-import time
 import json
 import os
 from urllib.parse import quote_plus
 import feedparser
-from bs4 import BeautifulSoup
+
+from data.collection_state import SourceState, state_key
+from data.extraction import ArticleExtractor
+from data.http_client import HttpClient, get_shared_client
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +29,29 @@ class NewsCollector:
     Collects and processes news articles related to Malaysian housing
     """
     
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, http_client: Optional[HttpClient] = None,
+                 db_manager=None):
+        """
+        Args:
+            max_workers: Feeds and article pages fetched concurrently
+                (default: NEWS_COLLECTOR_WORKERS or 8)
+            http_client: HttpClient enforcing per-host rate limits and
+                connection pools (default: the shared client)
+            db_manager: Optional DatabaseManager keeping per-source
+                high-water marks; with it, each run only collects entries
+                that are new since the previous run
+        """
+        if max_workers is None:
+            max_workers = int(os.getenv('NEWS_COLLECTOR_WORKERS', '8'))
+        self.max_workers = max(1, max_workers)
+        self.http = http_client or get_shared_client()
+        # Article pages validated this recently are not refetched at all
+        self.article_cache_ttl = float(os.getenv('NEWS_ARTICLE_CACHE_TTL', 24 * 3600))
+        self.extractor = ArticleExtractor()
+        self.db_manager = db_manager
+        # Entries this far before a source's high-water mark are examined again
+        self.state_overlap = timedelta(seconds=float(os.getenv('COLLECTION_STATE_OVERLAP', '3600')))
+        
         self.sources = {
             'the_star': {
                 'rss_url': 'https://www.thestar.com.my/rss/business/property',
@@ -48,17 +73,23 @@ class NewsCollector:
             }
         }
         
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'HomeWatch/1.0 (Housing Analytics Bot)'
-        })
-        
         logger.info("NewsCollector initialized")
     
     def collect_articles(self, keywords: List[str], limit: int = 20, days_back: int = 7) -> List[Dict]:
         """
         Collect news articles from various sources
         
+        Feeds, NewsAPI and government sources are fetched concurrently on a
+        bounded thread pool, followed by the article pages of all feeds.
+        Requests to the same host are paced by the HTTP client's per-host
+        token bucket, so a run takes about as long as its slowest source
+        rather than the sum of all fetches.
+        
+        With a db_manager, sources resume from their high-water marks:
+        entries already collected are skipped before their pages are
+        fetched, and the marks advance past what this run returned. Marks
+        are kept per keyword set, since entries are filtered by keyword.
+        
         Args:
             keywords: List of keywords to search for
             limit: Maximum number of articles to collect
@@ -71,29 +102,66 @@ class NewsCollector:
         cutoff_date = datetime.now() - timedelta(days=days_back)
         
         try:
-            # Collect from RSS feeds
-            for source_id, source_info in self.sources.items():
-                if 'rss_url' in source_info:
-                    rss_articles = self._collect_from_rss(
-                        source_info['rss_url'], 
+            states = {}
+            if self.db_manager is not None:
+                state_keys = [f"rss:{source_id}" for source_id, source_info in self.sources.items()
+                              if 'rss_url' in source_info] + ['newsapi']
+                states = {key: SourceState.load(self.db_manager, state_key(key, keywords)) for key in state_keys}
+            
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='news-collector') as executor:
+                # Collect from RSS feeds
+                feed_futures = {
+                    executor.submit(
+                        self._collect_from_rss,
+                        source_info['rss_url'],
                         source_info['name'],
                         keywords,
-                        cutoff_date
-                    )
-                    articles.extend(rss_articles)
-            
-            # Collect from NewsAPI (if API key available)
-            newsapi_articles = self._collect_from_newsapi(keywords, cutoff_date)
-            articles.extend(newsapi_articles)
-            
-            # Collect from government sources
-            gov_articles = self._collect_government_news(keywords, cutoff_date)
-            articles.extend(gov_articles)
+                        cutoff_date,
+                        states.get(f"rss:{source_id}")
+                    ): source_id
+                    for source_id, source_info in self.sources.items() if 'rss_url' in source_info
+                }
+                
+                # Collect from NewsAPI (if API key available) and government sources
+                newsapi_future = executor.submit(self._collect_from_newsapi, keywords, cutoff_date,
+                                                 states.get('newsapi'))
+                government_future = executor.submit(self._collect_government_news, keywords, cutoff_date)
+                
+                rss_articles = {}
+                for future in as_completed(feed_futures):
+                    rss_articles[feed_futures[future]] = future.result()
+                
+                # Extract full content, interleaving sources so workers waiting
+                # on one host's rate limit do not hold up the other hosts
+                content_futures = [
+                    (article, executor.submit(self._extract_article_content, article['url']))
+                    for group in zip_longest(*(rss_articles[source_id] for source_id in feed_futures.values()))
+                    for article in group if article is not None
+                ]
+                for article, future in content_futures:
+                    article['content'] = future.result() or article['summary']
+                
+                # Keep source order so equal dates sort the same way on every run
+                for source_id in self.sources:
+                    articles.extend(rss_articles.get(source_id, []))
+                newsapi_articles = newsapi_future.result()
+                articles.extend(newsapi_articles)
+                articles.extend(government_future.result())
             
             # Sort by date and limit results
             articles.sort(key=lambda x: x['published_date'], reverse=True)
             articles = articles[:limit]
             
+            if states:
+                # Articles cut by the limit stay pending for the next run
+                kept = set(map(id, articles))
+                collected = {f"rss:{source_id}": source_articles for source_id, source_articles in rss_articles.items()}
+                collected['newsapi'] = newsapi_articles
+                for key, state in states.items():
+                    pending = [article['guid'] for article in collected.get(key, []) if id(article) not in kept]
+                    state.advance(pending, self.state_overlap)
+                    state.save(self.db_manager)
+            
             logger.info(f"Collected {len(articles)} news articles")
             return articles
             
@@ -101,12 +169,20 @@ class NewsCollector:
             logger.error(f"Error collecting news articles: {str(e)}")
             return []
     
-    def _collect_from_rss(self, rss_url: str, source_name: str, keywords: List[str], cutoff_date: datetime) -> List[Dict]:
-        """Collect articles from RSS feeds"""
+    def _collect_from_rss(self, rss_url: str, source_name: str, keywords: List[str], cutoff_date: datetime,
+                          state: Optional[SourceState] = None) -> List[Dict]:
+        """
+        Collect matching articles from an RSS feed, with the feed description as content
+        
+        With a state, entries before its window or already seen are skipped
+        and every other entry is recorded as examined.
+        """
         articles = []
+        if state is not None:
+            cutoff_date = state.window_start(cutoff_date, self.state_overlap)
         
         try:
-            response = self.session.get(rss_url, timeout=30)
+            response = self.http.get(rss_url, timeout=30)
             feed = feedparser.parse(response.content)
             
             for entry in feed.entries:
@@ -116,6 +192,12 @@ class NewsCollector:
                 if published_date < cutoff_date:
                     continue
                 
+                guid = entry.get('id') or entry.link
+                if state is not None:
+                    if not state.is_new(guid):
+                        continue
+                    state.examine(guid, published_date)
+                
                 # Check if keywords match
                 title = entry.title.lower()
                 description = getattr(entry, 'description', '').lower()
@@ -124,14 +206,12 @@ class NewsCollector:
                 if not any(keyword.lower() in content_text for keyword in keywords):
                     continue
                 
-                # Extract full content if possible
-                full_content = self._extract_article_content(entry.link)
-                
                 article = {
                     'id': f"rss_{hash(entry.link)}",
+                    'guid': guid,
                     'title': entry.title,
                     'url': entry.link,
-                    'content': full_content or description,
+                    'content': description,
                     'summary': description,
                     'source': source_name,
                     'published_date': published_date.isoformat(),
@@ -140,17 +220,15 @@ class NewsCollector:
                 }
                 
                 articles.append(article)
-                
-                # Rate limiting
-                time.sleep(0.5)
             
         except Exception as e:
             logger.error(f"Error collecting from RSS {rss_url}: {str(e)}")
         
         return articles
     
-    def _collect_from_newsapi(self, keywords: List[str], cutoff_date: datetime) -> List[Dict]:
-        """Collect articles from NewsAPI"""
+    def _collect_from_newsapi(self, keywords: List[str], cutoff_date: datetime,
+                              state: Optional[SourceState] = None) -> List[Dict]:
+        """Collect articles from NewsAPI, from the state's window when given one"""
         articles = []
         api_key = os.getenv('NEWSAPI_KEY')
         
@@ -162,24 +240,35 @@ class NewsCollector:
             query = ' OR '.join([f'"{keyword}"' for keyword in keywords])
             query += ' AND (Malaysia OR Kuala Lumpur OR Selangor)'
             
+            if state is not None:
+                cutoff_date = state.window_start(cutoff_date, self.state_overlap)
+            
             url = 'https://newsapi.org/v2/everything'
             params = {
                 'q': query,
                 'domains': 'thestar.com.my,nst.com.my,malaymail.com,theedgemarkets.com',
                 'language': 'en',
                 'sortBy': 'publishedAt',
-                'from': cutoff_date.strftime('%Y-%m-%d'),
+                'from': cutoff_date.strftime('%Y-%m-%dT%H:%M:%S'),
                 'pageSize': 50,
                 'apiKey': api_key
             }
             
-            response = self.session.get(url, params=params, timeout=30)
+            # The API key is part of the URL; keep it out of the response cache
+            response = self.http.get(url, params=params, timeout=30, cached=False)
             data = response.json()
             
             if data.get('status') == 'ok':
                 for item in data.get('articles', []):
+                    if state is not None:
+                        if not state.is_new(item['url']):
+                            continue
+                        published = datetime.fromisoformat(item['publishedAt'].replace('Z', '+00:00'))
+                        state.examine(item['url'], published.replace(tzinfo=None))
+                    
                     article = {
                         'id': f"newsapi_{hash(item['url'])}",
+                        'guid': item['url'],
                         'title': item['title'],
                         'url': item['url'],
                         'content': item.get('content', ''),
@@ -213,33 +302,24 @@ class NewsCollector:
         return articles
     
     def _extract_article_content(self, url: str) -> Optional[str]:
-        """Extract full article content from URL"""
+        """
+        Extract full article content from URL
+        
+        With an HTTP cache, the extracted text is stored next to the page:
+        a page validated within article_cache_ttl is not requested, and one
+        the server answers 304 for is not parsed again.
+        """
         try:
-            response = self.session.get(url, timeout=15)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Common article content selectors
-            content_selectors = [
-                'article .content',
-                '.article-content',
-                '.story-content',
-                '.post-content',
-                '[itemprop="articleBody"]'
-            ]
+            response = self.http.get(url, timeout=15, fresh_for=self.article_cache_ttl)
+            cached = getattr(response, 'cache_entry', None)
+            if cached is not None and cached.extracted is not None:
+                return cached.extracted or None
             
-            for selector in content_selectors:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    # Extract text and clean up
-                    content = content_div.get_text(strip=True)
-                    return content[:2000]  # Limit content length
+            content = self.extractor.extract(response.content, url)
+            if self.http.cache is not None and response.status_code == 200:
+                self.http.cache.store_extracted(response.cache_url, content or '')
+            return content
             
-            # Fallback: get all paragraph text
-            paragraphs = soup.find_all('p')
-            if paragraphs:
-                content = ' '.join([p.get_text(strip=True) for p in paragraphs[:10]])
-                return content[:2000]
-                
         except Exception as e:
             logger.debug(f"Could not extract content from {url}: {str(e)}")
         
@@ -250,14 +330,21 @@ class SocialMediaCollector:
     Collects social media posts related to Malaysian housing
     """
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[HttpClient] = None, db_manager=None):
+        """
+        Args:
+            http_client: HttpClient enforcing per-host rate limits and
+                connection pools (default: the shared client)
+            db_manager: Optional DatabaseManager keeping API cursors, so
+                each run only fetches posts newer than the previous run's
+        """
         self.twitter_bearer_token = os.getenv('TWITTER_BEARER_TOKEN')
+        # Overridable so collection can be recorded against a local stand-in
+        self.twitter_api_url = os.getenv('TWITTER_API_URL', 'https://api.twitter.com/2')
         self.facebook_access_token = os.getenv('FACEBOOK_ACCESS_TOKEN')
         
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'HomeWatch/1.0 (Housing Analytics Bot)'
-        })
+        self.http = http_client or get_shared_client()
+        self.db_manager = db_manager
         
         logger.info("SocialMediaCollector initialized")
     
@@ -304,7 +391,7 @@ class SocialMediaCollector:
             query = ' OR '.join([f"#{tag.replace('#', '')}" for tag in hashtags])
             query += ' lang:en OR lang:ms'  # English or Malay
             
-            url = 'https://api.twitter.com/2/tweets/search/recent'
+            url = f"{self.twitter_api_url}/tweets/search/recent"
             headers = {'Authorization': f'Bearer {self.twitter_bearer_token}'}
             params = {
                 'query': query,
@@ -314,7 +401,14 @@ class SocialMediaCollector:
                 'expansions': 'author_id'
             }
             
-            response = self.session.get(url, headers=headers, params=params, timeout=30)
+            state = None
+            if self.db_manager is not None:
+                state = SourceState.load(self.db_manager, state_key('twitter', hashtags))
+            if state is not None and state.cursor:
+                params['since_id'] = state.cursor
+            
+            # Responses are tied to the bearer token; keep them out of the response cache
+            response = self.http.get(url, headers=headers, params=params, timeout=30, cached=False)
             data = response.json()
             
             if 'data' in data:
@@ -340,6 +434,11 @@ class SocialMediaCollector:
                     }
                     posts.append(post)
             
+            newest_id = data.get('meta', {}).get('newest_id')
+            if state is not None and newest_id:
+                state.cursor = newest_id
+                state.save(self.db_manager)
+            
         except Exception as e:
             logger.error(f"Error collecting Twitter posts: {str(e)}")
             # Return demo data as fallback
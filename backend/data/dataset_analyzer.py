@@ -18,14 +18,10 @@ import json
 import re
 from datetime import datetime, timedelta
 from collections import Counter, defaultdict
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 import logging
-from textblob import TextBlob
-from wordcloud import WordCloud
-import base64
-from io import BytesIO
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from sentiment.phrase_matcher import PhraseMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +33,32 @@ class DatasetAnalyzer:
         self.df = None
         self.processed_data = {}
         
+        # Keyword categories for open-ended responses, in priority order.
+        # Keywords match whole words, so inflected forms are listed too.
+        self.complaint_categories = {
+            'Pricing & Affordability': ['price', 'prices', 'expensive', 'affordable', 'cost', 'costs', 'costly',
+                                        'budget'],
+            'Location & Accessibility': ['location', 'locations', 'accessibility', 'transport', 'transportation',
+                                         'remote', 'far'],
+            'Process & Bureaucracy': ['process', 'processes', 'application', 'applications', 'bureaucracy',
+                                      'complicated', 'procedure', 'procedures'],
+            'Transparency & Information': ['transparency', 'information', 'communication', 'clear'],
+            'Quality & Standards': ['quality', 'standard', 'standards', 'construction', 'build', 'building',
+                                    'buildings'],
+            'Supply & Availability': ['supply', 'available', 'units', 'shortage', 'shortages', 'limited']
+        }
+        self.improvement_categories = {
+            'Better Pricing': ['cheaper', 'affordable', 'reduce price', 'reduce prices', 'lower cost', 'lower costs'],
+            'Improved Locations': ['better location', 'better locations', 'accessibility', 'transport',
+                                   'transportation', 'connectivity'],
+            'Simplified Process': ['simplify', 'easier', 'streamline', 'reduce bureaucracy'],
+            'More Transparency': ['transparent', 'information', 'communication', 'updates'],
+            'Quality Improvements': ['quality', 'better construction', 'standards'],
+            'Increased Supply': ['more units', 'increase supply', 'availability']
+        }
+        self.complaint_matcher = self._build_category_matcher(self.complaint_categories)
+        self.improvement_matcher = self._build_category_matcher(self.improvement_categories)
+        
         # Load and preprocess data
         self.load_data()
         self.preprocess_data()
@@ -126,6 +148,24 @@ class DatasetAnalyzer:
             logger.error(f"Error preprocessing data: {str(e)}")
             raise
     
+    @staticmethod
+    def _build_category_matcher(categories: Dict[str, List[str]]) -> PhraseMatcher:
+        """Compile category keywords into one phrase matcher"""
+        return PhraseMatcher([
+            (keyword, category)
+            for category, keywords in categories.items()
+            for keyword in keywords
+        ])
+    
+    def _assign_category(self, text: str, categories: Dict[str, List[str]],
+                         matcher: PhraseMatcher) -> Optional[str]:
+        """Return the first category (in priority order) with a keyword in text"""
+        found = matcher.labels(text)
+        for category in categories:
+            if category in found:
+                return category
+        return None
+    
     def _categorize_sentiment(self, score):
         """Convert numeric sentiment score to category"""
         if pd.isna(score):
@@ -562,23 +602,12 @@ class DatasetAnalyzer:
             
             complaints = self.df['biggest_weakness'].dropna().tolist()
             
-            categories = {
-                'Pricing & Affordability': ['price', 'expensive', 'affordable', 'cost', 'budget'],
-                'Location & Accessibility': ['location', 'accessibility', 'transport', 'remote', 'far'],
-                'Process & Bureaucracy': ['process', 'application', 'bureaucracy', 'complicated', 'procedure'],
-                'Transparency & Information': ['transparency', 'information', 'communication', 'clear'],
-                'Quality & Standards': ['quality', 'standard', 'construction', 'build'],
-                'Supply & Availability': ['supply', 'available', 'units', 'shortage', 'limited']
-            }
-            
-            categorized = {category: [] for category in categories}
+            categorized = {category: [] for category in self.complaint_categories}
             
             for complaint in complaints:
-                complaint_lower = complaint.lower()
-                for category, keywords in categories.items():
-                    if any(keyword in complaint_lower for keyword in keywords):
-                        categorized[category].append(complaint)
-                        break
+                category = self._assign_category(complaint, self.complaint_categories, self.complaint_matcher)
+                if category:
+                    categorized[category].append(complaint)
             
             # Count and percentage
             complaint_summary = {}
@@ -602,23 +631,12 @@ class DatasetAnalyzer:
         try:
             improvements = self.df['improvements'].dropna().tolist()
             
-            categories = {
-                'Better Pricing': ['cheaper', 'affordable', 'reduce price', 'lower cost'],
-                'Improved Locations': ['better location', 'accessibility', 'transport', 'connectivity'],
-                'Simplified Process': ['simplify', 'easier', 'streamline', 'reduce bureaucracy'],
-                'More Transparency': ['transparent', 'information', 'communication', 'updates'],
-                'Quality Improvements': ['quality', 'better construction', 'standards'],
-                'Increased Supply': ['more units', 'increase supply', 'availability']
-            }
-            
-            categorized = {category: [] for category in categories}
+            categorized = {category: [] for category in self.improvement_categories}
             
             for improvement in improvements:
-                improvement_lower = improvement.lower()
-                for category, keywords in categories.items():
-                    if any(keyword in improvement_lower for keyword in keywords):
-                        categorized[category].append(improvement)
-                        break
+                category = self._assign_category(improvement, self.improvement_categories, self.improvement_matcher)
+                if category:
+                    categorized[category].append(improvement)
             
             # Count and percentage
             improvement_summary = {}
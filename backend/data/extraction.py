@@ -0,0 +1,132 @@
+"""
+Article Text Extraction for HomeWatch Collectors
+
+Pulls the article body out of a news page:
+- Parses with lxml when it is installed, otherwise with html.parser
+- Builds tree nodes only for candidate content containers (and paragraphs
+  for the fallback); navigation, scripts and sidebars are tokenized but
+  never turned into a tree
+- Remembers which selector matched on each domain, so later pages from
+  that site are parsed for that container alone
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml  # noqa: F401
+    PARSER = 'lxml'
+except ImportError:
+    PARSER = 'html.parser'
+
+MAX_CONTENT_LENGTH = 2000
+FALLBACK_PARAGRAPHS = 10
+
+
+def _classes(attrs) -> list:
+    value = attrs.get('class') or ''
+    return value.split() if isinstance(value, str) else list(value)
+
+
+# Common article content selectors in priority order, each with a test on a
+# start tag's name and attributes that keeps every element it could match
+CONTENT_SELECTORS: Dict[str, Callable] = {
+    'article .content': lambda name, attrs: name == 'article',
+    '.article-content': lambda name, attrs: 'article-content' in _classes(attrs),
+    '.story-content': lambda name, attrs: 'story-content' in _classes(attrs),
+    '.post-content': lambda name, attrs: 'post-content' in _classes(attrs),
+    '[itemprop="articleBody"]': lambda name, attrs: attrs.get('itemprop') == 'articleBody'
+}
+
+
+def _any_candidate(name, attrs) -> bool:
+    return name == 'p' or any(matches(name, attrs) for matches in CONTENT_SELECTORS.values())
+
+
+class ArticleExtractor:
+    """
+    Extracts article text, learning the content selector of each domain
+    """
+
+    def __init__(self, parser: str = PARSER):
+        """
+        Args:
+            parser: BeautifulSoup tree builder (default: lxml if installed,
+                otherwise html.parser)
+        """
+        self.parser = parser
+        self._candidates = SoupStrainer(_any_candidate)
+        self._strainers = {selector: SoupStrainer(matches) for selector, matches in CONTENT_SELECTORS.items()}
+        self._domain_selectors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        self.pages = 0
+        self.domain_hits = 0
+        self.domain_misses = 0
+        self.fallbacks = 0
+
+    def extract(self, html: bytes, url: str = '') -> Optional[str]:
+        """
+        Article text of a page, or None if none was found
+
+        Args:
+            html: Page markup
+            url: Page URL; its host keys the learned selector
+
+        Returns:
+            Text of the first matching content container, else of the first
+            paragraphs, truncated to MAX_CONTENT_LENGTH
+        """
+        domain = urlsplit(url).netloc.lower()
+        selector = self._domain_selectors.get(domain)
+
+        if selector is not None:
+            soup = BeautifulSoup(html, self.parser, parse_only=self._strainers[selector])
+            content_div = soup.select_one(selector)
+            if content_div:
+                with self._lock:
+                    self.pages += 1
+                    self.domain_hits += 1
+                return content_div.get_text(strip=True)[:MAX_CONTENT_LENGTH]
+            # The site's layout changed or this page differs; search all candidates
+            with self._lock:
+                self.domain_misses += 1
+
+        soup = BeautifulSoup(html, self.parser, parse_only=self._candidates)
+        with self._lock:
+            self.pages += 1
+
+        for selector in CONTENT_SELECTORS:
+            content_div = soup.select_one(selector)
+            if content_div:
+                if domain:
+                    with self._lock:
+                        self._domain_selectors[domain] = selector
+                return content_div.get_text(strip=True)[:MAX_CONTENT_LENGTH]
+
+        # Fallback: get all paragraph text
+        paragraphs = soup.find_all('p', limit=FALLBACK_PARAGRAPHS)
+        if paragraphs:
+            with self._lock:
+                self.fallbacks += 1
+            return ' '.join([p.get_text(strip=True) for p in paragraphs])[:MAX_CONTENT_LENGTH]
+
+        return None
+
+    def stats(self) -> Dict:
+        """Parser, page counters and the selector learned for each domain"""
+        with self._lock:
+            return {
+                'parser': self.parser,
+                'pages': self.pages,
+                'domain_hits': self.domain_hits,
+                'domain_misses': self.domain_misses,
+                'fallbacks': self.fallbacks,
+                'domain_selectors': dict(self._domain_selectors)
+            }
@@ -0,0 +1,209 @@
+"""
+Conditional-GET HTTP Cache for HomeWatch Collectors
+
+On-disk cache of GET responses in front of HttpClient:
+- Stores bodies with their ETag / Last-Modified validators; refetches send
+  If-None-Match / If-Modified-Since and a 304 is answered from the cache
+- Stores text extracted from article pages next to the page, so an
+  unchanged page is neither downloaded nor parsed again
+- Bounded by total body size and entry age, evicting least recently used
+  entries first
+
+Entries live in a small SQLite file (bodies as BLOBs) so writes are atomic
+and the cache is shared safely by collector threads.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept with a cached body
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+@dataclass
+class CachedResponse:
+    """A cached GET response"""
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    validated_at: float
+    extracted: Optional[str]
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Request headers asking the server to answer 304 if unchanged"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    SQLite-backed HTTP response cache with LRU eviction
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None,
+                 max_age: Optional[float] = None):
+        """
+        Args:
+            path: SQLite file (default: HTTP_CACHE_PATH or data/http_cache.db)
+            max_bytes: Total body size kept (default: HTTP_CACHE_MAX_BYTES or
+                256 MiB)
+            max_age: Seconds an entry is kept without being revalidated
+                (default: HTTP_CACHE_MAX_AGE or 7 days)
+        """
+        self.path = path or os.getenv('HTTP_CACHE_PATH', 'data/http_cache.db')
+        self.max_bytes = int(os.getenv('HTTP_CACHE_MAX_BYTES', 256 * 1024 * 1024)) if max_bytes is None else max_bytes
+        self.max_age = float(os.getenv('HTTP_CACHE_MAX_AGE', 7 * 24 * 3600)) if max_age is None else max_age
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    extracted TEXT,
+                    size INTEGER NOT NULL,
+                    validated_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_http_cache_accessed ON http_cache(accessed_at)')
+            self._conn.commit()
+
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """
+        Cached response for a URL, or None when absent or older than max_age
+
+        Looking an entry up marks it as recently used.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT status, headers, body, etag, last_modified, validated_at, extracted '
+                'FROM http_cache WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None or now - row[5] > self.max_age:
+                self.misses += 1
+                return None
+            self._conn.execute('UPDATE http_cache SET accessed_at = ? WHERE url = ?', (now, url))
+            self._conn.commit()
+
+        status, headers, body, etag, last_modified, validated_at, extracted = row
+        return CachedResponse(
+            url=url,
+            status=status,
+            headers=dict(line.split(': ', 1) for line in headers.splitlines() if ': ' in line),
+            body=body,
+            etag=etag,
+            last_modified=last_modified,
+            validated_at=validated_at,
+            extracted=extracted
+        )
+
+    def store(self, url: str, status: int, headers, body: bytes):
+        """
+        Store a response body and its validators, replacing any extracted text
+
+        Args:
+            url: Request URL (including the query string)
+            status: Response status code
+            headers: Response headers (case-insensitive mapping)
+            body: Response body
+        """
+        now = time.time()
+        kept = '\n'.join(f"{name}: {headers[name]}" for name in STORED_HEADERS if headers.get(name))
+        with self._lock:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO http_cache
+                (url, status, headers, body, etag, last_modified, extracted, size, validated_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?, ?)
+            ''', (url, status, kept, sqlite3.Binary(body), headers.get('ETag'), headers.get('Last-Modified'),
+                  len(body), now, now))
+            self.stores += 1
+            self._evict(now)
+            self._conn.commit()
+
+    def mark_validated(self, url: str):
+        """Record a 304: the cached body is current as of now"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('UPDATE http_cache SET validated_at = ?, accessed_at = ? WHERE url = ?',
+                               (now, now, url))
+            self._conn.commit()
+            self.revalidations += 1
+
+    def record_hit(self):
+        """Count a response served from the cache without a request"""
+        with self._lock:
+            self.hits += 1
+
+    def store_extracted(self, url: str, text: Optional[str]):
+        """Keep text extracted from the cached body of a URL"""
+        with self._lock:
+            self._conn.execute('UPDATE http_cache SET extracted = ? WHERE url = ?', (text, url))
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones until within max_bytes"""
+        expired = self._conn.execute('DELETE FROM http_cache WHERE validated_at < ?', (now - self.max_age,)).rowcount
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM http_cache').fetchone()[0]
+        evicted = 0
+        if total > self.max_bytes:
+            for url, size in self._conn.execute('SELECT url, size FROM http_cache ORDER BY accessed_at').fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute('DELETE FROM http_cache WHERE url = ?', (url,))
+                total -= size
+                evicted += 1
+        if expired or evicted:
+            self.evictions += expired + evicted
+            logger.debug(f"HTTP cache evicted {expired} expired and {evicted} least recently used entries")
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM http_cache')
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Entry count, stored bytes and hit/revalidation/miss counters"""
+        with self._lock:
+            entries, size = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM http_cache').fetchone()
+            return {
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'max_age': self.max_age,
+                'hits': self.hits,
+                'revalidations': self.revalidations,
+                'misses': self.misses,
+                'stores': self.stores,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,349 @@
+"""
+Shared HTTP Client for HomeWatch Collectors
+
+One client for all collectors, with politeness and resilience handled per
+host:
+- Token buckets limit each host to a sustained request rate with a small
+  burst allowance; requests to different hosts never wait for each other
+- Each host gets its own session with a bounded keep-alive connection
+  pool; threads wait for a free connection instead of opening extra ones
+- 429 and 5xx responses and connection errors are retried with full-jitter
+  exponential backoff, honouring Retry-After when the server sends it
+- Per-host request counts, retries, status codes and latency histograms
+- Optional conditional-GET cache (see data/http_cache.py)
+- Pluggable transport, e.g. recording or replaying fixtures (see
+  data/transport.py)
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from data.http_cache import CachedResponse, HttpCache
+from data.transport import transport_from_env
+from sentiment.instrumentation import StageHistogram
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'HomeWatch/1.0 (Housing Analytics Bot)'
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass
+class HostPolicy:
+    """Request allowance and connection pool size for one host"""
+    rate: float  # sustained requests per second; 0 or less means unlimited
+    burst: int = 1
+    pool_size: int = 4
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Callers reserve a token under the lock (possibly driving the balance
+    negative) and sleep outside it, so waiting threads queue up in order
+    without holding the lock.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token
+
+        Returns:
+            Seconds the caller must wait before using it
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until it is available; returns the seconds waited"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class HostState:
+    """Token bucket, pooled session, counters and latency histogram of one host"""
+
+    def __init__(self, policy: HostPolicy, user_agent: str, transport=None):
+        self.bucket = TokenBucket(policy.rate, policy.burst)
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': user_agent})
+        if transport is not None:
+            adapter = transport.adapter(max(1, policy.pool_size))
+        else:
+            # pool_block bounds the host's connections; extra threads wait for a free one
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, policy.pool_size), pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.throttled_seconds = 0.0
+        self.statuses: Dict[int, int] = {}
+        self.latency = StageHistogram()
+
+    def summary(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': self.errors,
+            'throttled_seconds': self.throttled_seconds,
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+            'latency': self.latency.summary()
+        }
+
+
+def parse_host_policies(spec: str, default: HostPolicy) -> Dict[str, HostPolicy]:
+    """
+    Parse per-host overrides such as "newsapi.org=1,api.twitter.com=0.5:2"
+
+    Each entry is host=rate[:burst[:pool_size]]; missing fields come from
+    the default policy.
+    """
+    policies = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        host, _, values = entry.partition('=')
+        fields = values.split(':')
+        policies[host.strip().lower()] = HostPolicy(
+            rate=float(fields[0]),
+            burst=int(fields[1]) if len(fields) > 1 else default.burst,
+            pool_size=int(fields[2]) if len(fields) > 2 else default.pool_size
+        )
+    return policies
+
+
+class HttpClient:
+    """
+    Rate-limited, pooled, retrying HTTP client shared by the collectors
+    """
+
+    def __init__(self, default_policy: Optional[HostPolicy] = None,
+                 host_policies: Optional[Dict[str, HostPolicy]] = None,
+                 max_retries: Optional[int] = None, backoff_base: Optional[float] = None,
+                 backoff_max: Optional[float] = None, user_agent: str = USER_AGENT,
+                 cache: Optional[HttpCache] = None, transport=None):
+        """
+        Args:
+            default_policy: Policy for hosts without an override (default:
+                HTTP_HOST_RATE or 2 requests/sec, HTTP_HOST_BURST or 1,
+                HTTP_POOL_SIZE or 4 connections)
+            host_policies: Per-host overrides keyed by host[:port] (default:
+                parsed from HTTP_HOST_POLICIES, see parse_host_policies)
+            max_retries: Retries after the first attempt (default:
+                HTTP_MAX_RETRIES or 3)
+            backoff_base: First backoff ceiling in seconds, doubled per retry
+                (default: HTTP_BACKOFF_BASE or 0.5)
+            backoff_max: Largest backoff in seconds, also caps Retry-After
+                (default: HTTP_BACKOFF_MAX or 30)
+            user_agent: User-Agent header sent with every request
+            cache: Optional HttpCache for conditional GETs
+            transport: Optional RecordTransport / ReplayTransport providing
+                each host's adapter (default: live connection pools)
+        """
+        if default_policy is None:
+            default_policy = HostPolicy(
+                rate=float(os.getenv('HTTP_HOST_RATE', '2')),
+                burst=int(os.getenv('HTTP_HOST_BURST', '1')),
+                pool_size=int(os.getenv('HTTP_POOL_SIZE', '4'))
+            )
+        if host_policies is None:
+            host_policies = parse_host_policies(os.getenv('HTTP_HOST_POLICIES', ''), default_policy)
+
+        self.default_policy = default_policy
+        self.host_policies = {host.lower(): policy for host, policy in host_policies.items()}
+        self.max_retries = int(os.getenv('HTTP_MAX_RETRIES', '3')) if max_retries is None else max_retries
+        self.backoff_base = float(os.getenv('HTTP_BACKOFF_BASE', '0.5')) if backoff_base is None else backoff_base
+        self.backoff_max = float(os.getenv('HTTP_BACKOFF_MAX', '30')) if backoff_max is None else backoff_max
+
+        self.user_agent = user_agent
+        self.cache = cache
+        self.transport = transport
+
+        self._hosts: Dict[str, HostState] = {}
+        self._lock = threading.Lock()
+
+    def policy(self, host: str) -> HostPolicy:
+        return self.host_policies.get(host, self.default_policy)
+
+    def _host(self, host: str) -> HostState:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = HostState(self.policy(host), self.user_agent, self.transport)
+            return state
+
+    def get(self, url: str, fresh_for: float = 0, cached: bool = True, **kwargs) -> requests.Response:
+        """
+        GET through the cache, when the client has one
+
+        A cached response is revalidated with a conditional request, and a
+        304 is answered with the cached body. Responses served from the cache
+        have from_cache=True and the entry as cache_entry; with a cache,
+        every response carries its cache key as cache_url.
+
+        Args:
+            url: Absolute URL
+            fresh_for: Serve a cached response validated within this many
+                seconds without any request
+            cached: False bypasses the cache (e.g. for URLs carrying secrets)
+            **kwargs: Passed to request
+        """
+        if self.cache is None or not cached:
+            return self.request('GET', url, **kwargs)
+
+        cache_url = requests.Request('GET', url, params=kwargs.get('params')).prepare().url
+        entry = self.cache.lookup(cache_url)
+        if entry is not None:
+            if fresh_for > 0 and time.time() - entry.validated_at < fresh_for:
+                self.cache.record_hit()
+                return self._cached_response(entry, cache_url)
+            kwargs['headers'] = {**entry.conditional_headers(), **(kwargs.get('headers') or {})}
+
+        response = self.request('GET', url, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.cache.mark_validated(cache_url)
+            response.close()
+            return self._cached_response(entry, cache_url)
+        if response.status_code == 200:
+            self.cache.store(cache_url, response.status_code, response.headers, response.content)
+        response.from_cache = False
+        response.cache_url = cache_url
+        return response
+
+    @staticmethod
+    def _cached_response(cached: CachedResponse, cache_url: str) -> requests.Response:
+        """Rebuild a requests.Response from a cache entry"""
+        response = requests.Response()
+        response.status_code = cached.status
+        response._content = cached.body
+        response.headers.update(cached.headers)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = cache_url
+        response.from_cache = True
+        response.cache_entry = cached
+        response.cache_url = cache_url
+        return response
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request within the host's allowance, retrying transient failures
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            **kwargs: Passed to requests.Session.request (e.g. params,
+                headers, timeout)
+
+        Returns:
+            The final response; retryable statuses are returned once
+            retries are exhausted
+
+        Raises:
+            requests.RequestException: When the last attempt fails to connect
+        """
+        state = self._host(urlsplit(url).netloc.lower())
+
+        for attempt in range(self.max_retries + 1):
+            waited = state.bucket.acquire()
+            start = time.perf_counter()
+            try:
+                response = state.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    state.requests += 1
+                    state.errors += 1
+                    state.throttled_seconds += waited
+                    state.latency.record(elapsed)
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.debug(f"{method} {url} failed ({str(e)}), retrying in {delay:.2f}s")
+            else:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    state.requests += 1
+                    state.throttled_seconds += waited
+                    state.statuses[response.status_code] = state.statuses.get(response.status_code, 0) + 1
+                    state.latency.record(elapsed)
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                logger.debug(f"{method} {url} returned {response.status_code}, retrying in {delay:.2f}s")
+                response.close()
+
+            with self._lock:
+                state.retries += 1
+            time.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        """Delay requested by a Retry-After header (seconds or HTTP date), capped at backoff_max"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(max(delay, 0.0), self.backoff_max)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-host counters and latency summaries"""
+        with self._lock:
+            return {host: state.summary() for host, state in sorted(self._hosts.items())}
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_client() -> HttpClient:
+    """
+    Process-wide HttpClient configured from the environment
+
+    Cached unless HTTP_CACHE_ENABLED=false; HTTP_TRANSPORT=record|replay
+    selects a fixture transport (see transport_from_env).
+    """
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            cache = HttpCache() if os.getenv('HTTP_CACHE_ENABLED', 'true').lower() != 'false' else None
+            _shared_client = HttpClient(cache=cache, transport=transport_from_env())
+        return _shared_client
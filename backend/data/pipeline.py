@@ -0,0 +1,91 @@
+"""
+Lazy Processing Pipeline for HomeWatch
+
+Chains DataProcessor stages as generators so a collection run holds one
+item at a time instead of a full list per stage:
+- Each stage is metered: items in, items out, and seconds spent in the
+  stage itself (time waiting on upstream stages is not charged to it)
+- Only a final top-k ordering stage buffers, and it holds k items
+"""
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterable, Iterator, List
+
+
+@dataclass
+class StageStats:
+    """Counters for one pipeline stage"""
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    seconds: float = 0.0
+
+
+def metered(stats: StageStats, stage: Callable[[Iterator], Iterator], upstream: Iterable) -> Iterator:
+    """
+    Run a generator stage over upstream, recording its counters in stats
+
+    Args:
+        stats: Counters to update
+        stage: Function turning an iterator of items into an iterator of items
+        upstream: Items fed into the stage
+
+    Yields:
+        The stage's output items
+    """
+    upstream = iter(upstream)
+    waited = 0.0
+
+    def source():
+        nonlocal waited
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(upstream)
+            except StopIteration:
+                waited += time.perf_counter() - start
+                return
+            waited += time.perf_counter() - start
+            stats.items_in += 1
+            yield item
+
+    output = stage(source())
+    while True:
+        start = time.perf_counter()
+        waited_before = waited
+        try:
+            item = next(output)
+        except StopIteration:
+            stats.seconds += time.perf_counter() - start - (waited - waited_before)
+            return
+        stats.seconds += time.perf_counter() - start - (waited - waited_before)
+        stats.items_out += 1
+        yield item
+
+
+class ProcessingPipeline:
+    """
+    Iterable over the output of chained, metered stages
+
+    Stages run as the pipeline is iterated; the counters in ``stages`` are
+    final once iteration has finished.
+    """
+
+    def __init__(self, items: Iterable[Dict]):
+        self._items = items
+        self.stages: List[StageStats] = []
+
+    def add_stage(self, name: str, stage: Callable[[Iterator], Iterator]) -> 'ProcessingPipeline':
+        """Append a stage; returns the pipeline for chaining"""
+        stats = StageStats(name)
+        self.stages.append(stats)
+        self._items = metered(stats, stage, self._items)
+        return self
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self._items)
+
+    def stats(self) -> List[Dict]:
+        """Stage counters in pipeline order"""
+        return [asdict(stats) for stats in self.stages]
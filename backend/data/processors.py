@@ -4,21 +4,39 @@ Data Processing Module for HomeWatch
 Processes and cleans collected data before sentiment analysis
 """
 
+import os
+import heapq
 import logging
-import re
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
-import html
-import unicodedata
+
+from data.pipeline import ProcessingPipeline
+from sentiment.dedup import NearDuplicateIndex
+from sentiment.normalizer import TextNormalizer
+from sentiment.phrase_matcher import PhraseMatcher
 
 logger = logging.getLogger(__name__)
 
+RELEVANCE_KEY = itemgetter('relevance_score')
+
 class DataProcessor:
     """
     Processes and cleans raw data collected from various sources
     """
     
-    def __init__(self):
+    def __init__(self, dedup_threshold: Optional[float] = None):
+        """
+        Args:
+            dedup_threshold: Jaccard similarity at or above which deduplicate
+                treats items as near-duplicates (default:
+                DEDUP_JACCARD_THRESHOLD or 0.8)
+        """
+        if dedup_threshold is None:
+            dedup_threshold = float(os.getenv('DEDUP_JACCARD_THRESHOLD', '0.8'))
+        self.dedup_threshold = dedup_threshold
+        
         # Common noise patterns to remove
         self.noise_patterns = [
             r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+',  # URLs
@@ -36,6 +54,26 @@ class DataProcessor:
             'housing development', 'residential property', 'housing scheme'
         ]
         
+        # Common Malay words/phrases
+        self.malay_indicators = [
+            'rumah', 'mampu', 'milik', 'kerajaan', 'malaysia', 'kuala lumpur',
+            'selangor', 'johor', 'penang', 'sabah', 'sarawak', 'melaka',
+            'negeri', 'rakyat', 'projek', 'pembangunan', 'hartanah'
+        ]
+        
+        # Common English words in housing context
+        self.english_indicators = [
+            'housing', 'property', 'development', 'affordable', 'government',
+            'scheme', 'program', 'application', 'approval', 'mortgage'
+        ]
+        
+        # Phrase matchers compiled once for all documents
+        self.keyword_matcher = PhraseMatcher(self.housing_keywords)
+        self.language_matcher = PhraseMatcher(
+            [(word, 'ms') for word in self.malay_indicators] +
+            [(word, 'en') for word in self.english_indicators]
+        )
+        
         logger.info("DataProcessor initialized")
     
     def process_batch(self, data_items: List[Dict]) -> List[Dict]:
@@ -48,19 +86,51 @@ class DataProcessor:
         Returns:
             List of processed data dictionaries
         """
-        processed_items = []
+        processed_items = list(self.iter_processed(data_items))
         
+        logger.info(f"Processed {len(processed_items)} out of {len(data_items)} items")
+        return processed_items
+    
+    def iter_processed(self, data_items: Iterable[Dict]) -> Iterator[Dict]:
+        """Lazily process items, skipping those that fail processing or validation"""
         for item in data_items:
             try:
                 processed_item = self.process_item(item)
                 if processed_item:
-                    processed_items.append(processed_item)
+                    yield processed_item
             except Exception as e:
                 logger.error(f"Error processing item {item.get('id', 'unknown')}: {str(e)}")
                 continue
+    
+    def pipeline(self, data_items: Iterable[Dict], min_keywords: int = 1,
+                 dedup_threshold: Optional[float] = None, dedup_window: int = 10000,
+                 top_k: Optional[int] = None) -> ProcessingPipeline:
+        """
+        Chain processing, relevance filtering, deduplication and ordering lazily
         
-        logger.info(f"Processed {len(processed_items)} out of {len(data_items)} items")
-        return processed_items
+        Items flow through the stages one at a time, so memory is bounded by
+        the deduplication window and top_k rather than the number of items.
+        
+        Args:
+            data_items: Raw data dictionaries (any iterable, e.g. a generator)
+            min_keywords: Minimum number of housing keywords required
+            dedup_threshold: Optional override of the Jaccard similarity threshold
+            dedup_window: Most recent unique items that later items are
+                compared against
+            top_k: Keep only the k most relevant items, most relevant first;
+                None keeps every item in arrival order
+            
+        Returns:
+            ProcessingPipeline to iterate; its stats() report items in/out
+            and seconds per stage
+        """
+        pipeline = ProcessingPipeline(data_items)
+        pipeline.add_stage('process', self.iter_processed)
+        pipeline.add_stage('filter', lambda items: self.iter_relevant(items, min_keywords))
+        pipeline.add_stage('deduplicate', lambda items: self.iter_unique(items, dedup_threshold, dedup_window))
+        if top_k is not None:
+            pipeline.add_stage('top_k', lambda items: iter(self.top_by_relevance(items, top_k)))
+        return pipeline
     
     def process_item(self, item: Dict) -> Optional[Dict]:
         """
@@ -86,9 +156,11 @@ class DataProcessor:
             processed_item['title'] = self.clean_text(title)
             processed_item['summary'] = self.clean_text(summary)
             
-            # Create combined text for analysis
-            combined_text = f"{title} {summary} {content}".strip()
-            processed_item['combined_text'] = self.clean_text(combined_text)
+            # Create combined text for analysis from the already-cleaned fields
+            combined_text = TextNormalizer.join(
+                processed_item['title'], processed_item['summary'], processed_item['content']
+            )
+            processed_item['combined_text'] = combined_text
             
             # Extract and preserve housing-related keywords
             processed_item['housing_keywords'] = self.extract_housing_keywords(combined_text)
@@ -118,28 +190,7 @@ class DataProcessor:
         Returns:
             Cleaned text string
         """
-        if not text:
-            return ""
-        
-        # Decode HTML entities
-        text = html.unescape(text)
-        
-        # Normalize unicode characters
-        text = unicodedata.normalize('NFKD', text)
-        
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove leading/trailing whitespace
-        text = text.strip()
-        
-        # Optional: Remove URLs (preserving for context in some cases)
-        # text = re.sub(self.noise_patterns[0], '[URL]', text)
-        
-        # Optional: Replace mentions with placeholder
-        # text = re.sub(self.noise_patterns[1], '[USER]', text)
-        
-        return text
+        return TextNormalizer.clean(text)
     
     def extract_housing_keywords(self, text: str) -> List[str]:
         """
@@ -151,14 +202,7 @@ class DataProcessor:
         Returns:
             List of found housing keywords
         """
-        found_keywords = []
-        text_lower = text.lower()
-        
-        for keyword in self.housing_keywords:
-            if keyword.lower() in text_lower:
-                found_keywords.append(keyword)
-        
-        return list(set(found_keywords))  # Remove duplicates
+        return self.keyword_matcher.phrases(text)
     
     def detect_language(self, text: str) -> str:
         """
@@ -173,22 +217,10 @@ class DataProcessor:
         if not text:
             return 'unknown'
         
-        # Common Malay words/phrases
-        malay_indicators = [
-            'rumah', 'mampu', 'milik', 'kerajaan', 'malaysia', 'kuala lumpur',
-            'selangor', 'johor', 'penang', 'sabah', 'sarawak', 'melaka',
-            'negeri', 'rakyat', 'projek', 'pembangunan', 'hartanah'
-        ]
-        
-        # Common English words in housing context
-        english_indicators = [
-            'housing', 'property', 'development', 'affordable', 'government',
-            'scheme', 'program', 'application', 'approval', 'mortgage'
-        ]
-        
-        text_lower = text.lower()
-        malay_count = sum(1 for word in malay_indicators if word in text_lower)
-        english_count = sum(1 for word in english_indicators if word in text_lower)
+        # Count distinct indicators of each language
+        found = {(match.phrase, match.label) for match in self.language_matcher.find_all(text)}
+        malay_count = sum(1 for _, language in found if language == 'ms')
+        english_count = sum(1 for _, language in found if language == 'en')
         
         if malay_count > english_count and malay_count > 0:
             return 'ms'  # Malay
@@ -240,72 +272,163 @@ class DataProcessor:
         Returns:
             Filtered list of relevant items
         """
-        relevant_items = []
-        
-        for item in items:
-            housing_keywords = item.get('housing_keywords', [])
-            if len(housing_keywords) >= min_keywords:
-                relevant_items.append(item)
+        relevant_items = list(self.iter_relevant(items, min_keywords))
         
         logger.info(f"Filtered {len(relevant_items)} relevant items from {len(items)} total")
         return relevant_items
     
-    def deduplicate(self, items: List[Dict]) -> List[Dict]:
+    def iter_relevant(self, items: Iterable[Dict], min_keywords: int = 1) -> Iterator[Dict]:
+        """Lazily keep items with at least min_keywords housing keywords"""
+        for item in items:
+            if len(item.get('housing_keywords', [])) >= min_keywords:
+                yield item
+    
+    def deduplicate(self, items: List[Dict], threshold: Optional[float] = None) -> List[Dict]:
         """
-        Remove duplicate items based on content similarity
+        Remove near-duplicate items using MinHash/LSH over the combined text
+        
+        The first item of each group of near-duplicates is kept as the
+        canonical item; 'near_duplicate_ids' on a copy of each kept item lists the ids
+        of the items dropped as its near-duplicates.
         
         Args:
             items: List of items to deduplicate
+            threshold: Optional override of the Jaccard similarity threshold
             
         Returns:
             Deduplicated list of items
-        """
-        unique_items = []
-        seen_content = set()
-        
-        for item in items:
-            # Create a simple content hash for deduplication
-            content_hash = hash(item.get('combined_text', '')[:500])  # First 500 chars
             
-            if content_hash not in seen_content:
-                seen_content.add(content_hash)
-                unique_items.append(item)
+        Raises:
+            ValueError: If threshold is outside (0, 1]
+        """
+        unique_items = list(self.iter_unique(items, threshold, window=max(1, len(items))))
         
         logger.info(f"Deduplicated {len(items)} items to {len(unique_items)} unique items")
         return unique_items
     
-    def sort_by_relevance(self, items: List[Dict]) -> List[Dict]:
+    def iter_unique(self, items: Iterable[Dict], threshold: Optional[float] = None,
+                    window: int = 10000) -> Iterator[Dict]:
+        """
+        Lazily drop near-duplicates of earlier items (see deduplicate)
+        
+        Args:
+            items: Processed items
+            threshold: Optional override of the Jaccard similarity threshold
+            window: Most recent unique items compared against; ids of later
+                near-duplicates are appended to a canonical item's
+                'near_duplicate_ids' after it has been yielded
+            
+        Yields:
+            Copies of the first item of each group of near-duplicates (the
+            input items are not modified)
+        """
+        index = NearDuplicateIndex(self.dedup_threshold if threshold is None else threshold, max_entries=window)
+        # Only the duplicate id lists are kept, not the canonical items themselves
+        duplicate_ids = OrderedDict()
+        empty_duplicate_ids = None
+        
+        for position, item in enumerate(items):
+            signature = index.signature(item.get('combined_text', ''))
+            if signature is None:
+                # Items without words can only duplicate each other
+                if empty_duplicate_ids is None:
+                    empty_duplicate_ids = []
+                    yield {**item, 'near_duplicate_ids': empty_duplicate_ids}
+                else:
+                    empty_duplicate_ids.append(item.get('id'))
+                continue
+            
+            match = index.query(signature)
+            if match is None:
+                index.add(position, signature)
+                duplicate_ids[position] = []
+                if len(duplicate_ids) > window:
+                    duplicate_ids.popitem(last=False)
+                yield {**item, 'near_duplicate_ids': duplicate_ids[position]}
+            else:
+                duplicate_ids[match[0]].append(item.get('id'))
+    
+    def sort_by_relevance(self, items: Iterable[Dict], top_k: Optional[int] = None,
+                          now: Optional[datetime] = None) -> List[Dict]:
         """
         Sort items by relevance score
         
+        Each item's score is computed once and stored as 'relevance_score'.
+        With top_k, a bounded heap keeps only the k best items, so ranking a
+        large candidate set costs one scan plus O(n log k).
+        
         Args:
-            items: List of items to sort
+            items: Items to sort (any iterable)
+            top_k: Optional number of most relevant items to return
+            now: Reference time for recency (default: the time of the call)
             
         Returns:
-            Sorted list of items (most relevant first)
+            Sorted list of items (most relevant first, ties keep input order)
         """
-        def calculate_relevance(item):
-            score = 0
-            
-            # More housing keywords = higher relevance
-            score += len(item.get('housing_keywords', [])) * 10
+        scored = self._score_relevance(items, now or datetime.now())
+        if top_k is not None:
+            return heapq.nlargest(top_k, scored, key=RELEVANCE_KEY)
+        return sorted(scored, key=RELEVANCE_KEY, reverse=True)
+    
+    def top_by_relevance(self, items: Iterable[Dict], k: int) -> List[Dict]:
+        """
+        Select the k most relevant items, holding at most k items at a time
+        
+        Args:
+            items: Items to rank (any iterable)
+            k: Number of items to keep
             
-            # Newer content = higher relevance
+        Returns:
+            Up to k items, most relevant first (ties keep arrival order)
+        """
+        return self.sort_by_relevance(items, top_k=k)
+    
+    def _score_relevance(self, items: Iterable[Dict], now: datetime) -> Iterator[Dict]:
+        """Store each item's relevance score on it as it passes through"""
+        reference = self._reference_times(now)
+        for item in items:
+            item['relevance_score'] = self._relevance(item, reference)
+            yield item
+    
+    @staticmethod
+    def _reference_times(now: datetime) -> Tuple[datetime, datetime]:
+        """Naive and aware versions of now, for naive and aware published dates"""
+        if now.tzinfo is None:
+            return now, now.astimezone()
+        return now.astimezone().replace(tzinfo=None), now
+    
+    def calculate_relevance(self, item: Dict, now: Optional[datetime] = None) -> float:
+        """
+        Relevance score used to order items
+        
+        Args:
+            item: Processed item
+            now: Reference time for recency (default: the current time)
+        """
+        return self._relevance(item, self._reference_times(now or datetime.now()))
+    
+    @staticmethod
+    def _relevance(item: Dict, now: Tuple[datetime, datetime]) -> float:
+        score = 0
+        
+        # More housing keywords = higher relevance
+        score += len(item.get('housing_keywords', [])) * 10
+        
+        # Newer content = higher relevance
+        published = item.get('published_date')
+        if published:
             try:
-                published_date = datetime.fromisoformat(item.get('published_date', ''))
-                days_old = (datetime.now() - published_date).days
+                published_date = datetime.fromisoformat(published)
+                days_old = (now[published_date.tzinfo is not None] - published_date).days
                 score += max(0, 30 - days_old)  # Bonus for recent content
-            except:
+            except (TypeError, ValueError):
                 pass
-            
-            # Engagement metrics (if available)
-            engagement = item.get('engagement', {})
-            if isinstance(engagement, dict):
-                score += engagement.get('likes', 0) * 0.1
-                score += engagement.get('shares', 0) * 0.2
-                score += engagement.get('comments', 0) * 0.1
-            
-            return score
         
-        sorted_items = sorted(items, key=calculate_relevance, reverse=True)
-        return sorted_items
+        # Engagement metrics (if available)
+        engagement = item.get('engagement', {})
+        if isinstance(engagement, dict):
+            score += engagement.get('likes', 0) * 0.1
+            score += engagement.get('shares', 0) * 0.2
+            score += engagement.get('comments', 0) * 0.1
+        
+        return score
@@ -0,0 +1,283 @@
+"""
+Record/Replay Transports for HomeWatch Collectors
+
+Pluggable transports for HttpClient, mounted on each host's session in
+place of the default connection pool:
+- RecordTransport sends requests over the network and appends every
+  exchange (status, headers, body, time taken) to a JSON-lines fixture file
+- ReplayTransport answers from such a file without any network, as a local
+  stand-in with configurable latency and injected 503s / connection errors
+
+Secrets in query strings (API keys, tokens) are redacted before URLs are
+written or matched, and request headers are never recorded. Failure
+injection is decided from a hash of the seed, URL and attempt number, so
+a replay run fails the same requests however threads are scheduled.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# Query parameters whose values are replaced before recording or matching
+REDACTED_PARAMS = frozenset({'apikey', 'api_key', 'access_token', 'token', 'key'})
+# Response headers kept with a recorded exchange
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Location', 'Retry-After')
+
+
+def redact_url(url: str) -> str:
+    """URL with the values of secret query parameters replaced"""
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = [(name, 'REDACTED' if name.lower() in REDACTED_PARAMS else value)
+             for name, value in parse_qsl(parts.query, keep_blank_values=True)]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def exchange_key(method: str, url: str) -> str:
+    return f"{method.upper()} {redact_url(url)}"
+
+
+def encode_exchange(method: str, url: str, status: int, reason: str, headers, body: bytes,
+                    elapsed: float) -> Dict:
+    """Fixture record of one exchange; bodies that are not UTF-8 are stored as base64"""
+    exchange = {
+        'method': method.upper(),
+        'url': redact_url(url),
+        'status': status,
+        'reason': reason,
+        'headers': {name: headers[name] for name in RECORDED_HEADERS if headers.get(name)},
+        'elapsed': round(elapsed, 4)
+    }
+    try:
+        exchange['body'] = body.decode('utf-8')
+    except UnicodeDecodeError:
+        exchange['body_base64'] = base64.b64encode(body).decode('ascii')
+    return exchange
+
+
+def decode_body(exchange: Dict) -> bytes:
+    if 'body_base64' in exchange:
+        return base64.b64decode(exchange['body_base64'])
+    return exchange.get('body', '').encode('utf-8')
+
+
+class RecordTransport:
+    """
+    Live transport that appends every exchange to a fixture file
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: JSON-lines fixture file, appended to
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def adapter(self, pool_size: int) -> BaseAdapter:
+        return RecordingAdapter(self, pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+
+    def record(self, exchange: Dict):
+        line = json.dumps(exchange, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+            self.recorded += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'mode': 'record', 'path': self.path, 'recorded': self.recorded}
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that hands each completed exchange to its RecordTransport"""
+
+    def __init__(self, transport: RecordTransport, **kwargs):
+        self.transport = transport
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        body = response.content
+        self.transport.record(encode_exchange(request.method, request.url, response.status_code,
+                                              response.reason, response.headers, body,
+                                              time.perf_counter() - start))
+        return response
+
+
+class ReplayTransport:
+    """
+    Offline transport serving recorded exchanges
+
+    Exchanges recorded several times for one URL are replayed in order, the
+    last one repeating. A conditional request whose If-None-Match matches
+    the replayed ETag is answered 304 (recorded 304s are skipped). URLs
+    without a recording get a 404.
+    """
+
+    def __init__(self, path: Optional[str] = None, latency: Optional[float] = None,
+                 error_rate: float = 0.0, connection_error_rate: float = 0.0, seed: int = 0):
+        """
+        Args:
+            path: JSON-lines fixture file to load (optional; see add)
+            latency: Seconds each response takes (default: the recorded time)
+            error_rate: Share of attempts answered with 503
+            connection_error_rate: Share of attempts failing to connect
+            seed: Seed of the failure injection
+        """
+        self.path = path
+        self.latency = latency
+        self.error_rate = error_rate
+        self.connection_error_rate = connection_error_rate
+        self.seed = seed
+
+        self._exchanges: Dict[str, List[Dict]] = defaultdict(list)
+        self._served: Dict[str, int] = defaultdict(int)
+        self._attempts: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.counters = {'served': 0, 'not_modified': 0, 'missing': 0, 'errors': 0, 'connection_errors': 0}
+
+        if path:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    exchange = json.loads(line)
+                    # 304s recorded through an HTTP cache are answered from the ETag instead
+                    if exchange['status'] != 304:
+                        self._exchanges[exchange_key(exchange['method'], exchange['url'])].append(exchange)
+            logger.info(f"Loaded {sum(map(len, self._exchanges.values()))} recorded exchanges from {path}")
+
+    def add(self, method: str, url: str, status: int = 200, headers: Optional[Dict[str, str]] = None,
+            body: bytes = b'', reason: str = 'OK', elapsed: float = 0.0):
+        """Add an exchange to replay, as if it had been recorded"""
+        exchange = encode_exchange(method, url, status, reason, CaseInsensitiveDict(headers or {}), body, elapsed)
+        with self._lock:
+            self._exchanges[exchange_key(method, url)].append(exchange)
+
+    def adapter(self, pool_size: int) -> BaseAdapter:
+        return ReplayAdapter(self, pool_size)
+
+    def _injected(self, key: str, attempt: int, rate: float, salt: str) -> bool:
+        if rate <= 0:
+            return False
+        digest = hashlib.sha1(f"{self.seed}:{salt}:{key}:{attempt}".encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'big') / 2 ** 64 < rate
+
+    def respond(self, request) -> requests.Response:
+        """Recorded response to a prepared request, after the configured latency"""
+        key = exchange_key(request.method, request.url)
+        with self._lock:
+            attempt = self._attempts[key]
+            self._attempts[key] += 1
+            recorded = self._exchanges.get(key)
+            exchange = None
+            if recorded:
+                exchange = recorded[min(self._served[key], len(recorded) - 1)]
+
+        time.sleep(self.latency if self.latency is not None else (exchange or {}).get('elapsed', 0.0))
+
+        if self._injected(key, attempt, self.connection_error_rate, 'connect'):
+            with self._lock:
+                self.counters['connection_errors'] += 1
+            raise requests.ConnectionError(f"Injected connection error for {request.url}", request=request)
+        if self._injected(key, attempt, self.error_rate, 'status'):
+            with self._lock:
+                self.counters['errors'] += 1
+            return self._response(request, 503, 'Service Unavailable', {}, b'')
+        if exchange is None:
+            with self._lock:
+                self.counters['missing'] += 1
+            logger.warning(f"No recorded response for {key}")
+            return self._response(request, 404, 'Not Found', {}, b'')
+
+        with self._lock:
+            self._served[key] += 1
+            etag = exchange['headers'].get('ETag')
+            if etag and request.headers.get('If-None-Match') == etag:
+                self.counters['not_modified'] += 1
+                return self._response(request, 304, 'Not Modified', {'ETag': etag}, b'')
+            self.counters['served'] += 1
+        return self._response(request, exchange['status'], exchange.get('reason', ''), exchange['headers'],
+                              decode_body(exchange))
+
+    @staticmethod
+    def _response(request, status: int, reason: str, headers: Dict[str, str], body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response._content_consumed = True
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(0)
+        return response
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'mode': 'replay', 'path': self.path, 'recorded_urls': len(self._exchanges), **self.counters}
+
+
+class ReplayAdapter(BaseAdapter):
+    """Adapter answering from a ReplayTransport, at most pool_size requests at a time like a blocking pool"""
+
+    def __init__(self, transport: ReplayTransport, pool_size: int):
+        super().__init__()
+        self.transport = transport
+        self._pool = threading.BoundedSemaphore(max(1, pool_size))
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        with self._pool:
+            return self.transport.respond(request)
+
+    def close(self):
+        pass
+
+
+def transport_from_env():
+    """
+    Transport selected by HTTP_TRANSPORT: 'live' (default, None), 'record' or 'replay'
+
+    Fixtures live in HTTP_FIXTURES (default: data/fixtures/http.jsonl);
+    replay reads HTTP_REPLAY_LATENCY (default: recorded times),
+    HTTP_REPLAY_ERROR_RATE, HTTP_REPLAY_CONNECTION_ERROR_RATE and
+    HTTP_REPLAY_SEED.
+    """
+    mode = os.getenv('HTTP_TRANSPORT', 'live').lower()
+    path = os.getenv('HTTP_FIXTURES', 'data/fixtures/http.jsonl')
+    if mode == 'record':
+        return RecordTransport(path)
+    if mode == 'replay':
+        latency = os.getenv('HTTP_REPLAY_LATENCY')
+        return ReplayTransport(
+            path,
+            latency=float(latency) if latency else None,
+            error_rate=float(os.getenv('HTTP_REPLAY_ERROR_RATE', '0')),
+            connection_error_rate=float(os.getenv('HTTP_REPLAY_CONNECTION_ERROR_RATE', '0')),
+            seed=int(os.getenv('HTTP_REPLAY_SEED', '0'))
+        )
+    if mode != 'live':
+        logger.warning(f"Unknown HTTP_TRANSPORT {mode!r}, using live requests")
+    return None
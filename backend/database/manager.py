@@ -7,15 +7,32 @@ Supports both SQLite (development) and PostgreSQL (production)
 
 import sqlite3
 import logging
+import math
 import os
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import json
 import psycopg2
+from psycopg2.extras import Json, execute_batch, execute_values
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
+# Per-scorer scores stored next to the blended scores so results can be re-weighted
+COMPONENT_SCORERS = ('vader', 'textblob', 'housing')
+COMPONENT_SCORE_KEYS = ('compound', 'positive', 'negative', 'neutral')
+COMPONENT_SCORE_COLUMNS = [f"{scorer}_{key}" for scorer in COMPONENT_SCORERS for key in COMPONENT_SCORE_KEYS]
+# Where each scorer's scores sit in an analysis result's 'scores'
+COMPONENT_RESULT_KEYS = {'vader': 'vader', 'textblob': 'textblob', 'housing': 'housing_context'}
+
+# Columns written for each stored sentiment result, in row order
+SENTIMENT_RESULT_COLUMNS = [
+    'text', 'source', 'sentiment_label', 'confidence', 'compound_score',
+    'positive_score', 'negative_score', 'neutral_score', 'keywords',
+    'housing_relevance', 'region_mentioned', 'program_mentioned',
+    'metadata', 'analyzed_at'
+] + COMPONENT_SCORE_COLUMNS
+
 class DatabaseManager:
     """
     Manages database connections and operations for HomeWatch
@@ -70,6 +87,18 @@ class DatabaseManager:
                     positive_score REAL NOT NULL,
                     negative_score REAL NOT NULL,
                     neutral_score REAL NOT NULL,
+                    vader_compound REAL,
+                    vader_positive REAL,
+                    vader_negative REAL,
+                    vader_neutral REAL,
+                    textblob_compound REAL,
+                    textblob_positive REAL,
+                    textblob_negative REAL,
+                    textblob_neutral REAL,
+                    housing_compound REAL,
+                    housing_positive REAL,
+                    housing_negative REAL,
+                    housing_neutral REAL,
                     keywords TEXT,
                     housing_relevance REAL,
                     region_mentioned VARCHAR(50),
@@ -107,12 +136,90 @@ class DatabaseManager:
                 )
             ''')
             
+            # Create sentiment_cache table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sentiment_cache (
+                    cache_key VARCHAR(64) PRIMARY KEY,
+                    analyzer_version VARCHAR(32) NOT NULL,
+                    data TEXT NOT NULL,
+                    signature BLOB,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Create analysis_jobs table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS analysis_jobs (
+                    id VARCHAR(36) PRIMARY KEY,
+                    job_type VARCHAR(20) NOT NULL,
+                    status VARCHAR(20) NOT NULL,
+                    params TEXT NOT NULL,
+                    total INTEGER DEFAULT 0,
+                    processed INTEGER DEFAULT 0,
+                    errors INTEGER DEFAULT 0,
+                    checkpoint INTEGER DEFAULT 0,
+                    error TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    started_at TIMESTAMP,
+                    updated_at TIMESTAMP,
+                    finished_at TIMESTAMP
+                )
+            ''')
+            
+            # Create term frequency index tables
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS term_frequencies (
+                    source VARCHAR(20) NOT NULL,
+                    sentiment_label VARCHAR(20) NOT NULL,
+                    term VARCHAR(100) NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (source, sentiment_label, term)
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS term_index_documents (
+                    doc_key VARCHAR(100) PRIMARY KEY,
+                    source VARCHAR(20) NOT NULL,
+                    sentiment_label VARCHAR(20) NOT NULL,
+                    source_id INTEGER,
+                    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Create collection_state table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS collection_state (
+                    source VARCHAR(100) PRIMARY KEY,
+                    last_published TIMESTAMP,
+                    seen_ids TEXT NOT NULL,
+                    cursor TEXT,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Create settings table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS settings (
+                    name VARCHAR(100) PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Add columns introduced after the table was first created
+            self._add_missing_columns(cursor, 'sentiment_results', {column: 'REAL' for column in COMPONENT_SCORE_COLUMNS})
+            self._add_missing_columns(cursor, 'sentiment_cache', {'signature': 'BLOB'})
+            
             # Create indexes
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_sentiment_analyzed_at ON sentiment_results(analyzed_at)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_sentiment_source ON sentiment_results(source)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_sentiment_label ON sentiment_results(sentiment_label)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_posts_platform ON posts(platform)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_posts_posted_at ON posts(posted_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_sentiment_cache_version ON sentiment_cache(analyzer_version)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_sentiment_cache_created_at ON sentiment_cache(created_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_jobs_status ON analysis_jobs(status)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_term_index_documents_source ON term_index_documents(source, source_id)')
             
             conn.commit()
     
@@ -134,6 +241,18 @@ class DatabaseManager:
                         positive_score REAL NOT NULL,
                         negative_score REAL NOT NULL,
                         neutral_score REAL NOT NULL,
+                        vader_compound REAL,
+                        vader_positive REAL,
+                        vader_negative REAL,
+                        vader_neutral REAL,
+                        textblob_compound REAL,
+                        textblob_positive REAL,
+                        textblob_negative REAL,
+                        textblob_neutral REAL,
+                        housing_compound REAL,
+                        housing_positive REAL,
+                        housing_negative REAL,
+                        housing_neutral REAL,
                         keywords JSONB,
                         housing_relevance REAL,
                         region_mentioned VARCHAR(50),
@@ -171,12 +290,90 @@ class DatabaseManager:
                     )
                 ''')
                 
+                # Create sentiment_cache table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS sentiment_cache (
+                        cache_key VARCHAR(64) PRIMARY KEY,
+                        analyzer_version VARCHAR(32) NOT NULL,
+                        data JSONB NOT NULL,
+                        signature BYTEA,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Create analysis_jobs table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS analysis_jobs (
+                        id VARCHAR(36) PRIMARY KEY,
+                        job_type VARCHAR(20) NOT NULL,
+                        status VARCHAR(20) NOT NULL,
+                        params JSONB NOT NULL,
+                        total INTEGER DEFAULT 0,
+                        processed INTEGER DEFAULT 0,
+                        errors INTEGER DEFAULT 0,
+                        checkpoint INTEGER DEFAULT 0,
+                        error TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        started_at TIMESTAMP,
+                        updated_at TIMESTAMP,
+                        finished_at TIMESTAMP
+                    )
+                ''')
+                
+                # Create term frequency index tables
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS term_frequencies (
+                        source VARCHAR(20) NOT NULL,
+                        sentiment_label VARCHAR(20) NOT NULL,
+                        term VARCHAR(100) NOT NULL,
+                        count INTEGER NOT NULL,
+                        PRIMARY KEY (source, sentiment_label, term)
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS term_index_documents (
+                        doc_key VARCHAR(100) PRIMARY KEY,
+                        source VARCHAR(20) NOT NULL,
+                        sentiment_label VARCHAR(20) NOT NULL,
+                        source_id INTEGER,
+                        indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Create collection_state table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS collection_state (
+                        source VARCHAR(100) PRIMARY KEY,
+                        last_published TIMESTAMP,
+                        seen_ids JSONB NOT NULL,
+                        cursor TEXT,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Create settings table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS settings (
+                        name VARCHAR(100) PRIMARY KEY,
+                        value JSONB NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Add columns introduced after the table was first created
+                self._add_missing_columns(cursor, 'sentiment_results', {column: 'REAL' for column in COMPONENT_SCORE_COLUMNS})
+                self._add_missing_columns(cursor, 'sentiment_cache', {'signature': 'BYTEA'})
+                
                 # Create indexes
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_sentiment_analyzed_at ON sentiment_results(analyzed_at)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_sentiment_source ON sentiment_results(source)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_sentiment_label ON sentiment_results(sentiment_label)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_posts_platform ON posts(platform)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_posts_posted_at ON posts(posted_at)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_sentiment_cache_version ON sentiment_cache(analyzer_version)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_sentiment_cache_created_at ON sentiment_cache(created_at)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_jobs_status ON analysis_jobs(status)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_term_index_documents_source ON term_index_documents(source, source_id)')
                 
                 conn.commit()
                 
@@ -184,6 +381,19 @@ class DatabaseManager:
             logger.error(f"PostgreSQL initialization error: {str(e)}")
             raise
     
+    def _add_missing_columns(self, cursor, table: str, columns: Dict[str, str]):
+        """Add nullable columns that an existing table does not have yet"""
+        if self.db_type == 'sqlite':
+            cursor.execute(f'PRAGMA table_info({table})')
+            existing = {row[1] for row in cursor.fetchall()}
+            for column, column_type in columns.items():
+                if column not in existing:
+                    cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+                    logger.info(f"Added column {table}.{column}")
+        else:  # PostgreSQL
+            for column, column_type in columns.items():
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {column_type}')
+    
     @contextmanager
     def get_connection(self):
         """Get database connection context manager"""
@@ -215,63 +425,19 @@ class DatabaseManager:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Prepare data
-                keywords_json = json.dumps(result.get('keywords', []))
-                metadata_json = json.dumps(result.get('metadata', {}))
+                query = f'''
+                    INSERT INTO sentiment_results 
+                    ({', '.join(SENTIMENT_RESULT_COLUMNS)})
+                    VALUES ({', '.join(['?'] * len(SENTIMENT_RESULT_COLUMNS))})
+                '''
+                row = self._sentiment_result_row(result)
                 
                 if self.db_type == 'sqlite':
-                    query = '''
-                        INSERT INTO sentiment_results 
-                        (text, source, sentiment_label, confidence, compound_score, 
-                         positive_score, negative_score, neutral_score, keywords, 
-                         housing_relevance, region_mentioned, program_mentioned, 
-                         metadata, analyzed_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    '''
-                    cursor.execute(query, (
-                        result['text'],
-                        result['source'],
-                        result['sentiment_label'],
-                        result['confidence'],
-                        result['scores']['compound'],
-                        result['scores']['positive'],
-                        result['scores']['negative'],
-                        result['scores']['neutral'],
-                        keywords_json,
-                        result.get('housing_relevance'),
-                        result.get('region_mentioned'),
-                        result.get('program_mentioned'),
-                        metadata_json,
-                        result['analyzed_at']
-                    ))
+                    cursor.execute(query, row)
                     record_id = cursor.lastrowid
                     
                 else:  # PostgreSQL
-                    query = '''
-                        INSERT INTO sentiment_results 
-                        (text, source, sentiment_label, confidence, compound_score, 
-                         positive_score, negative_score, neutral_score, keywords, 
-                         housing_relevance, region_mentioned, program_mentioned, 
-                         metadata, analyzed_at)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        RETURNING id
-                    '''
-                    cursor.execute(query, (
-                        result['text'],
-                        result['source'],
-                        result['sentiment_label'],
-                        result['confidence'],
-                        result['scores']['compound'],
-                        result['scores']['positive'],
-                        result['scores']['negative'],
-                        result['scores']['neutral'],
-                        result.get('keywords', []),
-                        result.get('housing_relevance'),
-                        result.get('region_mentioned'),
-                        result.get('program_mentioned'),
-                        result.get('metadata', {}),
-                        result['analyzed_at']
-                    ))
+                    cursor.execute(query.replace('?', '%s') + ' RETURNING id', row)
                     record_id = cursor.fetchone()[0]
                 
                 conn.commit()
@@ -282,6 +448,195 @@ class DatabaseManager:
             logger.error(f"Error storing sentiment result: {str(e)}")
             raise
     
+    def _encode_json(self, value: Any) -> Any:
+        """Encode a value for a JSON column (TEXT on SQLite, JSONB on PostgreSQL)"""
+        return json.dumps(value) if self.db_type == 'sqlite' else Json(value)
+    
+    def _sentiment_result_row(self, result: Dict) -> Tuple:
+        """Values of a sentiment result in SENTIMENT_RESULT_COLUMNS order"""
+        scores = result['scores']
+        return (
+            result['text'],
+            result['source'],
+            result['sentiment_label'],
+            result['confidence'],
+            scores['compound'],
+            scores['positive'],
+            scores['negative'],
+            scores['neutral'],
+            self._encode_json(result.get('keywords', [])),
+            result.get('housing_relevance'),
+            result.get('region_mentioned'),
+            result.get('program_mentioned'),
+            self._encode_json(result.get('metadata', {})),
+            result['analyzed_at']
+        ) + self._component_scores(scores)
+    
+    @staticmethod
+    def _component_scores(scores: Dict) -> Tuple:
+        """Per-scorer scores in COMPONENT_SCORE_COLUMNS order (None for scorers that did not run)"""
+        values = []
+        for scorer in COMPONENT_SCORERS:
+            component = scores.get(COMPONENT_RESULT_KEYS[scorer]) or {}
+            values.extend(component.get(key) for key in COMPONENT_SCORE_KEYS)
+        return tuple(values)
+    
+    def _insert_sentiment_results(self, cursor, results: List[Dict]) -> int:
+        """Bulk insert sentiment results on an open cursor, skipping error entries"""
+        rows = [self._sentiment_result_row(result) for result in results if 'error' not in result]
+        
+        if not rows:
+            return 0
+        
+        query = f'''
+            INSERT INTO sentiment_results 
+            ({', '.join(SENTIMENT_RESULT_COLUMNS)})
+        '''
+        
+        if self.db_type == 'sqlite':
+            cursor.executemany(query + f"VALUES ({', '.join(['?'] * len(SENTIMENT_RESULT_COLUMNS))})", rows)
+        else:  # PostgreSQL
+            execute_values(cursor, query + 'VALUES %s', rows)
+        
+        return len(rows)
+    
+    def store_sentiment_results(self, results: List[Dict]) -> int:
+        """
+        Store many sentiment analysis results in one transaction
+        
+        Args:
+            results: Sentiment analysis result dictionaries (error entries
+                without scores are skipped)
+            
+        Returns:
+            Number of records stored
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                stored = self._insert_sentiment_results(cursor, results)
+                conn.commit()
+                
+                logger.debug(f"Stored {stored} sentiment results")
+                return stored
+                
+        except Exception as e:
+            logger.error(f"Error storing sentiment results: {str(e)}")
+            raise
+    
+    def _update_sentiment_results(self, cursor, updates: List[Dict]) -> int:
+        """Overwrite the scores of existing sentiment results on an open cursor"""
+        rows = [
+            (
+                result['sentiment_label'],
+                result['confidence'],
+                result['scores']['compound'],
+                result['scores']['positive'],
+                result['scores']['negative'],
+                result['scores']['neutral'],
+                self._encode_json(result.get('keywords', [])),
+                result.get('housing_relevance'),
+                result.get('region_mentioned'),
+                result.get('program_mentioned'),
+                result['analyzed_at']
+            ) + self._component_scores(result['scores']) + (result['id'],)
+            for result in updates
+        ]
+        
+        if not rows:
+            return 0
+        
+        query = f'''
+            UPDATE sentiment_results SET 
+            sentiment_label = ?, confidence = ?, compound_score = ?, 
+            positive_score = ?, negative_score = ?, neutral_score = ?, keywords = ?, 
+            housing_relevance = ?, region_mentioned = ?, program_mentioned = ?, 
+            analyzed_at = ?, {', '.join(f'{column} = ?' for column in COMPONENT_SCORE_COLUMNS)}
+            WHERE id = ?
+        '''
+        
+        if self.db_type == 'sqlite':
+            cursor.executemany(query, rows)
+        else:  # PostgreSQL
+            execute_batch(cursor, query.replace('?', '%s'), rows)
+        
+        return len(rows)
+    
+    def reweight_sentiment_results(self, weights: Dict[str, float], thresholds: Dict[str, float]) -> int:
+        """
+        Recompute blended scores, labels and confidence from stored component scores
+        
+        Runs as a single UPDATE mirroring SentimentAnalyzer._combine_scores and
+        _determine_sentiment: when TextBlob did not run (cascade mode) the
+        remaining weights are rescaled to the same total. Rows stored before
+        component scores were kept are left unchanged.
+        
+        Args:
+            weights: Scorer name -> weight, in the analyzer's combine_weights order
+            thresholds: Compound thresholds with 'positive' and 'negative' keys
+            
+        Returns:
+            Number of rows re-weighted
+        """
+        weights = {name: float(weight) for name, weight in weights.items()}
+        thresholds = {name: float(thresholds[name]) for name in ('positive', 'negative')}
+        if set(weights) != set(COMPONENT_SCORERS) or \
+                not all(math.isfinite(value) for value in [*weights.values(), *thresholds.values()]):
+            raise ValueError(f"Weights for {', '.join(COMPONENT_SCORERS)} and thresholds must be finite numbers")
+        
+        # Same scale factors _combine_scores computes per document
+        total_weight = sum(weights.values())
+        all_scorers = sum(weights[name] for name in COMPONENT_SCORERS)
+        without_textblob = sum(weights[name] for name in COMPONENT_SCORERS if name != 'textblob')
+        scale = (
+            f"(CASE WHEN textblob_compound IS NULL THEN {total_weight / without_textblob if without_textblob else 0.0!r} "
+            f"ELSE {total_weight / all_scorers if all_scorers else 0.0!r} END)"
+        )
+        
+        def blended(key: str) -> str:
+            return (
+                f"(vader_{key} * {weights['vader']!r} * {scale} "
+                f"+ COALESCE(textblob_{key} * {weights['textblob']!r} * {scale}, 0.0) "
+                f"+ housing_{key} * {weights['housing']!r} * {scale})"
+            )
+        
+        def clamp(expression: str) -> str:
+            if self.db_type == 'sqlite':
+                return f"MAX(0.0, MIN(1.0, {expression}))"
+            return f"GREATEST(0.0, LEAST(1.0, {expression}))"
+        
+        compound = blended('compound')
+        is_positive = f"{compound} >= {thresholds['positive']!r}"
+        is_negative = f"{compound} <= {thresholds['negative']!r}"
+        
+        query = f'''
+            UPDATE sentiment_results SET 
+            compound_score = {compound}, 
+            positive_score = {blended('positive')}, 
+            negative_score = {blended('negative')}, 
+            neutral_score = {blended('neutral')}, 
+            sentiment_label = CASE WHEN {is_positive} THEN 'positive' 
+                WHEN {is_negative} THEN 'negative' ELSE 'neutral' END, 
+            confidence = CASE WHEN {is_positive} THEN {clamp(blended('positive'))} 
+                WHEN {is_negative} THEN {clamp(blended('negative'))} 
+                ELSE {clamp(blended('neutral'))} END
+            WHERE vader_compound IS NOT NULL AND housing_compound IS NOT NULL
+        '''
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query)
+                updated = cursor.rowcount
+                conn.commit()
+                
+                logger.info(f"Re-weighted {updated} sentiment results with weights {weights}")
+                return updated
+                
+        except Exception as e:
+            logger.error(f"Error re-weighting sentiment results: {str(e)}")
+            raise
+    
     def store_post(self, post: Dict, sentiment_result_id: Optional[int] = None) -> int:
         """
         Store social media post or news article
@@ -395,6 +750,7 @@ class DatabaseManager:
                 
                 cursor.execute(query, params)
                 rows = cursor.fetchall()
+                columns = [column[0] for column in cursor.description]
                 
                 # Convert to dictionaries
                 results = []
@@ -404,24 +760,11 @@ class DatabaseManager:
                         result['keywords'] = json.loads(result['keywords'] or '[]')
                         result['metadata'] = json.loads(result['metadata'] or '{}')
                     else:
-                        result = {
-                            'id': row[0],
-                            'text': row[1],
-                            'source': row[2],
-                            'sentiment_label': row[3],
-                            'confidence': row[4],
-                            'compound_score': row[5],
-                            'positive_score': row[6],
-                            'negative_score': row[7],
-                            'neutral_score': row[8],
-                            'keywords': row[9] or [],
-                            'housing_relevance': row[10],
-                            'region_mentioned': row[11],
-                            'program_mentioned': row[12],
-                            'metadata': row[13] or {},
-                            'analyzed_at': row[14],
-                            'created_at': row[15]
-                        }
+                        # Map by column name: upgraded databases have the
+                        # component score columns appended, fresh ones in the middle
+                        result = dict(zip(columns, row))
+                        result['keywords'] = result['keywords'] or []
+                        result['metadata'] = result['metadata'] or {}
                     
                     # Reconstruct scores dict
                     result['scores'] = {
@@ -539,6 +882,619 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Error cleaning up cache: {str(e)}")
     
+    def get_cached_sentiment(self, cache_key: str) -> Optional[Dict]:
+        """
+        Retrieve a cached sentiment analysis result
+        
+        Args:
+            cache_key: Content-addressed key of the preprocessed text
+            
+        Returns:
+            Cached analysis dictionary if found, None otherwise
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = 'SELECT data FROM sentiment_cache WHERE cache_key = ?'
+            if self.db_type == 'postgresql':
+                query = query.replace('?', '%s')
+            
+            cursor.execute(query, [cache_key])
+            row = cursor.fetchone()
+            
+            if row:
+                return json.loads(row[0]) if self.db_type == 'sqlite' else row[0]
+            
+            return None
+    
+    def cache_sentiment(self, cache_key: str, analyzer_version: str, data: Dict,
+                        signature: Optional[bytes] = None):
+        """
+        Persist a sentiment analysis result in the cache table
+        
+        Args:
+            cache_key: Content-addressed key of the preprocessed text
+            analyzer_version: Analyzer/lexicon version the result was produced with
+            data: Analysis dictionary to cache
+            signature: Optional MinHash signature of the text, used to rebuild
+                the near-duplicate index after a restart
+        """
+        self.cache_sentiments([(cache_key, analyzer_version, data, signature)])
+    
+    def cache_sentiments(self, entries: List[Tuple[str, str, Dict, Optional[bytes]]]):
+        """
+        Persist several sentiment analysis results in one transaction
+        
+        Args:
+            entries: (cache_key, analyzer_version, data, signature) tuples,
+                as taken by cache_sentiment
+        """
+        if not entries:
+            return
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            if self.db_type == 'sqlite':
+                query = '''
+                    INSERT OR REPLACE INTO sentiment_cache 
+                    (cache_key, analyzer_version, data, signature) VALUES (?, ?, ?, ?)
+                '''
+            else:
+                query = '''
+                    INSERT INTO sentiment_cache (cache_key, analyzer_version, data, signature) 
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (cache_key) DO UPDATE SET
+                    analyzer_version = EXCLUDED.analyzer_version, data = EXCLUDED.data,
+                    signature = EXCLUDED.signature, created_at = CURRENT_TIMESTAMP
+                '''
+            
+            rows = [
+                (cache_key, analyzer_version, json.dumps(data),
+                 psycopg2.Binary(signature) if signature is not None and self.db_type == 'postgresql' else signature)
+                for cache_key, analyzer_version, data, signature in entries
+            ]
+            if self.db_type == 'sqlite':
+                cursor.executemany(query, rows)
+            else:
+                execute_batch(cursor, query, rows)
+            
+            conn.commit()
+    
+    def get_cached_signatures(self, analyzer_version: str, limit: int) -> List[Tuple[str, bytes]]:
+        """
+        Get MinHash signatures of cached sentiment results
+        
+        Args:
+            analyzer_version: Only entries of this analyzer version
+            limit: Maximum number of entries (the most recent are kept)
+            
+        Returns:
+            List of (cache_key, signature bytes) tuples, oldest first
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = '''
+                SELECT cache_key, signature FROM (
+                    SELECT cache_key, signature, created_at FROM sentiment_cache
+                    WHERE analyzer_version = ? AND signature IS NOT NULL
+                    ORDER BY created_at DESC LIMIT ?
+                ) recent ORDER BY created_at
+            '''
+            if self.db_type == 'postgresql':
+                query = query.replace('?', '%s')
+            
+            cursor.execute(query, [analyzer_version, limit])
+            return [(row[0], bytes(row[1])) for row in cursor.fetchall()]
+    
+    def purge_sentiment_cache(self, keep_version: str) -> int:
+        """
+        Remove cached sentiment results from other analyzer versions
+        
+        Args:
+            keep_version: Analyzer version whose entries are kept
+            
+        Returns:
+            Number of entries removed
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = 'DELETE FROM sentiment_cache WHERE analyzer_version != ?'
+                if self.db_type == 'postgresql':
+                    query = query.replace('?', '%s')
+                
+                cursor.execute(query, [keep_version])
+                deleted_count = cursor.rowcount
+                conn.commit()
+                
+                logger.info(f"Purged {deleted_count} stale sentiment cache entries")
+                return deleted_count
+                
+        except Exception as e:
+            logger.error(f"Error purging sentiment cache: {str(e)}")
+            return 0
+    
+    def prune_sentiment_cache(self, max_rows: int) -> int:
+        """
+        Keep only the most recently written cached sentiment results
+        
+        Args:
+            max_rows: Number of entries kept
+            
+        Returns:
+            Number of entries removed
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                if self.db_type == 'sqlite':
+                    query = '''
+                        DELETE FROM sentiment_cache WHERE cache_key IN (
+                            SELECT cache_key FROM sentiment_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                        )
+                    '''
+                else:
+                    query = '''
+                        DELETE FROM sentiment_cache WHERE cache_key IN (
+                            SELECT cache_key FROM sentiment_cache ORDER BY created_at DESC LIMIT ALL OFFSET %s
+                        )
+                    '''
+                
+                cursor.execute(query, [max(0, max_rows)])
+                deleted_count = cursor.rowcount
+                conn.commit()
+                
+                if deleted_count:
+                    logger.info(f"Pruned {deleted_count} sentiment cache entries beyond {max_rows}")
+                return deleted_count
+                
+        except Exception as e:
+            logger.error(f"Error pruning sentiment cache: {str(e)}")
+            return 0
+    
+    def create_analysis_job(self, job_id: str, job_type: str, params: Dict, total: int) -> Dict:
+        """
+        Create a queued analysis job
+        
+        Args:
+            job_id: Unique job identifier
+            job_type: Kind of job (batch, corpus, rescore)
+            params: Job input and options
+            total: Number of items the job will process
+            
+        Returns:
+            The stored job dictionary
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = '''
+                INSERT INTO analysis_jobs (id, job_type, status, params, total, created_at, updated_at) 
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            '''
+            if self.db_type == 'postgresql':
+                query = query.replace('?', '%s')
+            
+            now = datetime.utcnow().isoformat()
+            cursor.execute(query, (job_id, job_type, 'queued', self._encode_json(params), total, now, now))
+            conn.commit()
+        
+        logger.info(f"Created {job_type} analysis job {job_id} ({total} items)")
+        return self.get_analysis_job(job_id)
+    
+    def _job_from_row(self, cursor, row) -> Dict:
+        """Convert an analysis_jobs row to a dictionary"""
+        job = dict(zip([column[0] for column in cursor.description], row))
+        if self.db_type == 'sqlite':
+            job['params'] = json.loads(job['params'] or '{}')
+        return job
+    
+    def get_analysis_job(self, job_id: str) -> Optional[Dict]:
+        """
+        Retrieve an analysis job
+        
+        Args:
+            job_id: Job identifier
+            
+        Returns:
+            Job dictionary if found, None otherwise
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = 'SELECT * FROM analysis_jobs WHERE id = ?'
+            if self.db_type == 'postgresql':
+                query = query.replace('?', '%s')
+            
+            cursor.execute(query, [job_id])
+            row = cursor.fetchone()
+            
+            return self._job_from_row(cursor, row) if row else None
+    
+    def list_analysis_jobs(self, statuses: Optional[List[str]] = None, limit: int = 50) -> List[Dict]:
+        """
+        List analysis jobs, newest first
+        
+        Args:
+            statuses: Optional statuses to filter by
+            limit: Maximum number of jobs returned
+            
+        Returns:
+            List of job dictionaries
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = 'SELECT * FROM analysis_jobs'
+            params = []
+            
+            if statuses:
+                query += f" WHERE status IN ({', '.join('?' for _ in statuses)})"
+                params.extend(statuses)
+            
+            query += ' ORDER BY created_at DESC LIMIT ?'
+            params.append(limit)
+            
+            if self.db_type == 'postgresql':
+                query = query.replace('?', '%s')
+            
+            cursor.execute(query, params)
+            return [self._job_from_row(cursor, row) for row in cursor.fetchall()]
+    
+    def update_analysis_job(self, job_id: str, **fields):
+        """
+        Update job status fields
+        
+        Args:
+            job_id: Job identifier
+            **fields: Columns to set (status, error, started_at, finished_at, ...)
+        """
+        allowed = {'status', 'total', 'processed', 'errors', 'checkpoint', 'error', 'started_at', 'finished_at'}
+        unknown = set(fields) - allowed
+        if unknown:
+            raise ValueError(f"Unknown analysis job fields: {', '.join(sorted(unknown))}")
+        
+        fields['updated_at'] = datetime.utcnow().isoformat()
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            assignments = ', '.join(f"{name} = ?" for name in fields)
+            query = f'UPDATE analysis_jobs SET {assignments} WHERE id = ?'
+            if self.db_type == 'postgresql':
+                query = query.replace('?', '%s')
+            
+            cursor.execute(query, list(fields.values()) + [job_id])
+            conn.commit()
+    
+    def save_analysis_job_chunk(self, job_id: str, processed: int, errors: int, checkpoint: int,
+                                results: Optional[List[Dict]] = None,
+                                updates: Optional[List[Dict]] = None):
+        """
+        Store one chunk of job output and advance the job checkpoint atomically
+        
+        Results and the checkpoint are committed in the same transaction, so
+        a resumed job never stores a chunk twice.
+        
+        Args:
+            job_id: Job identifier
+            processed: Items processed so far
+            errors: Items that failed so far
+            checkpoint: Position to resume from
+            results: New sentiment results to insert
+            updates: Re-scored results (with the existing row 'id') to overwrite
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            self._insert_sentiment_results(cursor, results or [])
+            self._update_sentiment_results(cursor, updates or [])
+            
+            query = '''
+                UPDATE analysis_jobs SET processed = ?, errors = ?, checkpoint = ?, updated_at = ? 
+                WHERE id = ?
+            '''
+            if self.db_type == 'postgresql':
+                query = query.replace('?', '%s')
+            
+            cursor.execute(query, (processed, errors, checkpoint, datetime.utcnow().isoformat(), job_id))
+            conn.commit()
+    
+    def get_sentiment_id_range(self) -> Tuple[int, int]:
+        """
+        Get the number of stored sentiment results and the highest id
+        
+        Returns:
+            Tuple of (count, max_id)
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*), MAX(id) FROM sentiment_results')
+            count, max_id = cursor.fetchone()
+            return count, max_id or 0
+    
+    def get_sentiment_texts(self, after_id: int, max_id: int, limit: int) -> List[Dict]:
+        """
+        Page through stored sentiment result texts in id order
+        
+        Args:
+            after_id: Return rows with a greater id
+            max_id: Highest id to include
+            limit: Maximum number of rows
+            
+        Returns:
+            List of dictionaries with id, text, source, metadata and sentiment_label
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = '''
+                SELECT id, text, source, metadata, sentiment_label FROM sentiment_results 
+                WHERE id > ? AND id <= ? ORDER BY id LIMIT ?
+            '''
+            if self.db_type == 'postgresql':
+                query = query.replace('?', '%s')
+            
+            cursor.execute(query, (after_id, max_id, limit))
+            
+            rows = []
+            for row_id, text, source, metadata, sentiment_label in cursor.fetchall():
+                if self.db_type == 'sqlite':
+                    metadata = json.loads(metadata or '{}')
+                rows.append({'id': row_id, 'text': text, 'source': source, 'metadata': metadata or {},
+                             'sentiment_label': sentiment_label})
+            return rows
+    
+    def get_term_frequencies(self) -> List[Tuple[str, str, str, int]]:
+        """
+        Load the whole term frequency index
+        
+        Returns:
+            List of (source, sentiment_label, term, count) tuples
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT source, sentiment_label, term, count FROM term_frequencies')
+            return [tuple(row) for row in cursor.fetchall()]
+    
+    def get_term_index_documents(self, source: str) -> Dict[str, str]:
+        """
+        Get the documents indexed for a source
+        
+        Args:
+            source: Index source partition
+            
+        Returns:
+            Dictionary of doc_key -> sentiment_label
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = 'SELECT doc_key, sentiment_label FROM term_index_documents WHERE source = ?'
+            if self.db_type == 'postgresql':
+                query = query.replace('?', '%s')
+            
+            cursor.execute(query, [source])
+            return {doc_key: label for doc_key, label in cursor.fetchall()}
+    
+    def get_term_index_document_counts(self) -> List[Tuple[str, str, int]]:
+        """
+        Count indexed documents per partition
+        
+        Returns:
+            List of (source, sentiment_label, document count) tuples
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT source, sentiment_label, COUNT(*) FROM term_index_documents 
+                GROUP BY source, sentiment_label
+            ''')
+            return [tuple(row) for row in cursor.fetchall()]
+    
+    def get_term_index_high_water(self, source: str) -> int:
+        """Highest source_id indexed for a source (0 if none)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = 'SELECT MAX(source_id) FROM term_index_documents WHERE source = ?'
+            if self.db_type == 'postgresql':
+                query = query.replace('?', '%s')
+            
+            cursor.execute(query, [source])
+            return cursor.fetchone()[0] or 0
+    
+    def add_term_index_documents(self, documents: List[Tuple[str, str, str, Optional[int]]],
+                                 term_counts: List[Tuple[str, str, str, int]]):
+        """
+        Record indexed documents and add their term counts in one transaction
+        
+        Args:
+            documents: (doc_key, source, sentiment_label, source_id) tuples
+            term_counts: (source, sentiment_label, term, count) increments
+        """
+        if not documents:
+            return
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            documents_query = '''
+                INSERT INTO term_index_documents (doc_key, source, sentiment_label, source_id) 
+                VALUES (?, ?, ?, ?)
+            '''
+            counts_query = '''
+                INSERT INTO term_frequencies (source, sentiment_label, term, count) 
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (source, sentiment_label, term) 
+                DO UPDATE SET count = term_frequencies.count + excluded.count
+            '''
+            
+            if self.db_type == 'sqlite':
+                cursor.executemany(documents_query, documents)
+                cursor.executemany(counts_query, term_counts)
+            else:  # PostgreSQL
+                execute_batch(cursor, documents_query.replace('?', '%s'), documents)
+                execute_batch(cursor, counts_query.replace('?', '%s'), term_counts)
+            
+            conn.commit()
+    
+    def clear_term_index(self, source: str):
+        """
+        Remove every document and term count of a source partition
+        
+        Args:
+            source: Index source partition
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            for table in ('term_frequencies', 'term_index_documents'):
+                query = f'DELETE FROM {table} WHERE source = ?'
+                if self.db_type == 'postgresql':
+                    query = query.replace('?', '%s')
+                cursor.execute(query, [source])
+            
+            conn.commit()
+    
+    def get_collection_state(self, source: str) -> Optional[Dict]:
+        """
+        Get the incremental collection state of a source
+        
+        Args:
+            source: Collector source key (e.g. 'rss:the_star')
+            
+        Returns:
+            Dictionary with last_published (datetime or None), seen_ids
+            (id -> ISO publish time) and cursor, or None if never saved
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = 'SELECT last_published, seen_ids, cursor FROM collection_state WHERE source = ?'
+            if self.db_type == 'postgresql':
+                query = query.replace('?', '%s')
+            
+            cursor.execute(query, [source])
+            row = cursor.fetchone()
+            
+            if not row:
+                return None
+            
+            last_published, seen_ids, source_cursor = row
+            if isinstance(last_published, str):
+                last_published = datetime.fromisoformat(last_published)
+            if self.db_type == 'sqlite':
+                seen_ids = json.loads(seen_ids or '{}')
+            return {'last_published': last_published, 'seen_ids': seen_ids or {}, 'cursor': source_cursor}
+    
+    def save_collection_state(self, source: str, last_published: Optional[datetime],
+                              seen_ids: Dict[str, str], source_cursor: Optional[str] = None):
+        """
+        Persist the incremental collection state of a source
+        
+        Args:
+            source: Collector source key
+            last_published: Publish time high-water mark
+            seen_ids: Ids already collected near the high-water mark
+                (id -> ISO publish time)
+            source_cursor: API cursor token (e.g. a newest-id), if any
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            if self.db_type == 'sqlite':
+                query = '''
+                    INSERT OR REPLACE INTO collection_state 
+                    (source, last_published, seen_ids, cursor, updated_at) VALUES (?, ?, ?, ?, ?)
+                '''
+            else:
+                query = '''
+                    INSERT INTO collection_state (source, last_published, seen_ids, cursor, updated_at) 
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (source) DO UPDATE SET
+                    last_published = EXCLUDED.last_published, seen_ids = EXCLUDED.seen_ids,
+                    cursor = EXCLUDED.cursor, updated_at = EXCLUDED.updated_at
+                '''
+            cursor.execute(query, (source, last_published.isoformat() if last_published else None,
+                                   self._encode_json(seen_ids), source_cursor, datetime.now().isoformat()))
+            
+            conn.commit()
+    
+    def get_setting(self, name: str) -> Optional[Any]:
+        """
+        Get a persisted runtime setting
+        
+        Args:
+            name: Setting name (e.g. 'sentiment_combine_weights')
+            
+        Returns:
+            The stored JSON value, or None if never saved
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = 'SELECT value FROM settings WHERE name = ?'
+            if self.db_type == 'postgresql':
+                query = query.replace('?', '%s')
+            
+            cursor.execute(query, [name])
+            row = cursor.fetchone()
+            
+            if not row:
+                return None
+            return json.loads(row[0]) if self.db_type == 'sqlite' else row[0]
+    
+    def save_setting(self, name: str, value: Any):
+        """
+        Persist a runtime setting so it survives restarts
+        
+        Args:
+            name: Setting name
+            value: JSON-serializable value
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            if self.db_type == 'sqlite':
+                query = '''
+                    INSERT OR REPLACE INTO settings (name, value, updated_at) VALUES (?, ?, ?)
+                '''
+            else:
+                query = '''
+                    INSERT INTO settings (name, value, updated_at) VALUES (%s, %s, %s)
+                    ON CONFLICT (name) DO UPDATE SET
+                    value = EXCLUDED.value, updated_at = EXCLUDED.updated_at
+                '''
+            cursor.execute(query, (name, self._encode_json(value), datetime.now().isoformat()))
+            
+            conn.commit()
+    
+    def clear_collection_state(self, source: Optional[str] = None):
+        """
+        Forget incremental collection state so the next run covers the full window
+        
+        Args:
+            source: Collector source (e.g. 'rss:thestar'), clearing its state
+                for every keyword set, or None for every source
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            if source is None:
+                cursor.execute('DELETE FROM collection_state')
+            else:
+                query = 'DELETE FROM collection_state WHERE source = ? OR source LIKE ?'
+                if self.db_type == 'postgresql':
+                    query = query.replace('?', '%s')
+                cursor.execute(query, [source, f"{source}:%"])
+            
+            conn.commit()
+    
     def get_database_stats(self) -> Dict:
         """Get database statistics"""
         try:
@@ -559,6 +1515,9 @@ class DatabaseManager:
                 cursor.execute('SELECT COUNT(*) FROM analytics_cache')
                 stats['cache_entries_count'] = cursor.fetchone()[0]
                 
+                cursor.execute('SELECT COUNT(*) FROM sentiment_cache')
+                stats['sentiment_cache_entries_count'] = cursor.fetchone()[0]
+                
                 # Latest sentiment result
                 cursor.execute('SELECT MAX(analyzed_at) FROM sentiment_results')
                 latest_sentiment = cursor.fetchone()[0]
@@ -0,0 +1,399 @@
+"""
+Background Analysis Jobs for HomeWatch
+
+Runs large sentiment workloads outside the request cycle:
+- batch: a list of texts submitted with the job
+- corpus: a JSON corpus file from the dataset directory
+- rescore: re-score every stored row of sentiment_results in place
+
+Job state and a checkpoint live in the analysis_jobs table. Each processed
+chunk is committed together with its checkpoint, so jobs interrupted by a
+restart resume where they stopped.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPES = ('batch', 'corpus', 'rescore')
+ACTIVE_STATUSES = ('queued', 'running')
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+class JobCancelled(Exception):
+    """Raised inside a job run when the job has been cancelled"""
+
+
+class JobInterrupted(Exception):
+    """Raised inside a job run when the manager is stopping; the job resumes on restart"""
+
+
+class JobManager:
+    """
+    Queue of background sentiment analysis jobs run by a pool of worker threads
+    """
+
+    def __init__(self, analyzer, db_manager, workers: Optional[int] = None,
+                 chunk_size: Optional[int] = None, corpus_dir: Optional[str] = None,
+                 on_results_stored: Optional[Callable[[str, bool], None]] = None):
+        """
+        Args:
+            analyzer: SentimentAnalyzer used to score job items
+            db_manager: DatabaseManager holding job state and results
+            workers: Number of jobs run concurrently
+            chunk_size: Items scored and checkpointed together
+            corpus_dir: Directory corpus jobs may read from
+            on_results_stored: Called with (job type, finished) after a chunk
+                of results is stored and once more when a job stops running
+        """
+        self.analyzer = analyzer
+        self.db_manager = db_manager
+        self.workers = max(1, workers or int(os.getenv('ANALYSIS_JOB_WORKERS', 1)))
+        self.chunk_size = max(1, chunk_size or int(os.getenv('ANALYSIS_JOB_CHUNK_SIZE', 100)))
+        self.corpus_dir = os.path.realpath(corpus_dir or os.getenv('ANALYSIS_JOB_CORPUS_DIR', 'dataset'))
+        self.on_results_stored = on_results_stored
+
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._cancelled = set()
+        self._runs = {}  # job_id -> (start time, processed count at start) for throughput
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads and re-queue jobs left unfinished by a previous run"""
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+
+            for job in reversed(self.db_manager.list_analysis_jobs(list(ACTIVE_STATUSES), limit=1000)):
+                logger.info(f"Resuming analysis job {job['id']} from checkpoint {job['checkpoint']}")
+                self._enqueue_locked(job['id'])
+
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f"analysis-job-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+        logger.info(f"JobManager started with {self.workers} workers")
+
+    def stop(self):
+        """Stop the worker threads after their current chunk, leaving unfinished jobs to resume"""
+        self._stopping.set()
+        with self._lock:
+            threads = self._threads
+            self._threads = []
+            self._pending.clear()
+        # Drop queued jobs (they stay queued in the database) so workers see the stop signal
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+
+    def submit(self, job_type: str, params: Dict) -> Dict:
+        """
+        Validate and queue a new job
+
+        Args:
+            job_type: One of JOB_TYPES
+            params: Job input ('texts' for batch, 'path' for corpus) and options
+                ('mode', 'source')
+
+        Returns:
+            The queued job with progress fields
+
+        Raises:
+            ValueError: If the job type or parameters are invalid
+        """
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Job type must be one of: {', '.join(JOB_TYPES)}")
+
+        mode = params.get('mode')
+        if mode is not None:
+            self.analyzer._validate_mode(mode)
+
+        job_params = {'mode': mode}
+        if job_type == 'batch':
+            texts = params.get('texts')
+            if not isinstance(texts, list) or not texts:
+                raise ValueError('Batch jobs require a non-empty texts array')
+            job_params.update(texts=texts, source=params.get('source', 'user_post'))
+            total = len(texts)
+        elif job_type == 'corpus':
+            path = self._resolve_corpus_path(params.get('path'))
+            job_params.update(path=os.path.relpath(path, self.corpus_dir), source=params.get('source', 'news'))
+            total = len(self._load_corpus(path))
+        else:
+            total, max_id = self.db_manager.get_sentiment_id_range()
+            job_params.update(max_id=max_id)
+
+        job_id = uuid.uuid4().hex
+        self.db_manager.create_analysis_job(job_id, job_type, job_params, total)
+
+        with self._lock:
+            started = bool(self._threads)
+            if started:
+                self._enqueue_locked(job_id)
+        if not started:
+            self.start()
+
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Get a job with progress, throughput and ETA
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Job dictionary, or None if the job does not exist
+        """
+        job = self.db_manager.get_analysis_job(job_id)
+        return self._with_progress(job) if job else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """List recent jobs, newest first"""
+        jobs = self.db_manager.list_analysis_jobs([status] if status else None, limit)
+        return [self._with_progress(job) for job in jobs]
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        Cancel a queued or running job
+
+        A running job stops after its current chunk; results already stored
+        are kept.
+
+        Returns:
+            The job dictionary, or None if the job does not exist
+        """
+        job = self.db_manager.get_analysis_job(job_id)
+        if job is None:
+            return None
+
+        if job['status'] in ACTIVE_STATUSES:
+            with self._lock:
+                self._cancelled.add(job_id)
+                running = job_id in self._runs
+            if not running:
+                self._finish(job_id, 'cancelled')
+            logger.info(f"Cancellation requested for analysis job {job_id}")
+
+        return self.get(job_id)
+
+    def _enqueue_locked(self, job_id: str):
+        """Queue a job once (caller holds the lock)"""
+        if job_id not in self._pending:
+            self._pending.add(job_id)
+            self._queue.put(job_id)
+
+    def _worker_loop(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            try:
+                self._run(job_id)
+            except Exception as e:
+                logger.error(f"Analysis job {job_id} failed: {str(e)}")
+                self._finish(job_id, 'failed', error=str(e))
+            finally:
+                with self._lock:
+                    self._pending.discard(job_id)
+                    self._cancelled.discard(job_id)
+                    self._runs.pop(job_id, None)
+
+    def _run(self, job_id: str):
+        """Process a job from its checkpoint to completion"""
+        job = self.db_manager.get_analysis_job(job_id)
+        if job is None or job['status'] not in ACTIVE_STATUSES:
+            return
+
+        with self._lock:
+            if job_id in self._cancelled:
+                cancelled = True
+            else:
+                cancelled = False
+                self._runs[job_id] = (time.perf_counter(), job['processed'])
+        if cancelled:
+            self._finish(job_id, 'cancelled')
+            return
+
+        self.db_manager.update_analysis_job(
+            job_id, status='running', started_at=job['started_at'] or datetime.utcnow().isoformat()
+        )
+
+        try:
+            if job['job_type'] == 'rescore':
+                self._run_rescore(job)
+            else:
+                self._run_items(job)
+        except JobCancelled:
+            self._finish(job_id, 'cancelled')
+            return
+        except JobInterrupted:
+            logger.info(f"Analysis job {job_id} interrupted; it will resume from its checkpoint")
+            return
+        finally:
+            # Chunks stored before a cancel, interruption or failure are kept too
+            self._notify_results_stored(job['job_type'], finished=True)
+
+        self._finish(job_id, 'completed')
+
+    def _check_cancelled(self, job_id: str):
+        if self._stopping.is_set():
+            raise JobInterrupted(job_id)
+        with self._lock:
+            if job_id in self._cancelled:
+                raise JobCancelled(job_id)
+
+    def _run_items(self, job: Dict):
+        """Score a batch or corpus job, inserting new sentiment results"""
+        params = job['params']
+        if job['job_type'] == 'batch':
+            items = params['texts']
+        else:
+            items = self._load_corpus(self._resolve_corpus_path(params['path']))
+
+        position = job['checkpoint']
+        processed = job['processed']
+        errors = job['errors']
+
+        while position < len(items):
+            self._check_cancelled(job['id'])
+
+            chunk = [self._job_item(item, position + offset) for offset, item in
+                     enumerate(items[position:position + self.chunk_size])]
+            results = self.analyzer.analyze_batch(chunk, mode=params.get('mode'))
+            for result in results:
+                if 'error' not in result:
+                    result['source'] = params['source']
+
+            position += len(chunk)
+            processed += len(chunk)
+            errors += sum(1 for result in results if 'error' in result)
+            self.db_manager.save_analysis_job_chunk(job['id'], processed, errors, position, results=results)
+            self._notify_results_stored(job['job_type'], finished=False)
+
+    def _run_rescore(self, job: Dict):
+        """Re-score stored sentiment results in id order, updating them in place"""
+        params = job['params']
+        last_id = job['checkpoint']
+        processed = job['processed']
+        errors = job['errors']
+
+        while True:
+            self._check_cancelled(job['id'])
+
+            rows = self.db_manager.get_sentiment_texts(last_id, params['max_id'], self.chunk_size)
+            if not rows:
+                break
+
+            results = self.analyzer.analyze_batch(
+                [{'text': row['text'], 'id': row['id'], 'metadata': row['metadata']} for row in rows],
+                mode=params.get('mode')
+            )
+
+            last_id = rows[-1]['id']
+            processed += len(rows)
+            errors += sum(1 for result in results if 'error' in result)
+            self.db_manager.save_analysis_job_chunk(
+                job['id'], processed, errors, last_id,
+                updates=[result for result in results if 'error' not in result]
+            )
+
+    @staticmethod
+    def _job_item(item, position: int) -> Dict:
+        """Normalize a batch entry or corpus article into an analyze_batch item"""
+        if isinstance(item, str):
+            return {'text': item, 'id': f"job_{position}"}
+
+        metadata = dict(item.get('metadata') or {})
+        for field in ('title', 'source', 'url'):
+            if item.get(field) and field not in metadata:
+                metadata[field] = item[field]
+
+        return {
+            'text': item.get('text') or item.get('content') or '',
+            'id': item.get('id', f"job_{position}"),
+            'metadata': metadata
+        }
+
+    def _resolve_corpus_path(self, path: Optional[str]) -> str:
+        """Resolve a corpus path inside the corpus directory"""
+        if not path or not isinstance(path, str):
+            raise ValueError('Corpus jobs require a path')
+
+        resolved = os.path.realpath(os.path.join(self.corpus_dir, path))
+        if os.path.commonpath([resolved, self.corpus_dir]) != self.corpus_dir:
+            raise ValueError('Corpus path must be inside the dataset directory')
+        if not os.path.isfile(resolved):
+            raise ValueError(f"Corpus file not found: {path}")
+        return resolved
+
+    @staticmethod
+    def _load_corpus(path: str) -> List:
+        """Load a JSON corpus (a list of articles or texts)"""
+        with open(path, 'r', encoding='utf-8') as f:
+            corpus = json.load(f)
+
+        if not isinstance(corpus, list):
+            raise ValueError('Corpus file must contain a JSON array')
+        return corpus
+
+    def _notify_results_stored(self, job_type: str, finished: bool):
+        if self.on_results_stored is None:
+            return
+        try:
+            self.on_results_stored(job_type, finished)
+        except Exception as e:
+            logger.error(f"Analysis job results callback failed: {str(e)}")
+
+    def _finish(self, job_id: str, status: str, error: Optional[str] = None):
+        self.db_manager.update_analysis_job(
+            job_id, status=status, error=error, finished_at=datetime.utcnow().isoformat()
+        )
+        logger.info(f"Analysis job {job_id} {status}")
+
+    def _with_progress(self, job: Dict) -> Dict:
+        """Add percent complete, throughput and ETA to a job dictionary"""
+        params = job.pop('params', {}) or {}
+        job['params'] = {key: value for key, value in params.items() if key != 'texts'}
+
+        total = job['total'] or 0
+        processed = job['processed'] or 0
+        job['progress'] = processed / total if total else (1.0 if job['status'] == 'completed' else 0.0)
+
+        with self._lock:
+            run = self._runs.get(job['id'])
+
+        job['items_per_second'] = None
+        job['eta_seconds'] = None
+        if run is not None and job['status'] == 'running':
+            started, processed_at_start = run
+            elapsed = time.perf_counter() - started
+            rate = (processed - processed_at_start) / elapsed if elapsed > 0 else 0.0
+            if rate > 0:
+                job['items_per_second'] = rate
+                job['eta_seconds'] = max(0, total - processed) / rate
+
+        for field in ('created_at', 'started_at', 'updated_at', 'finished_at'):
+            if isinstance(job.get(field), datetime):
+                job[field] = job[field].isoformat()
+
+        return job
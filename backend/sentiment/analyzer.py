@@ -6,62 +6,45 @@ Advanced sentiment analysis using multiple techniques:
 - TextBlob for general sentiment
 - Custom housing domain classifier
 - Malaysian context awareness
+
+NLTK, VADER and TextBlob are loaded lazily on first use (see
+sentiment/resources.py); call SentimentAnalyzer.warm_up() to load them ahead
+of the first request.
 """
 
-import re
+import os
 import json
+import math
+import hashlib
 import logging
+import threading
+from collections import Counter
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple, Union
 from dataclasses import dataclass
 
-# NLP Libraries
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from textblob import TextBlob
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import PorterStemmer
+import numpy as np
 
-# Initialize logging first
-logger = logging.getLogger(__name__)
+from sentiment import resources
+from sentiment.chunking import split_sentence_chunks
+from sentiment.columnar import ColumnarBatchBuilder, ColumnarBatchResult
+from sentiment.dedup import NearDuplicateIndex
+from sentiment.instrumentation import PipelineMetrics, StageTimer
+from sentiment.normalizer import TextNormalizer
+from sentiment.parallel import ProcessPoolBatchRunner
+from sentiment.phrase_matcher import PhraseMatcher
+from sentiment.resources import word_tokenize
+from sentiment.wordcloud import WordCloudEngine
 
-# Download required NLTK data
-def ensure_nltk_data():
-    """Ensure required NLTK data is available"""
-    try:
-        # Try basic tokenization first
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        try:
-            nltk.download('punkt', quiet=True)
-        except Exception as e:
-            logger.warning(f"Could not download punkt: {e}")
-    
-    try:
-        # Try newer punkt_tab if available
-        nltk.data.find('tokenizers/punkt_tab')
-    except LookupError:
-        try:
-            nltk.download('punkt_tab', quiet=True)
-        except Exception:
-            pass  # Not critical if this fails
-    
-    try:
-        nltk.data.find('corpora/stopwords')
-    except LookupError:
-        try:
-            nltk.download('stopwords', quiet=True)
-        except Exception as e:
-            logger.warning(f"Could not download stopwords: {e}")
+logger = logging.getLogger(__name__)
 
-# Initialize NLTK data
-try:
-    ensure_nltk_data()
-except Exception as e:
-    print(f"NLTK initialization warning: {e}")
+# Bump when scoring logic changes so cached results are not reused
+ANALYZER_VERSION = '1'
 
-logger = logging.getLogger(__name__)
+# 'full' runs every scorer; 'cascade' runs TextBlob only for uncertain texts
+ANALYSIS_MODES = ('full', 'cascade')
 
 @dataclass
 class SentimentResult:
@@ -78,23 +61,50 @@ class SentimentResult:
     metadata: Dict
     analyzed_at: datetime
 
+@dataclass
+class AnalysisContext:
+    """Per-document state shared by every scorer and extractor"""
+    text: str
+    tokens: List[str]
+    token_set: Set[str]
+    words: List[str]  # Word tokens for phrase matching
+    
+    @classmethod
+    def from_text(cls, text: str) -> 'AnalysisContext':
+        """Tokenize the preprocessed text once for the whole analysis"""
+        tokens = word_tokenize(text)
+        return cls(text=text, tokens=tokens, token_set=set(tokens),
+                   words=PhraseMatcher.words_from_tokens(tokens))
+
+# Text-dependent fields of an analysis, as cached (see _analyze_text)
+ANALYSIS_FIELDS = ('sentiment_label', 'confidence', 'scores', 'keywords', 'housing_relevance',
+                   'region_mentioned', 'program_mentioned', 'analysis_mode', 'scorers_run')
+
 class SentimentAnalyzer:
     """
     Comprehensive sentiment analyzer for housing-related content
     """
     
-    def __init__(self):
-        self.vader = SentimentIntensityAnalyzer()
-        self.stemmer = PorterStemmer()
-        
-        # Load Malaysian stopwords (English + some Malay)
-        english_stopwords = set(stopwords.words('english'))
-        malay_stopwords = {
-            'yang', 'dan', 'di', 'ke', 'dari', 'untuk', 'dengan', 'pada', 
-            'adalah', 'akan', 'atau', 'juga', 'tidak', 'ada', 'sebagai',
-            'dalam', 'oleh', 'ini', 'itu', 'mereka', 'kami', 'kita'
-        }
-        self.stopwords = english_stopwords.union(malay_stopwords)
+    def __init__(self, batch_workers: Optional[int] = None, batch_chunk_size: Optional[int] = None,
+                 cache=None, mode: Optional[str] = None, metrics: Optional[PipelineMetrics] = None,
+                 dedup_index: Optional[NearDuplicateIndex] = None):
+        """
+        Args:
+            batch_workers: Worker processes for analyze_batch; 0 or 1 scores
+                batches in-process (default: SENTIMENT_BATCH_WORKERS or 0)
+            batch_chunk_size: Items per worker task (default:
+                SENTIMENT_BATCH_CHUNK_SIZE or 64)
+            cache: Optional SentimentCache consulted before scoring
+            mode: Default analysis mode, 'full' or 'cascade'
+                (default: SENTIMENT_MODE or 'full')
+            metrics: PipelineMetrics receiving per-stage timings (default: a
+                new instance, disabled when SENTIMENT_STAGE_METRICS=false)
+            dedup_index: Optional NearDuplicateIndex; on a cache miss, a text
+                that is a near-duplicate of a cached one reuses its result
+                (requires cache)
+        """
+        # Load Malaysian stopwords (English + some Malay) from the bundled lexicons
+        self.stopwords = resources.get_stopwords()
         
         # Housing-related keywords and their weights
         self.housing_keywords = {
@@ -132,9 +142,109 @@ class SentimentAnalyzer:
             'social-housing': ['social housing', 'rumah awam']
         }
         
+        # Weights used by _combine_scores to blend the scorers
+        self.combine_weights = {
+            'vader': 0.4,
+            'textblob': 0.3,
+            'housing': 0.3
+        }
+        weights_setting = os.getenv('SENTIMENT_COMBINE_WEIGHTS')
+        if weights_setting:
+            # e.g. "vader=0.5,textblob=0.2,housing=0.3"
+            try:
+                self.set_combine_weights(self.parse_combine_weights(weights_setting))
+            except ValueError as e:
+                logger.error(f"Ignoring SENTIMENT_COMBINE_WEIGHTS={weights_setting!r}: {str(e)}; "
+                             f"using {self.combine_weights}")
+        
+        # Compound score thresholds used by _determine_sentiment
+        self.sentiment_thresholds = {'positive': 0.05, 'negative': -0.05}
+        
+        # Cascade mode calls TextBlob only when the VADER + housing compound
+        # lies within this distance of the neutral band
+        self.cascade_band = float(os.getenv('SENTIMENT_CASCADE_BAND', '0.15'))
+        self.mode = self._validate_mode(mode or os.getenv('SENTIMENT_MODE', 'full'))
+        
+        # Terms used for housing relevance scoring
+        self.housing_terms = {
+            'house', 'home', 'property', 'housing', 'apartment', 'condo',
+            'rumah', 'hartanah', 'pr1ma', 'affordable', 'loan', 'mortgage',
+            'rent', 'buy', 'purchase', 'development', 'project'
+        }
+        
+        # Compiled phrase matchers for region and programme detection.
+        # Region labels are (region, partial): full names win over a lone
+        # word of a multi-word name such as 'negeri' or 'lumpur'
+        self.region_matcher = PhraseMatcher(
+            [(region, (region, False)) for region in sorted(self.regions)] +
+            [(word, (region, True)) for region in sorted(self.regions)
+             if ' ' in region for word in region.split()]
+        )
+        self.program_matcher = PhraseMatcher([
+            (variation, program_id)
+            for program_id, variations in self.programs.items()
+            for variation in variations
+        ])
+        
+        # Long documents are scored as sentence-bounded chunks (analyze_document)
+        self.long_document_chars = int(os.getenv('SENTIMENT_LONG_DOCUMENT_CHARS', '3000'))
+        self.document_chunk_chars = int(os.getenv('SENTIMENT_DOCUMENT_CHUNK_CHARS', '1500'))
+        
+        # Opt-in multiprocessing backend for analyze_batch
+        if batch_workers is None:
+            batch_workers = int(os.getenv('SENTIMENT_BATCH_WORKERS', '0'))
+        if batch_chunk_size is None:
+            batch_chunk_size = int(os.getenv('SENTIMENT_BATCH_CHUNK_SIZE', '64'))
+        self.batch_workers = batch_workers
+        self.batch_chunk_size = batch_chunk_size
+        self._batch_runner = None
+        self._batch_runner_users: Dict[ProcessPoolBatchRunner, int] = {}
+        self._batch_runner_lock = threading.Lock()
+        self._wordcloud_engine = None
+        
+        self.cache = cache
+        self.dedup_index = dedup_index
+        self._dedup_version = None
+        if metrics is None:
+            metrics = PipelineMetrics(enabled=os.getenv('SENTIMENT_STAGE_METRICS', 'true').lower() != 'false')
+        self.metrics = metrics
+        self._static_fingerprint = self._fingerprint(
+            sorted(self.stopwords), sorted(self.regions), self.programs, sorted(self.housing_terms)
+        )
+        
         logger.info("SentimentAnalyzer initialized successfully")
     
-    def analyze(self, text: str, source: str = 'user_post', metadata: Dict = None) -> Dict:
+    @property
+    def vader(self):
+        """VADER analyzer, built on first use"""
+        return resources.get_vader()
+    
+    @property
+    def stemmer(self):
+        """Porter stemmer, built on first use"""
+        return resources.get_stemmer()
+    
+    @property
+    def wordcloud_engine(self) -> WordCloudEngine:
+        """Word cloud counter, built on first use"""
+        if self._wordcloud_engine is None:
+            self._wordcloud_engine = WordCloudEngine()
+        return self._wordcloud_engine
+    
+    def warm_up(self, download_missing: bool = False) -> Dict[str, float]:
+        """
+        Load NLTK, VADER and TextBlob ahead of the first request
+        
+        Args:
+            download_missing: Download missing NLTK tokenizer data first
+            
+        Returns:
+            Seconds spent loading each resource
+        """
+        return resources.warm_up(download_missing)
+    
+    def analyze(self, text: str, source: str = 'user_post', metadata: Dict = None,
+                mode: Optional[str] = None, debug: bool = False) -> Dict:
         """
         Perform comprehensive sentiment analysis on text
         
@@ -142,6 +252,8 @@ class SentimentAnalyzer:
             text: Input text to analyze
             source: Source of the text (user_post, news, social_media)
             metadata: Additional metadata about the text
+            mode: Optional override of the analysis mode ('full' or 'cascade')
+            debug: Add per-stage timings in milliseconds as 'timings_ms'
             
         Returns:
             Dictionary containing sentiment analysis results
@@ -152,76 +264,626 @@ class SentimentAnalyzer:
         if metadata is None:
             metadata = {}
         
+        mode = self._validate_mode(mode or self.mode)
+        
         try:
-            # Clean and preprocess text
-            cleaned_text = self._preprocess_text(text)
-            
-            # Perform multiple sentiment analyses
-            vader_scores = self._analyze_vader(cleaned_text)
-            textblob_scores = self._analyze_textblob(cleaned_text)
-            housing_scores = self._analyze_housing_context(cleaned_text)
+            timings = {} if debug else None
+            analysis = self._analyze_text(text, mode, timings)
+            logger.debug(f"Sentiment analysis completed: {analysis['sentiment_label']} "
+                         f"({analysis['confidence']:.2f})")
+            result = self._build_result(text, source, metadata, analysis)
+            if debug:
+                result['timings_ms'] = {stage: seconds * 1000 for stage, seconds in timings.items()}
+            return result
             
-            # Combine scores
-            combined_scores = self._combine_scores(vader_scores, textblob_scores, housing_scores)
+        except Exception as e:
+            logger.error(f"Sentiment analysis error: {str(e)}")
+            raise
+    
+    def analyze_document(self, text: str, source: str = 'news', metadata: Dict = None,
+                         mode: Optional[str] = None, chunk_chars: Optional[int] = None,
+                         workers: Optional[int] = None) -> Dict:
+        """
+        Analyze a long document as sentence-bounded chunks
+        
+        Texts up to long_document_chars are analyzed whole, exactly as by
+        analyze(). Longer texts are split into chunks of at most chunk_chars
+        characters, scored as a batch (on the process pool when workers > 1)
+        and aggregated with length weighting.
+        
+        Args:
+            text: Document text
+            source: Source of the text
+            metadata: Additional metadata about the text
+            mode: Optional override of the analysis mode
+            chunk_chars: Optional override of document_chunk_chars
+            workers: Worker processes for the chunks (default: batch_workers)
             
-            # Extract features
-            keywords = self._extract_keywords(cleaned_text)
-            housing_relevance = self._calculate_housing_relevance(cleaned_text, keywords)
-            region = self._extract_region(cleaned_text)
-            program = self._extract_program(cleaned_text)
+        Returns:
+            Sentiment analysis result; chunked documents add 'chunks' (span
+            and scores of each chunk) and 'most_negative_chunks'
+        """
+        if not text or not isinstance(text, str):
+            raise ValueError("Text must be a non-empty string")
+        
+        if metadata is None:
+            metadata = {}
+        
+        mode = self._validate_mode(mode or self.mode)
+        chunk_chars = chunk_chars or self.document_chunk_chars
+        chunks = split_sentence_chunks(text, chunk_chars) if len(text) > self.long_document_chars else []
+        if len(chunks) < 2:
+            return self.analyze(text, source, metadata, mode=mode)
+        
+        workers = self.batch_workers if workers is None else workers
+        results = self._score_batch(
+            [{'text': chunk.text, 'id': chunk.index} for chunk in chunks],
+            workers=workers, chunk_size=math.ceil(len(chunks) / max(1, workers)), mode=mode
+        )
+        scored = [(chunk, result) for chunk, result in zip(chunks, results) if 'error' not in result]
+        if not scored:
+            raise ValueError("No chunk of the document could be analyzed")
+        
+        analysis = self._aggregate_chunks(scored, mode)
+        result = self._build_result(text, source, metadata, analysis)
+        result['chunks'] = [
+            {
+                'index': chunk.index,
+                'start': chunk.start,
+                'end': chunk.end,
+                'sentiment_label': chunk_result['sentiment_label'],
+                'confidence': chunk_result['confidence'],
+                'scores': {key: chunk_result['scores'][key] for key in ('compound', 'positive', 'negative', 'neutral')}
+            }
+            for chunk, chunk_result in scored
+        ]
+        
+        # Surface the paragraphs that pull the document down
+        negative = sorted(
+            (entry for entry in result['chunks']
+             if entry['scores']['compound'] <= self.sentiment_thresholds['negative']),
+            key=lambda entry: entry['scores']['compound']
+        )
+        result['most_negative_chunks'] = [
+            {**entry, 'text': chunks[entry['index']].text} for entry in negative[:3]
+        ]
+        return result
+    
+    def _aggregate_chunks(self, scored: List[Tuple], mode: str) -> Dict:
+        """
+        Length-weighted aggregate of chunk results
+        
+        Per-scorer scores are averaged by chunk length (TextBlob over the
+        chunks where it ran) and blended with _combine_scores, so the
+        document keeps consistent component scores for re-weighting.
+        """
+        weights = [len(chunk.text) for chunk, _ in scored]
+        
+        def weighted_mean(name: str) -> Optional[Dict[str, float]]:
+            pairs = [(weight, result['scores'][name]) for weight, (_, result) in zip(weights, scored)
+                     if result['scores'].get(name) is not None]
+            if not pairs:
+                return None
+            total = sum(weight for weight, _ in pairs)
+            return {
+                key: sum(weight * scores[key] for weight, scores in pairs) / total
+                for key in pairs[0][1]
+            }
+        
+        vader_scores = weighted_mean('vader')
+        textblob_scores = weighted_mean('textblob')
+        housing_scores = weighted_mean('housing_context')
+        combined_scores = self._combine_scores(vader_scores, textblob_scores, housing_scores)
+        sentiment_label, confidence = self._determine_sentiment(combined_scores)
+        
+        # Keywords, region and programme by how many chunks mention them
+        keyword_counts = Counter(keyword for _, result in scored for keyword in result['keywords'])
+        regions = Counter(result['region_mentioned'] for _, result in scored if result['region_mentioned'])
+        programs = Counter(result['program_mentioned'] for _, result in scored if result['program_mentioned'])
+        total_weight = sum(weights)
+        
+        return {
+            'sentiment_label': sentiment_label,
+            'confidence': confidence,
+            'scores': {
+                'compound': combined_scores['compound'],
+                'positive': combined_scores['positive'],
+                'negative': combined_scores['negative'],
+                'neutral': combined_scores['neutral'],
+                'vader': vader_scores,
+                'textblob': textblob_scores,
+                'housing_context': housing_scores
+            },
+            'keywords': [keyword for keyword, _ in keyword_counts.most_common(10)],
+            'housing_relevance': sum(
+                weight * result['housing_relevance'] for weight, (_, result) in zip(weights, scored)
+            ) / total_weight,
+            'region_mentioned': regions.most_common(1)[0][0] if regions else None,
+            'program_mentioned': programs.most_common(1)[0][0] if programs else None,
+            'analysis_mode': mode,
+            'scorers_run': [name for name in ('vader', 'housing', 'textblob')
+                            if any(name in result['scorers_run'] for _, result in scored)]
+        }
+    
+    def _analyze_text(self, text: str, mode: str, timings: Optional[Dict[str, float]] = None) -> Dict:
+        """
+        Score text and extract features, without per-call fields
+        
+        Args:
+            text: Input text to analyze
+            mode: Validated analysis mode
+            timings: Optional dictionary filled with seconds per stage
             
-            # Determine final sentiment
-            sentiment_label, confidence = self._determine_sentiment(combined_scores)
+        Returns:
+            Text-dependent analysis output (shared with the cache; do not mutate)
+        """
+        timer = StageTimer()
+        
+        # Clean and preprocess text
+        cleaned_text = self._preprocess_text(text)
+        timer.lap('preprocess')
+        
+        if self.cache is not None:
+            version = self.lexicon_version()
+            cache_key = self.cache.make_key(cleaned_text, version, namespace=mode)
+            cached = self.cache.get(cache_key, version)
+            timer.lap('cache')
+            if cached is not None:
+                self._record_timings(timer, timings)
+                return cached
+        
+        signature = None
+        if self.cache is not None and self.dedup_index is not None:
+            signature = self.dedup_index.signature(cleaned_text)
+            duplicate = self._find_near_duplicate(signature, version, mode)
+            timer.lap('dedup')
+            if duplicate is not None:
+                self._record_timings(timer, timings)
+                return duplicate
+        
+        # Tokenize once for all scorers and extractors
+        context = AnalysisContext.from_text(cleaned_text)
+        timer.lap('tokenize')
+        
+        # Perform multiple sentiment analyses, cheapest first
+        vader_scores = self._analyze_vader(cleaned_text)
+        timer.lap('vader')
+        housing_scores = self._analyze_housing_context(context)
+        timer.lap('housing')
+        scorers_run = ['vader', 'housing']
+        
+        textblob_scores = None
+        if mode == 'full' or self._is_uncertain(
+                self._combine_scores(vader_scores, None, housing_scores)['compound']):
+            timer.lap('combine')
+            textblob_scores = self._analyze_textblob(cleaned_text)
+            timer.lap('textblob')
+            scorers_run.append('textblob')
+        
+        # Combine scores
+        combined_scores = self._combine_scores(vader_scores, textblob_scores, housing_scores)
+        timer.lap('combine')
+        
+        # Extract features
+        keywords = self._extract_keywords(context)
+        timer.lap('keywords')
+        housing_relevance = self._calculate_housing_relevance(context, keywords)
+        timer.lap('relevance')
+        region = self._extract_region(context)
+        timer.lap('region')
+        program = self._extract_program(context)
+        timer.lap('program')
+        
+        # Determine final sentiment
+        sentiment_label, confidence = self._determine_sentiment(combined_scores)
+        timer.lap('label')
+        
+        analysis = {
+            'sentiment_label': sentiment_label,
+            'confidence': confidence,
+            'scores': {
+                'compound': combined_scores['compound'],
+                'positive': combined_scores['positive'],
+                'negative': combined_scores['negative'],
+                'neutral': combined_scores['neutral'],
+                'vader': vader_scores,
+                'textblob': textblob_scores,
+                'housing_context': housing_scores
+            },
+            'keywords': keywords,
+            'housing_relevance': housing_relevance,
+            'region_mentioned': region,
+            'program_mentioned': program,
+            'analysis_mode': mode,
+            'scorers_run': scorers_run
+        }
+        
+        if self.cache is not None:
+            self.cache.put(cache_key, version, analysis, None if signature is None else signature.tobytes())
+            if signature is not None:
+                self.dedup_index.add(cache_key, signature)
+            timer.lap('cache')
+        
+        self._record_timings(timer, timings)
+        return analysis
+    
+    def _find_near_duplicate(self, signature, version: str, mode: str) -> Optional[Dict]:
+        """
+        Reuse the cached analysis of a near-duplicate text
+        
+        Args:
+            signature: MinHash signature of the preprocessed text
+            version: Current lexicon version
+            mode: Validated analysis mode
             
-            result = {
-                'text': text[:500],  # Limit stored text length
-                'source': source,
-                'sentiment_label': sentiment_label,
-                'confidence': confidence,
-                'scores': {
-                    'compound': combined_scores['compound'],
-                    'positive': combined_scores['positive'],
-                    'negative': combined_scores['negative'],
-                    'neutral': combined_scores['neutral'],
-                    'vader': vader_scores,
-                    'textblob': textblob_scores,
-                    'housing_context': housing_scores
-                },
-                'keywords': keywords,
-                'housing_relevance': housing_relevance,
-                'region_mentioned': region,
-                'program_mentioned': program,
-                'metadata': metadata,
-                'analyzed_at': datetime.utcnow().isoformat()
-            }
+        Returns:
+            The canonical text's analysis with a 'near_duplicate_of' link, or
+            None when no cached near-duplicate exists
+        """
+        if version != self._dedup_version:
+            # Keys of an older version point at results that no longer apply
+            self.dedup_index.clear()
+            self._dedup_version = version
+        
+        match = self.dedup_index.query(signature)
+        if match is None:
+            return None
+        
+        canonical_key, similarity = match
+        canonical = self.cache.get(canonical_key, version)
+        if canonical is None:
+            # Evicted from both cache tiers
+            self.dedup_index.remove(canonical_key)
+            return None
+        if canonical['analysis_mode'] != mode:
+            return None
+        
+        return {**canonical, 'near_duplicate_of': {'cache_key': canonical_key, 'similarity': similarity}}
+    
+    def load_near_duplicate_index(self) -> int:
+        """
+        Fill the near-duplicate index from signatures persisted with the cache
+        
+        Returns:
+            Number of documents loaded
+        """
+        if self.cache is None or self.dedup_index is None:
+            return 0
+        
+        version = self.lexicon_version()
+        self.dedup_index.clear()
+        self._dedup_version = version
+        
+        num_perm = self.dedup_index.hasher.num_perm
+        loaded = 0
+        for key, signature in self.cache.load_signatures(version, self.dedup_index.max_entries):
+            signature = np.frombuffer(signature, dtype=np.uint64)
+            if len(signature) == num_perm:
+                self.dedup_index.add(key, signature)
+                loaded += 1
+        
+        logger.info(f"Loaded {loaded} near-duplicate signatures")
+        return loaded
+    
+    def _record_timings(self, timer: StageTimer, timings: Optional[Dict[str, float]]):
+        """Feed a finished analysis into the stage histograms (and the caller's dictionary)"""
+        stage_timings = timer.finish()
+        self.metrics.record(stage_timings)
+        if timings is not None:
+            timings.update(stage_timings)
+    
+    def _build_result(self, text: str, source: str, metadata: Dict, analysis: Dict) -> Dict:
+        """Wrap text-dependent analysis output with per-call fields"""
+        result = {
+            'text': text[:500],  # Limit stored text length
+            'source': source,
+            'sentiment_label': analysis['sentiment_label'],
+            'confidence': analysis['confidence'],
+            'scores': {
+                name: dict(value) if isinstance(value, dict) else value
+                for name, value in analysis['scores'].items()
+            },
+            'keywords': list(analysis['keywords']),
+            'housing_relevance': analysis['housing_relevance'],
+            'region_mentioned': analysis['region_mentioned'],
+            'program_mentioned': analysis['program_mentioned'],
+            'analysis_mode': analysis['analysis_mode'],
+            'scorers_run': list(analysis['scorers_run']),
+            'metadata': metadata,
+            'analyzed_at': datetime.utcnow().isoformat()
+        }
+        if 'near_duplicate_of' in analysis:
+            result['near_duplicate_of'] = dict(analysis['near_duplicate_of'])
+        return result
+    
+    def lexicon_version(self) -> str:
+        """
+        Fingerprint of everything that determines an analysis result
+        
+        Covers the analyzer version, housing keyword weights, combine weights
+        and the static lexicons, so editing any of them changes cache keys.
+        """
+        return self._fingerprint(
+            ANALYZER_VERSION, self._static_fingerprint, self.housing_keywords, self.combine_weights,
+            self.sentiment_thresholds, self.cascade_band
+        )
+    
+    @staticmethod
+    def parse_combine_weights(value: str) -> Dict[str, float]:
+        """
+        Parse combine weights written as "vader=0.5,textblob=0.2,housing=0.3"
+        
+        Raises:
+            ValueError: For pairs that are not name=number
+        """
+        weights = {}
+        for pair in value.split(','):
+            name, separator, weight = pair.partition('=')
+            if not separator or not name.strip():
+                raise ValueError(f"expected scorer=weight, got {pair.strip()!r}")
+            try:
+                weights[name.strip()] = float(weight)
+            except ValueError:
+                raise ValueError(f"weight of {name.strip()} is not a number: {weight.strip()!r}") from None
+        return weights
+    
+    def set_combine_weights(self, weights: Dict[str, float]) -> Dict[str, float]:
+        """
+        Change the weights used to blend the scorers
+        
+        Stored results can be brought in line with
+        DatabaseManager.reweight_sentiment_results, without re-analysis.
+        
+        Args:
+            weights: Scorer name ('vader', 'textblob', 'housing') -> weight;
+                scorers left out keep their current weight
             
-            logger.debug(f"Sentiment analysis completed: {sentiment_label} ({confidence:.2f})")
-            return result
+        Returns:
+            The new combine weights
             
-        except Exception as e:
-            logger.error(f"Sentiment analysis error: {str(e)}")
-            raise
+        Raises:
+            ValueError: For unknown scorers, negative or non-finite weights,
+                or a zero total
+        """
+        unknown = set(weights) - set(self.combine_weights)
+        if unknown:
+            raise ValueError(f"Unknown scorers: {', '.join(sorted(unknown))}")
+        
+        combine_weights = dict(self.combine_weights)
+        for name, weight in weights.items():
+            weight = float(weight)
+            if not math.isfinite(weight) or weight < 0:
+                raise ValueError(f"Weight for {name} must be a non-negative number")
+            combine_weights[name] = weight
+        
+        if sum(combine_weights.values()) <= 0:
+            raise ValueError("Combine weights must not all be zero")
+        
+        self.combine_weights = combine_weights
+        logger.info(f"Combine weights set to {combine_weights}")
+        return combine_weights
     
-    def analyze_batch(self, texts: List[Dict]) -> List[Dict]:
+    @staticmethod
+    def _validate_mode(mode: str) -> str:
+        """Check that an analysis mode is supported"""
+        if mode not in ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode: {mode} (expected one of {', '.join(ANALYSIS_MODES)})")
+        return mode
+    
+    def _is_uncertain(self, compound: float) -> bool:
+        """Whether a compound score is close enough to the neutral band to need TextBlob"""
+        return (self.sentiment_thresholds['negative'] - self.cascade_band
+                < compound <
+                self.sentiment_thresholds['positive'] + self.cascade_band)
+    
+    @staticmethod
+    def _fingerprint(*parts) -> str:
+        """Stable short hash of JSON-serializable parts"""
+        payload = json.dumps(parts, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+    
+    def analyze_batch(self, texts: List[Dict], workers: Optional[int] = None,
+                      chunk_size: Optional[int] = None, mode: Optional[str] = None,
+                      columnar: bool = False) -> Union[List[Dict], ColumnarBatchResult]:
         """
         Analyze sentiment for multiple texts in batch
         
         Args:
             texts: List of dictionaries with 'text', 'id', and optional metadata
+            workers: Optional override of the configured worker process count;
+                0 or 1 scores the batch in-process
+            chunk_size: Optional override of the configured items per worker task
+            mode: Optional override of the analysis mode ('full' or 'cascade')
+            columnar: Return a ColumnarBatchResult (NumPy score columns,
+                interned labels) instead of a list of dictionaries
+            
+        Returns:
+            List of sentiment analysis results (or a ColumnarBatchResult that
+            indexes and iterates like one), in input order
+        """
+        results = self._score_batch(texts, workers, chunk_size, mode, columnar)
+        
+        logger.info(f"Batch analysis completed: {len(results)} items processed")
+        return results
+    
+    def _score_batch(self, texts: List[Dict], workers: Optional[int] = None,
+                     chunk_size: Optional[int] = None, mode: Optional[str] = None,
+                     columnar: bool = False) -> Union[List[Dict], ColumnarBatchResult]:
+        """Score a batch like analyze_batch without logging it (also used for document chunks)"""
+        mode = self._validate_mode(mode or self.mode)
+        workers = self.batch_workers if workers is None else workers
+        chunk_size = chunk_size or self.batch_chunk_size
+        
+        # New cache entries of the batch are persisted in one write
+        with self.cache.deferred_writes() if self.cache is not None else nullcontext():
+            if workers > 1 and len(texts) > chunk_size:
+                try:
+                    with self._use_batch_runner(workers) as runner:
+                        if self.cache is not None:
+                            results = self._analyze_batch_cached_pool(runner, texts, chunk_size, mode, columnar)
+                        else:
+                            results = runner.run(texts, chunk_size, mode, columnar)
+                except BrokenProcessPool as e:
+                    logger.error(f"Sentiment process pool failed, scoring batch in-process: {str(e)}")
+                    results = self._analyze_batch_items(texts, mode=mode, columnar=columnar)
+            else:
+                results = self._analyze_batch_items(texts, mode=mode, columnar=columnar)
+        
+        return results
+    
+    def _analyze_batch_cached_pool(self, runner: ProcessPoolBatchRunner, texts: List[Dict], chunk_size: int,
+                                   mode: str, columnar: bool) -> Union[List[Dict], ColumnarBatchResult]:
+        """
+        Score a batch on the process pool, answering cached texts in this process
+        
+        Worker processes have no cache, so each text is looked up here first
+        (by content hash, then among near-duplicates) and only the misses,
+        once per distinct text, are sent to the pool. Their analyses are put
+        back into the cache and the near-duplicate index.
+        """
+        version = self.lexicon_version()
+        analyses: List[Optional[Dict]] = [None] * len(texts)
+        items = []
+        misses = []  # (position, cache key, signature) of each text sent to the pool
+        first_miss: Dict[str, int] = {}
+        repeats = []  # (position, position of the same text sent to the pool)
+        
+        for position, item in enumerate(texts):
+            item = {**item, 'id': item.get('id', f"batch_{position}")}
+            items.append(item)
+            text = item.get('text')
+            cache_key = signature = None
+            if text and isinstance(text, str):
+                cleaned_text = self._preprocess_text(text)
+                cache_key = self.cache.make_key(cleaned_text, version, namespace=mode)
+                if cache_key in first_miss:
+                    repeats.append((position, first_miss[cache_key]))
+                    continue
+                analysis = self.cache.get(cache_key, version)
+                if analysis is None and self.dedup_index is not None:
+                    signature = self.dedup_index.signature(cleaned_text)
+                    analysis = self._find_near_duplicate(signature, version, mode)
+                if analysis is not None:
+                    analyses[position] = analysis
+                    continue
+                first_miss[cache_key] = position
+            misses.append((position, cache_key, signature))
+        
+        errors = {}
+        if misses:
+            scored = runner.run([items[position] for position, _, _ in misses], chunk_size, mode)
+            for (position, cache_key, signature), result in zip(misses, scored):
+                if 'error' in result:
+                    errors[position] = result['error']
+                    continue
+                analysis = {field: result[field] for field in ANALYSIS_FIELDS}
+                analyses[position] = analysis
+                self.cache.put(cache_key, version, analysis, None if signature is None else signature.tobytes())
+                if signature is not None:
+                    self.dedup_index.add(cache_key, signature)
+        for position, first in repeats:
+            analyses[position] = analyses[first]
+            if first in errors:
+                errors[position] = errors[first]
+        
+        builder = ColumnarBatchBuilder(len(items)) if columnar else None
+        results = []
+        for position, item in enumerate(items):
+            analysis = analyses[position]
+            if analysis is None:
+                error_id = texts[position].get('id', f"error_{position}")
+                if builder is not None:
+                    builder.add_error(error_id, errors.get(position, 'Analysis failed'))
+                else:
+                    results.append({'id': error_id, 'error': errors.get(position, 'Analysis failed'),
+                                    'analyzed_at': datetime.utcnow().isoformat()})
+                continue
+            
+            metadata = item.get('metadata', {})
+            metadata['batch_id'] = item['id']
+            if builder is not None:
+                builder.add(item['id'], item['text'], 'user_post', metadata, analysis)
+            else:
+                result = self._build_result(item['text'], 'user_post', metadata, analysis)
+                result['id'] = item['id']
+                results.append(result)
+        
+        return builder.build() if builder is not None else results
+    
+    @contextmanager
+    def _use_batch_runner(self, workers: int):
+        """
+        Borrow the process pool runner for one batch
+        
+        The pool is replaced when its size changes, or when the lexicon
+        version changes (e.g. after set_combine_weights) so workers never
+        score with stale weights. Batches may run concurrently from request
+        threads: a replaced runner is shut down once the last batch using
+        it has finished.
+        """
+        version = self.lexicon_version()
+        retired = None
+        with self._batch_runner_lock:
+            runner = self._batch_runner
+            if runner is None or runner.workers != workers or runner.version != version:
+                if runner is not None and not self._batch_runner_users.get(runner):
+                    retired = runner
+                runner = self._batch_runner = ProcessPoolBatchRunner(workers, self.batch_chunk_size,
+                                                                     config=self.worker_config(), version=version)
+            self._batch_runner_users[runner] = self._batch_runner_users.get(runner, 0) + 1
+        if retired is not None:
+            retired.shutdown()
+        
+        try:
+            yield runner
+        finally:
+            with self._batch_runner_lock:
+                self._batch_runner_users[runner] -= 1
+                idle = not self._batch_runner_users[runner]
+                if idle:
+                    del self._batch_runner_users[runner]
+            if idle and runner is not self._batch_runner:
+                runner.shutdown()
+    
+    def worker_config(self) -> Dict:
+        """Runtime settings that batch worker processes copy from this analyzer"""
+        return {
+            'housing_keywords': dict(self.housing_keywords),
+            'combine_weights': dict(self.combine_weights),
+            'sentiment_thresholds': dict(self.sentiment_thresholds),
+            'cascade_band': self.cascade_band
+        }
+    
+    def _analyze_batch_items(self, texts: List[Dict], offset: int = 0,
+                             mode: Optional[str] = None,
+                             columnar: bool = False) -> Union[List[Dict], ColumnarBatchResult]:
+        """
+        Score batch items one at a time in the current process
+        
+        Args:
+            texts: List of dictionaries with 'text', 'id', and optional metadata
+            offset: Position of the first item in the overall batch, used for
+                generated ids
+            mode: Optional override of the analysis mode
+            columnar: Accumulate results into a ColumnarBatchResult
             
         Returns:
-            List of sentiment analysis results
+            List of sentiment analysis results, or a ColumnarBatchResult
         """
+        if columnar:
+            return self._analyze_batch_columnar(texts, offset, mode)
+        
         results = []
         
         for item in texts:
+            position = offset + len(results)
             try:
                 text = item.get('text', '')
-                text_id = item.get('id', f"batch_{len(results)}")
+                text_id = item.get('id', f"batch_{position}")
                 metadata = item.get('metadata', {})
                 metadata['batch_id'] = text_id
                 
-                result = self.analyze(text, metadata=metadata)
+                result = self.analyze(text, metadata=metadata, mode=mode)
                 result['id'] = text_id
                 results.append(result)
                 
@@ -229,35 +891,41 @@ class SentimentAnalyzer:
                 logger.error(f"Batch analysis error for item {item.get('id', 'unknown')}: {str(e)}")
                 # Add error result
                 results.append({
-                    'id': item.get('id', f"error_{len(results)}"),
+                    'id': item.get('id', f"error_{position}"),
                     'error': str(e),
                     'analyzed_at': datetime.utcnow().isoformat()
                 })
         
-        logger.info(f"Batch analysis completed: {len(results)} items processed")
         return results
     
-    def _preprocess_text(self, text: str) -> str:
-        """Clean and preprocess text for analysis"""
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove URLs
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+    def _analyze_batch_columnar(self, texts: List[Dict], offset: int = 0,
+                                mode: Optional[str] = None) -> ColumnarBatchResult:
+        """Score batch items straight into column arrays, skipping per-item result dictionaries"""
+        mode = self._validate_mode(mode or self.mode)
+        builder = ColumnarBatchBuilder(len(texts))
         
-        # Remove email addresses
-        text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '', text)
-        
-        # Remove phone numbers
-        text = re.sub(r'(\+?6?01[0-46-9]-*[0-9]{7,8})', '', text)
-        
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s\.\!\?\,\-]', ' ', text)
+        for item in texts:
+            position = offset + builder.size
+            try:
+                text = item.get('text', '')
+                text_id = item.get('id', f"batch_{position}")
+                metadata = item.get('metadata', {})
+                metadata['batch_id'] = text_id
+                
+                if not text or not isinstance(text, str):
+                    raise ValueError("Text must be a non-empty string")
+                
+                builder.add(text_id, text, 'user_post', metadata, self._analyze_text(text, mode))
+                
+            except Exception as e:
+                logger.error(f"Batch analysis error for item {item.get('id', 'unknown')}: {str(e)}")
+                builder.add_error(item.get('id', f"error_{position}"), str(e))
         
-        return text
+        return builder.build()
+    
+    def _preprocess_text(self, text: str) -> str:
+        """Clean and preprocess text for analysis"""
+        return TextNormalizer.for_analysis(text)
     
     def _analyze_vader(self, text: str) -> Dict[str, float]:
         """Analyze sentiment using VADER"""
@@ -271,9 +939,7 @@ class SentimentAnalyzer:
     
     def _analyze_textblob(self, text: str) -> Dict[str, float]:
         """Analyze sentiment using TextBlob"""
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity  # -1 to 1
-        subjectivity = blob.sentiment.subjectivity  # 0 to 1
+        polarity, subjectivity = resources.textblob_sentiment(text)  # -1 to 1, 0 to 1
         
         # Convert to VADER-like scores
         if polarity > 0:
@@ -293,13 +959,12 @@ class SentimentAnalyzer:
             'subjectivity': subjectivity
         }
     
-    def _analyze_housing_context(self, text: str) -> Dict[str, float]:
+    def _analyze_housing_context(self, context: AnalysisContext) -> Dict[str, float]:
         """Analyze sentiment in housing context"""
-        words = word_tokenize(text)
         total_score = 0
         word_count = 0
         
-        for word in words:
+        for word in context.tokens:
             if word in self.housing_keywords:
                 total_score += self.housing_keywords[word]
                 word_count += 1
@@ -327,53 +992,35 @@ class SentimentAnalyzer:
             'neutral': neutral
         }
     
-    def _combine_scores(self, vader: Dict, textblob: Dict, housing: Dict) -> Dict[str, float]:
-        """Combine scores from different analyzers"""
-        # Weighted combination
-        weights = {
-            'vader': 0.4,
-            'textblob': 0.3,
-            'housing': 0.3
-        }
-        
-        compound = (
-            vader['compound'] * weights['vader'] +
-            textblob['compound'] * weights['textblob'] +
-            housing['compound'] * weights['housing']
-        )
+    def _combine_scores(self, vader: Dict, textblob: Optional[Dict], housing: Dict) -> Dict[str, float]:
+        """
+        Combine scores from different analyzers
         
-        positive = (
-            vader['positive'] * weights['vader'] +
-            textblob['positive'] * weights['textblob'] +
-            housing['positive'] * weights['housing']
-        )
+        Scorers that did not run (None) are left out and the remaining
+        weights are rescaled to sum to the same total.
+        """
+        scorers = {'vader': vader, 'textblob': textblob, 'housing': housing}
+        active = {name: scores for name, scores in scorers.items() if scores is not None}
         
-        negative = (
-            vader['negative'] * weights['vader'] +
-            textblob['negative'] * weights['textblob'] +
-            housing['negative'] * weights['housing']
-        )
+        # Weighted combination
+        total_weight = sum(self.combine_weights.values())
+        active_weight = sum(self.combine_weights[name] for name in active)
+        scale = total_weight / active_weight if active_weight else 0.0
         
-        neutral = (
-            vader['neutral'] * weights['vader'] +
-            textblob['neutral'] * weights['textblob'] +
-            housing['neutral'] * weights['housing']
-        )
+        combined = {}
+        for key in ('compound', 'positive', 'negative', 'neutral'):
+            combined[key] = sum(
+                scores[key] * self.combine_weights[name] * scale
+                for name, scores in active.items()
+            )
         
-        return {
-            'compound': compound,
-            'positive': positive,
-            'negative': negative,
-            'neutral': neutral
-        }
+        return combined
     
-    def _extract_keywords(self, text: str) -> List[str]:
+    def _extract_keywords(self, context: AnalysisContext) -> List[str]:
         """Extract relevant keywords from text"""
-        words = word_tokenize(text)
-        
         # Filter out stopwords and short words
         keywords = [
-            word for word in words 
+            word for word in context.tokens 
             if len(word) > 2 and word not in self.stopwords
         ]
         
@@ -389,16 +1036,10 @@ class SentimentAnalyzer:
         # Return top 10 keywords
         return all_keywords[:10]
     
-    def _calculate_housing_relevance(self, text: str, keywords: List[str]) -> float:
+    def _calculate_housing_relevance(self, context: AnalysisContext, keywords: List[str]) -> float:
         """Calculate how relevant the text is to housing topics"""
-        housing_terms = [
-            'house', 'home', 'property', 'housing', 'apartment', 'condo',
-            'rumah', 'hartanah', 'pr1ma', 'affordable', 'loan', 'mortgage',
-            'rent', 'buy', 'purchase', 'development', 'project'
-        ]
-        
-        text_words = set(word_tokenize(text))
-        housing_word_count = sum(1 for word in text_words if word in housing_terms)
+        text_words = context.token_set
+        housing_word_count = len(text_words & self.housing_terms)
         keyword_housing_count = sum(1 for keyword in keywords if keyword in self.housing_keywords)
         
         # Calculate relevance score
@@ -409,26 +1050,19 @@ class SentimentAnalyzer:
         relevance = (housing_word_count + keyword_housing_count * 2) / total_words
         return min(1.0, relevance * 5)  # Scale and cap at 1.0
     
-    def _extract_region(self, text: str) -> Optional[str]:
-        """Extract mentioned Malaysian state/region"""
-        text_words = set(word_tokenize(text))
+    def _extract_region(self, context: AnalysisContext) -> Optional[str]:
+        """Extract mentioned Malaysian state/region (earliest full-name mention first)"""
+        matches = self.region_matcher.find_all(tokens=context.words)
+        if not matches:
+            return None
         
-        for region in self.regions:
-            if region in text or any(word in region.split() for word in text_words):
-                return region
-        
-        return None
+        best = min(matches, key=lambda match: (match.label[1], match.start))
+        return best.label[0]
     
-    def _extract_program(self, text: str) -> Optional[str]:
-        """Extract mentioned housing program"""
-        text_lower = text.lower()
-        
-        for program_id, variations in self.programs.items():
-            for variation in variations:
-                if variation in text_lower:
-                    return program_id
-        
-        return None
+    def _extract_program(self, context: AnalysisContext) -> Optional[str]:
+        """Extract mentioned housing program (earliest mention first)"""
+        match = self.program_matcher.first(tokens=context.words)
+        return match.label if match else None
     
     def _determine_sentiment(self, scores: Dict[str, float]) -> Tuple[str, float]:
         """Determine final sentiment label and confidence"""
@@ -438,10 +1072,10 @@ class SentimentAnalyzer:
         neutral = scores['neutral']
         
         # Determine sentiment based on compound score
-        if compound >= 0.05:
+        if compound >= self.sentiment_thresholds['positive']:
             sentiment = 'positive'
             confidence = positive
-        elif compound <= -0.05:
+        elif compound <= self.sentiment_thresholds['negative']:
             sentiment = 'negative'
             confidence = negative
         else:
@@ -464,70 +1098,4 @@ class SentimentAnalyzer:
         Returns:
             Dictionary of word frequencies
         """
-        from collections import Counter
-        import string
-        
-        # Combine all texts
-        all_text = ' '.join(texts).lower()
-        
-        # Clean and tokenize
-        # Remove punctuation and numbers
-        translator = str.maketrans('', '', string.punctuation + string.digits)
-        cleaned_text = all_text.translate(translator)
-        
-        # Tokenize
-        words = word_tokenize(cleaned_text)
-        
-        # Get Malaysian English stopwords
-        stop_words = set(stopwords.words('english'))
-        
-        # Add custom stopwords relevant to housing discussions
-        custom_stopwords = {
-            'housing', 'house', 'home', 'property', 'malaysia', 'malaysian',
-            'government', 'scheme', 'program', 'programme', 'policy', 'policies',
-            'affordable', 'low', 'cost', 'income', 'price', 'prices',
-            'rm', 'ringgit', 'thousand', 'million', 'billion',
-            'people', 'person', 'individual', 'citizen', 'citizens',
-            'country', 'nation', 'national', 'state', 'federal',
-            'would', 'could', 'should', 'will', 'shall', 'may', 'might',
-            'one', 'two', 'three', 'many', 'much', 'more', 'most',
-            'also', 'even', 'still', 'yet', 'however', 'therefore',
-            'said', 'says', 'according', 'reported', 'stated'
-        }
-        stop_words.update(custom_stopwords)
-        
-        # Filter words
-        filtered_words = [
-            word for word in words 
-            if len(word) > 3  # Minimum word length
-            and word not in stop_words
-            and word.isalpha()  # Only alphabetic characters
-            and not word.isdigit()  # No pure numbers
-        ]
-        
-        # Apply stemming
-        stemmer = PorterStemmer()
-        stemmed_words = [stemmer.stem(word) for word in filtered_words]
-        
-        # Count word frequencies
-        word_freq = Counter(stemmed_words)
-        
-        # Get top words
-        top_words = dict(word_freq.most_common(max_words))
-        
-        # If we have housing-specific terms, boost their frequency
-        housing_keywords = {
-            'pr1ma', 'rumawip', 'pprt', 'ppr', 'mydeposit', 'myfirst',
-            'develop', 'construct', 'build', 'project', 'unit',
-            'owner', 'buyer', 'purchase', 'rent', 'rental',
-            'loan', 'mortgage', 'financ', 'fund', 'subsidi',
-            'eligibl', 'criteria', 'qualifi', 'applic',
-            'kuala', 'lumpur', 'selangor', 'johor', 'penang',
-            'perak', 'sabah', 'sarawak', 'kedah', 'negeri'
-        }
-        
-        for word in top_words:
-            if any(keyword in word for keyword in housing_keywords):
-                top_words[word] = int(top_words[word] * 1.5)  # Boost relevance
-        
-        return top_words
+        return self.wordcloud_engine.generate(texts, max_words)
@@ -0,0 +1,251 @@
+"""
+Sentiment Result Cache for HomeWatch
+
+Content-addressed cache in front of SentimentAnalyzer.analyze:
+- Keys are a stable hash of the preprocessed text, analyzer version and mode
+- Bounded in-memory LRU tier
+- Optional on-disk tier in the application database so hits survive restarts;
+  its writes can be buffered per batch (deferred_writes) and it is pruned
+  to about max_db_entries rows
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SentimentCache:
+    """
+    Two-tier (memory LRU + database) cache of sentiment analysis results
+    """
+
+    def __init__(self, max_entries: int = 10000, db_manager=None, max_db_entries: int = 0):
+        """
+        Args:
+            max_entries: Maximum number of results held in memory
+            db_manager: Optional DatabaseManager used as the persistent tier
+            max_db_entries: Rows kept in the persistent tier, pruned oldest
+                first after every tenth of that many writes (0: unbounded)
+        """
+        self.max_entries = max(1, max_entries)
+        self.db_manager = db_manager
+        self.max_db_entries = max(0, max_db_entries)
+        self._deferred = threading.local()
+        self._writes_since_prune = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.db_writes = 0
+        self.db_pruned = 0
+
+        logger.info(f"SentimentCache initialized (max_entries={self.max_entries}, "
+                    f"persistent={db_manager is not None})")
+
+    @staticmethod
+    def make_key(text: str, version: str, namespace: str = '') -> str:
+        """Build a stable cache key from preprocessed text, analyzer version and mode"""
+        digest = hashlib.sha256()
+        digest.update(version.encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(namespace.encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str, version: str) -> Optional[Dict]:
+        """
+        Look up a cached result
+
+        Args:
+            key: Key from make_key
+            version: Analyzer version the key was built with
+
+        Returns:
+            Cached result dictionary, or None on a miss
+        """
+        self._check_version(version)
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self.db_manager is not None:
+            try:
+                value = self.db_manager.get_cached_sentiment(key)
+            except Exception as e:
+                logger.warning(f"Sentiment cache lookup failed: {str(e)}")
+                value = None
+
+            if value is not None:
+                self._store_in_memory(key, value)
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, version: str, value: Dict, signature: Optional[bytes] = None):
+        """
+        Store a result in both tiers
+
+        Inside deferred_writes, the database write waits for the end of the
+        block.
+
+        Args:
+            key: Key from make_key
+            version: Analyzer version the key was built with
+            value: JSON-serializable result dictionary
+            signature: Optional MinHash signature of the text, persisted so
+                the near-duplicate index can be reloaded
+        """
+        self._store_in_memory(key, value)
+
+        if self.db_manager is None:
+            return
+        pending = getattr(self._deferred, 'pending', None)
+        if pending is not None:
+            pending[key] = (key, version, value, signature)
+        else:
+            self._write([(key, version, value, signature)])
+
+    @contextmanager
+    def deferred_writes(self):
+        """Buffer this thread's database writes and persist them in one transaction on exit"""
+        if self.db_manager is None or getattr(self._deferred, 'pending', None) is not None:
+            yield
+            return
+
+        self._deferred.pending = {}
+        try:
+            yield
+        finally:
+            pending = self._deferred.pending
+            self._deferred.pending = None
+            self._write(list(pending.values()))
+
+    def _write(self, entries: List[Tuple]):
+        """Persist (key, version, value, signature) entries, pruning the table when due"""
+        if not entries:
+            return
+        try:
+            self.db_manager.cache_sentiments(entries)
+        except Exception as e:
+            logger.warning(f"Sentiment cache write failed: {str(e)}")
+            return
+
+        with self._lock:
+            self.db_writes += len(entries)
+            self._writes_since_prune += len(entries)
+            due = bool(self.max_db_entries) and self._writes_since_prune >= max(1, self.max_db_entries // 10)
+            if due:
+                self._writes_since_prune = 0
+        if due:
+            self.prune()
+
+    def prune(self) -> int:
+        """
+        Trim the persistent tier to max_db_entries rows, dropping the oldest writes
+
+        Returns:
+            Number of persisted entries removed
+        """
+        if self.db_manager is None or not self.max_db_entries:
+            return 0
+        removed = self.db_manager.prune_sentiment_cache(self.max_db_entries)
+        with self._lock:
+            self.db_pruned += removed
+        return removed
+
+    def _store_in_memory(self, key: str, value: Dict):
+        """Insert into the LRU tier, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _check_version(self, version: str):
+        """Drop in-memory entries built for a previous analyzer version"""
+        if version == self._version:
+            return
+
+        with self._lock:
+            if self._version is not None and version != self._version:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                logger.info(f"Sentiment cache invalidated for analyzer version {version}")
+            self._version = version
+
+    def load_signatures(self, version: str, limit: int) -> List[Tuple[str, bytes]]:
+        """
+        Persisted MinHash signatures of entries for an analyzer version
+
+        Returns:
+            List of (key, signature bytes), oldest first; empty without a
+            persistent tier
+        """
+        if self.db_manager is None:
+            return []
+        try:
+            return self.db_manager.get_cached_signatures(version, limit)
+        except Exception as e:
+            logger.warning(f"Sentiment cache signature load failed: {str(e)}")
+            return []
+
+    def purge_stale(self, version: str) -> int:
+        """
+        Remove persisted entries from other analyzer versions
+
+        Args:
+            version: Current analyzer version to keep
+
+        Returns:
+            Number of persisted entries removed
+        """
+        if self.db_manager is None:
+            return 0
+        return self.db_manager.purge_sentiment_cache(version)
+
+    def clear(self):
+        """Clear the in-memory tier"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Return cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'persistent': self.db_manager is not None,
+                'max_db_entries': self.max_db_entries,
+                'db_writes': self.db_writes,
+                'db_pruned': self.db_pruned,
+                'version': self._version
+            }
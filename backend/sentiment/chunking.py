@@ -0,0 +1,79 @@
+"""
+Sentence-Bounded Text Chunking for HomeWatch
+
+Splits long documents into chunks for SentimentAnalyzer.analyze_document.
+VADER's cost grows faster than linearly with text length (its clause
+rules rescan the whole text), so scoring a long article as a few
+paragraph-sized chunks is much cheaper than scoring it in one piece, and
+the chunks can be scored on separate worker processes.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List
+
+# A sentence and the whitespace after it; text without terminal punctuation is one sentence
+SENTENCE_RE = re.compile(r'[^.!?]*(?:[.!?]+|$)\s*')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+@dataclass
+class TextChunk:
+    """A run of whole sentences and its character span in the source text"""
+    index: int
+    start: int
+    end: int
+    text: str
+
+
+def _sentence_spans(text: str, max_chars: int) -> List[tuple]:
+    """Sentence spans, with sentences longer than max_chars split at whitespace"""
+    spans = []
+    for match in SENTENCE_RE.finditer(text):
+        start, end = match.span()
+        if start == end:
+            continue
+
+        while end - start > max_chars:
+            # Break an over-long sentence at the last whitespace that fits
+            split = max((gap.end() for gap in WHITESPACE_RE.finditer(text, start, start + max_chars)),
+                        default=start + max_chars)
+            if split <= start:
+                split = start + max_chars
+            spans.append((start, split))
+            start = split
+
+        spans.append((start, end))
+    return spans
+
+
+def split_sentence_chunks(text: str, max_chars: int) -> List[TextChunk]:
+    """
+    Group consecutive sentences into chunks of at most max_chars characters
+
+    Args:
+        text: Document text
+        max_chars: Maximum chunk length; longer sentences are split at
+            whitespace (or mid-word when a word alone is longer)
+
+    Returns:
+        Chunks in document order; empty or whitespace-only chunks are dropped
+    """
+    max_chars = max(1, max_chars)
+    chunks = []
+    chunk_start = chunk_end = None
+
+    def flush():
+        if chunk_start is not None and text[chunk_start:chunk_end].strip():
+            chunks.append(TextChunk(len(chunks), chunk_start, chunk_end, text[chunk_start:chunk_end].strip()))
+
+    for start, end in _sentence_spans(text, max_chars):
+        if chunk_start is not None and end - chunk_start > max_chars:
+            flush()
+            chunk_start = None
+        if chunk_start is None:
+            chunk_start = start
+        chunk_end = end
+
+    flush()
+    return chunks
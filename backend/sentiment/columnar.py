@@ -0,0 +1,385 @@
+"""
+Columnar Batch Results for HomeWatch
+
+Struct-of-arrays alternative to the list of nested result dictionaries
+returned by SentimentAnalyzer.analyze_batch:
+- Every numeric score lives in one float64 NumPy matrix (one column per score)
+- Sentiment labels, regions, programmes and modes are stored as small integer
+  codes into interned category lists
+- The whole batch shares a single analyzed_at timestamp
+- Serializes straight to compact columnar JSON or to NDJSON records
+
+Indexing and iteration still yield the per-item dictionaries produced by
+analyze_batch, so callers that expect that shape keep working.
+"""
+
+import json
+import sys
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Order of the columns in the score matrix: (column name, scores key, sub-key)
+SCORE_COLUMNS: Tuple[Tuple[str, str, Optional[str]], ...] = (
+    ('compound', 'compound', None),
+    ('positive', 'positive', None),
+    ('negative', 'negative', None),
+    ('neutral', 'neutral', None),
+    ('vader_compound', 'vader', 'compound'),
+    ('vader_positive', 'vader', 'positive'),
+    ('vader_negative', 'vader', 'negative'),
+    ('vader_neutral', 'vader', 'neutral'),
+    ('textblob_compound', 'textblob', 'compound'),
+    ('textblob_positive', 'textblob', 'positive'),
+    ('textblob_negative', 'textblob', 'negative'),
+    ('textblob_neutral', 'textblob', 'neutral'),
+    ('textblob_subjectivity', 'textblob', 'subjectivity'),
+    ('housing_compound', 'housing_context', 'compound'),
+    ('housing_positive', 'housing_context', 'positive'),
+    ('housing_negative', 'housing_context', 'negative'),
+    ('housing_neutral', 'housing_context', 'neutral'),
+)
+SCORE_INDEX = {name: index for index, (name, _, _) in enumerate(SCORE_COLUMNS)}
+
+# Code -1 marks a missing value (no region found, or an error row)
+CATEGORICAL_COLUMNS = ('sentiment_label', 'region_mentioned', 'program_mentioned', 'analysis_mode')
+
+MISSING = -1
+CODE_DTYPE = np.int16
+
+
+def _nan_to_none(values: List) -> List:
+    """Replace NaN floats (scorers that did not run, error rows) with None for JSON"""
+    return [None if value != value else value for value in values]
+
+
+class _Categories:
+    """Interned value -> integer code mapping for one categorical column"""
+
+    def __init__(self, values: Sequence[str] = ()):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return MISSING
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(sys.intern(value))
+        return code
+
+
+class ColumnarBatchBuilder:
+    """
+    Accumulates batch results directly into preallocated column arrays
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: Number of items in the batch
+        """
+        self.capacity = capacity
+        self.size = 0
+
+        self.scores = np.full((capacity, len(SCORE_COLUMNS)), np.nan)
+        self.confidence = np.full(capacity, np.nan)
+        self.housing_relevance = np.full(capacity, np.nan)
+        self.codes = {name: np.full(capacity, MISSING, dtype=CODE_DTYPE) for name in CATEGORICAL_COLUMNS}
+        self.categories = {name: _Categories() for name in CATEGORICAL_COLUMNS}
+        self.categories['sentiment_label'] = _Categories(('negative', 'neutral', 'positive'))
+
+        self.ids: List = []
+        self.texts: List[Optional[str]] = []
+        self.sources: List[Optional[str]] = []
+        self.keywords: List[Optional[List[str]]] = []
+        self.metadata: List[Optional[Dict]] = []
+        self.near_duplicates: List[Optional[Dict]] = []
+        self.errors: Dict[int, str] = {}
+
+    def add(self, item_id, text: str, source: str, metadata: Dict, analysis: Dict):
+        """
+        Append one analyzed item
+
+        Args:
+            item_id: Batch item id
+            text: Original input text
+            source: Source of the text
+            metadata: Item metadata
+            analysis: Text-dependent analysis output from SentimentAnalyzer
+        """
+        row = self.size
+        scores = analysis['scores']
+        values = self.scores[row]
+
+        for column, (_, key, sub_key) in enumerate(SCORE_COLUMNS):
+            if sub_key is None:
+                values[column] = scores[key]
+            elif scores[key] is not None:
+                values[column] = scores[key][sub_key]
+
+        self.confidence[row] = analysis['confidence']
+        self.housing_relevance[row] = analysis['housing_relevance']
+        for name in CATEGORICAL_COLUMNS:
+            self.codes[name][row] = self.categories[name].code(analysis[name])
+
+        self.ids.append(item_id)
+        self.texts.append(text[:500])  # Limit stored text length
+        self.sources.append(sys.intern(source))
+        self.keywords.append(analysis['keywords'])
+        self.metadata.append(metadata)
+        near_duplicate_of = analysis.get('near_duplicate_of')
+        self.near_duplicates.append(dict(near_duplicate_of) if near_duplicate_of else None)
+        self.size += 1
+
+    def add_error(self, item_id, error: str):
+        """Append a row for an item that failed to analyze"""
+        self.errors[self.size] = error
+        self.ids.append(item_id)
+        self.texts.append(None)
+        self.sources.append(None)
+        self.keywords.append(None)
+        self.metadata.append(None)
+        self.near_duplicates.append(None)
+        self.size += 1
+
+    def build(self, analyzed_at: Optional[str] = None) -> 'ColumnarBatchResult':
+        """Freeze the accumulated rows into a ColumnarBatchResult"""
+        size = self.size
+        return ColumnarBatchResult(
+            ids=self.ids,
+            texts=self.texts,
+            sources=self.sources,
+            scores=self.scores[:size],
+            confidence=self.confidence[:size],
+            housing_relevance=self.housing_relevance[:size],
+            codes={name: codes[:size] for name, codes in self.codes.items()},
+            categories={name: categories.values for name, categories in self.categories.items()},
+            keywords=self.keywords,
+            metadata=self.metadata,
+            errors=self.errors,
+            analyzed_at=analyzed_at or datetime.utcnow().isoformat(),
+            near_duplicates=self.near_duplicates
+        )
+
+
+class ColumnarBatchResult:
+    """
+    Struct-of-arrays batch of sentiment results
+
+    Behaves like a read-only list of per-item result dictionaries
+    (``len``, indexing, iteration) while keeping the data in columns.
+    """
+
+    def __init__(self, ids: List, texts: List, sources: List, scores: np.ndarray,
+                 confidence: np.ndarray, housing_relevance: np.ndarray,
+                 codes: Dict[str, np.ndarray], categories: Dict[str, List[str]],
+                 keywords: List, metadata: List, errors: Dict[int, str], analyzed_at: str,
+                 near_duplicates: Optional[List[Optional[Dict]]] = None):
+        self.ids = ids
+        self.texts = texts
+        self.sources = sources
+        self.scores = scores
+        self.confidence = confidence
+        self.housing_relevance = housing_relevance
+        self.codes = codes
+        self.categories = categories
+        self.keywords = keywords
+        self.metadata = metadata
+        self.errors = errors
+        self.analyzed_at = analyzed_at
+        # Per-row 'near_duplicate_of' link (None when the text was analyzed itself)
+        self.near_duplicates = near_duplicates if near_duplicates is not None else [None] * len(ids)
+
+    @classmethod
+    def concat(cls, parts: Sequence['ColumnarBatchResult']) -> 'ColumnarBatchResult':
+        """
+        Join batch chunks (e.g. from worker processes) in order
+
+        Category codes are remapped onto one merged category list per column.
+        """
+        if len(parts) == 1:
+            return parts[0]
+
+        codes = {}
+        categories = {}
+        for name in CATEGORICAL_COLUMNS:
+            merged = _Categories()
+            remapped = []
+            for part in parts:
+                # Lookup table from the part's codes to merged codes; index -1 stays missing
+                mapping = np.array([merged.code(value) for value in part.categories[name]] + [MISSING],
+                                   dtype=CODE_DTYPE)
+                remapped.append(mapping[part.codes[name]])
+            codes[name] = np.concatenate(remapped) if remapped else np.empty(0, dtype=CODE_DTYPE)
+            categories[name] = merged.values
+
+        errors = {}
+        offset = 0
+        for part in parts:
+            errors.update({offset + row: error for row, error in part.errors.items()})
+            offset += len(part)
+
+        return cls(
+            ids=[item_id for part in parts for item_id in part.ids],
+            texts=[text for part in parts for text in part.texts],
+            sources=[source for part in parts for source in part.sources],
+            scores=np.concatenate([part.scores for part in parts]),
+            confidence=np.concatenate([part.confidence for part in parts]),
+            housing_relevance=np.concatenate([part.housing_relevance for part in parts]),
+            codes=codes,
+            categories=categories,
+            keywords=[keywords for part in parts for keywords in part.keywords],
+            metadata=[metadata for part in parts for metadata in part.metadata],
+            errors=errors,
+            analyzed_at=parts[0].analyzed_at if parts else datetime.utcnow().isoformat(),
+            near_duplicates=[link for part in parts for link in part.near_duplicates]
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict, List[Dict]]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('batch result index out of range')
+        return self._record(index, self.scores[index].tolist(), self.confidence[index].item(),
+                            self.housing_relevance[index].item(),
+                            {name: int(codes[index]) for name, codes in self.codes.items()})
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.records()
+
+    def column(self, name: str) -> np.ndarray:
+        """Return one score column (e.g. 'compound', 'vader_positive') as a NumPy view"""
+        if name == 'confidence':
+            return self.confidence
+        if name == 'housing_relevance':
+            return self.housing_relevance
+        return self.scores[:, SCORE_INDEX[name]]
+
+    def labels(self, name: str = 'sentiment_label') -> List[Optional[str]]:
+        """Decode a categorical column back to strings"""
+        values = self.categories[name]
+        return [values[code] if code != MISSING else None for code in self.codes[name].tolist()]
+
+    def label_counts(self) -> Dict[str, int]:
+        """Number of items per sentiment label"""
+        codes = self.codes['sentiment_label']
+        counts = np.bincount(codes[codes != MISSING], minlength=len(self.categories['sentiment_label']))
+        return dict(zip(self.categories['sentiment_label'], counts.tolist()))
+
+    def _record(self, index: int, scores: List[float], confidence: float,
+                relevance: float, codes: Dict[str, int]) -> Dict:
+        """Rebuild the per-item dictionary analyze_batch would have returned"""
+        if index in self.errors:
+            return {
+                'id': self.ids[index],
+                'error': self.errors[index],
+                'analyzed_at': self.analyzed_at
+            }
+
+        nested = {'vader': {}, 'textblob': {}, 'housing_context': {}}
+        score_dict = {}
+        for (_, key, sub_key), value in zip(SCORE_COLUMNS, scores):
+            if sub_key is None:
+                score_dict[key] = value
+            elif value == value:  # NaN means the scorer did not run
+                nested[key][sub_key] = value
+        for key, values in nested.items():
+            score_dict[key] = values or None
+
+        decoded = {
+            name: self.categories[name][code] if code != MISSING else None
+            for name, code in codes.items()
+        }
+        scorers_run = ['vader', 'housing'] + (['textblob'] if score_dict['textblob'] is not None else [])
+
+        record = {
+            'text': self.texts[index],
+            'source': self.sources[index],
+            'sentiment_label': decoded['sentiment_label'],
+            'confidence': confidence,
+            'scores': score_dict,
+            'keywords': list(self.keywords[index]),
+            'housing_relevance': relevance,
+            'region_mentioned': decoded['region_mentioned'],
+            'program_mentioned': decoded['program_mentioned'],
+            'analysis_mode': decoded['analysis_mode'],
+            'scorers_run': scorers_run,
+            'metadata': self.metadata[index],
+            'analyzed_at': self.analyzed_at,
+            'id': self.ids[index]
+        }
+        if self.near_duplicates[index] is not None:
+            record['near_duplicate_of'] = dict(self.near_duplicates[index])
+        return record
+
+    def records(self) -> Iterator[Dict]:
+        """Yield per-item result dictionaries in batch order"""
+        # Convert each column to Python scalars once rather than per element
+        scores = self.scores.tolist()
+        confidence = self.confidence.tolist()
+        relevance = self.housing_relevance.tolist()
+        codes = {name: values.tolist() for name, values in self.codes.items()}
+
+        for index in range(len(self)):
+            yield self._record(index, scores[index], confidence[index], relevance[index],
+                               {name: values[index] for name, values in codes.items()})
+
+    def to_list(self) -> List[Dict]:
+        """Materialize the per-item dictionaries"""
+        return list(self.records())
+
+    def to_columns(self) -> Dict:
+        """
+        Columnar representation of the batch
+
+        Returns:
+            Dictionary of column name -> list of values, plus the category
+            lists the integer code columns index into
+        """
+        columns = {
+            'id': self.ids,
+            'text': self.texts,
+            'source': self.sources,
+            'confidence': _nan_to_none(self.confidence.tolist()),
+            'housing_relevance': _nan_to_none(self.housing_relevance.tolist()),
+        }
+        for index, (name, _, _) in enumerate(SCORE_COLUMNS):
+            columns[name] = _nan_to_none(self.scores[:, index].tolist())
+        for name, codes in self.codes.items():
+            columns[name] = codes.tolist()
+        columns['keywords'] = self.keywords
+        columns['metadata'] = self.metadata
+        columns['near_duplicate_of'] = self.near_duplicates
+
+        return {
+            'format': 'columnar',
+            'count': len(self),
+            'analyzed_at': self.analyzed_at,
+            'categories': self.categories,
+            'columns': columns,
+            'errors': {str(row): error for row, error in self.errors.items()}
+        }
+
+    def to_json(self) -> str:
+        """Compact columnar JSON document"""
+        return json.dumps(self.to_columns(), separators=(',', ':'), default=str)
+
+    def iter_ndjson(self) -> Iterator[str]:
+        """Yield one compact JSON line per item in the per-item dictionary shape"""
+        for record in self.records():
+            yield json.dumps(record, separators=(',', ':'), default=str) + '\n'
+
+    def to_ndjson(self) -> str:
+        """NDJSON document with one result per line"""
+        return ''.join(self.iter_ndjson())
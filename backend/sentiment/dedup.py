@@ -0,0 +1,202 @@
+"""
+Near-Duplicate Detection for HomeWatch
+
+MinHash signatures with LSH banding find documents whose word shingles
+overlap above a Jaccard threshold, e.g. syndicated articles or reposts with
+small edits:
+- Shingles are word 3-grams hashed with CRC32, so signatures are stable
+  across processes and restarts (unlike the salted built-in hash())
+- Signatures use universal hashes (a * x + b) mod (2**61 - 1), computed for
+  all shingles at once with NumPy
+- Signatures are split into bands; documents sharing any band are
+  candidates, confirmed by the fraction of matching signature values
+"""
+
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+import numpy as np
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+SHINGLE_SIZE = 3
+WORD_RE = re.compile(r'\w+')
+
+
+def lsh_parameters(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Choose (bands, rows) so the LSH candidate curve turns at the threshold
+
+    Documents with Jaccard similarity s share a band with probability
+    1 - (1 - s**rows)**bands, which rises steepest near (1 / bands)**(1 / rows).
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        distance = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or distance < best[0]:
+            best = (distance, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    """
+    Computes MinHash signatures of texts
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        """
+        Args:
+            num_perm: Signature length (number of hash functions)
+            seed: Seed of the hash functions; signatures are only comparable
+                between hashers with the same num_perm and seed
+        """
+        self.num_perm = num_perm
+        rng = np.random.RandomState(seed)
+        # a and x are below 2**32, so a * x + b cannot overflow 64 bits
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    @staticmethod
+    def shingles(text: str) -> List[str]:
+        """Word 3-grams of lowercased text (the whole text when shorter)"""
+        words = WORD_RE.findall(text.lower())
+        if len(words) <= SHINGLE_SIZE:
+            return [' '.join(words)] if words else []
+        return [' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        MinHash signature of a text
+
+        Returns:
+            uint64 array of length num_perm, or None for text without words
+        """
+        shingles = set(self.shingles(text))
+        if not shingles:
+            return None
+
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        values = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME
+        return values.min(axis=0)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.count_nonzero(first == second)) / len(first)
+
+
+class NearDuplicateIndex:
+    """
+    LSH index linking near-duplicate documents to a canonical document
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, max_entries: int = 100000,
+                 hasher: Optional[MinHasher] = None):
+        """
+        Args:
+            threshold: Jaccard similarity at or above which documents are
+                near-duplicates
+            num_perm: Signature length
+            max_entries: Documents kept; the oldest are forgotten first
+            hasher: Optional MinHasher (default: one with num_perm)
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("Threshold must be in (0, 1]")
+
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self.hasher = hasher or MinHasher(num_perm)
+        self.bands, self.rows = lsh_parameters(threshold, self.hasher.num_perm)
+
+        self._signatures: 'OrderedDict[Hashable, np.ndarray]' = OrderedDict()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.matches = 0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        return self.hasher.signature(text)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def query(self, signature: Optional[np.ndarray]) -> Optional[Tuple[Hashable, float]]:
+        """
+        Find the most similar indexed document at or above the threshold
+
+        Returns:
+            Tuple of (key, estimated similarity), or None
+        """
+        if signature is None:
+            return None
+
+        with self._lock:
+            candidates = set()
+            for band_key in self._band_keys(signature):
+                candidates.update(self._buckets.get(band_key, ()))
+
+            best = None
+            for key in candidates:
+                similarity = self.hasher.similarity(signature, self._signatures[key])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (key, similarity)
+            if best is not None:
+                self.matches += 1
+            return best
+
+    def add(self, key: Hashable, signature: Optional[np.ndarray]):
+        """Index a document under key (a no-op for texts without words)"""
+        if signature is None:
+            return
+
+        with self._lock:
+            if key in self._signatures:
+                return
+            self._signatures[key] = signature
+            for band_key in self._band_keys(signature):
+                self._buckets.setdefault(band_key, []).append(key)
+
+            while len(self._signatures) > self.max_entries:
+                self._forget(*self._signatures.popitem(last=False))
+
+    def remove(self, key: Hashable):
+        """Forget a document"""
+        with self._lock:
+            signature = self._signatures.pop(key, None)
+            if signature is not None:
+                self._forget(key, signature)
+
+    def _forget(self, key: Hashable, signature: np.ndarray):
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.remove(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def clear(self):
+        """Forget all documents"""
+        with self._lock:
+            self._signatures.clear()
+            self._buckets.clear()
+
+    def stats(self):
+        """Index size, match count and LSH parameters"""
+        with self._lock:
+            return {
+                'documents': len(self._signatures),
+                'matches': self.matches,
+                'max_entries': self.max_entries,
+                'threshold': self.threshold,
+                'bands': self.bands,
+                'rows': self.rows
+            }
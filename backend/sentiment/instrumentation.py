@@ -0,0 +1,159 @@
+"""
+Sentiment Pipeline Instrumentation for HomeWatch
+
+Always-on, low-overhead stage timing for SentimentAnalyzer:
+- StageTimer takes one perf_counter reading per pipeline stage and charges
+  the time since the previous reading to that stage
+- PipelineMetrics folds each analysis into per-stage latency histograms
+  with one lock acquisition
+- Histogram buckets are powers of two in microseconds, so recording is an
+  integer bit_length and percentiles are estimated from bucket bounds
+
+Metrics are per process: batches scored on the process pool are recorded
+by the worker processes, not the web process.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Pipeline stages in execution order; 'total' covers the whole analysis
+STAGES = (
+    'preprocess', 'cache', 'dedup', 'tokenize', 'vader', 'housing', 'textblob', 'combine',
+    'keywords', 'relevance', 'region', 'program', 'label', 'total'
+)
+
+# Bucket i counts durations below 2**i microseconds; the last bucket is open-ended
+BUCKET_COUNT = 32
+PERCENTILES = (50, 95, 99)
+
+
+class StageTimer:
+    """
+    Lap timer for the stages of one analysis
+    """
+
+    __slots__ = ('timings', '_start', '_last')
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, stage: str):
+        """Charge the time since the previous lap to a stage"""
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def finish(self) -> Dict[str, float]:
+        """
+        Close the timer
+
+        Returns:
+            Seconds per stage, including 'total'
+        """
+        self.timings['total'] = time.perf_counter() - self._start
+        return self.timings
+
+
+class StageHistogram:
+    """
+    Latency histogram of one stage with power-of-two microsecond buckets
+    """
+
+    __slots__ = ('buckets', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.buckets: List[int] = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[bucket if bucket < BUCKET_COUNT else BUCKET_COUNT - 1] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent: float) -> float:
+        """Upper bound (seconds) of the bucket holding the given percentile"""
+        if not self.count:
+            return 0.0
+
+        rank = self.count * percent / 100
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(2 ** bucket / 1e6, self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        """Counters, mean and percentiles in milliseconds, plus the non-empty buckets"""
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'max_ms': self.max * 1000,
+            **{f"p{percent}_ms": self.percentile(percent) * 1000 for percent in PERCENTILES},
+            'buckets': [
+                {'le_ms': 2 ** bucket / 1000, 'count': count}
+                for bucket, count in enumerate(self.buckets) if count
+            ]
+        }
+
+
+class PipelineMetrics:
+    """
+    Per-stage latency histograms for the sentiment pipeline
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Args:
+            enabled: Record analyses; when False, record() is a no-op
+        """
+        self.enabled = enabled
+        self._histograms: Dict[str, StageHistogram] = {stage: StageHistogram() for stage in STAGES}
+        self._lock = threading.Lock()
+
+    def record(self, timings: Dict[str, float]):
+        """
+        Add the stage timings of one analysis
+
+        Args:
+            timings: Seconds per stage, as returned by StageTimer.finish
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            for stage, seconds in timings.items():
+                histogram = self._histograms.get(stage)
+                if histogram is None:
+                    histogram = self._histograms[stage] = StageHistogram()
+                histogram.record(seconds)
+
+    def snapshot(self, stages: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        Summaries of the recorded stages
+
+        Args:
+            stages: Stages to include (default: every stage recorded so far)
+
+        Returns:
+            Dictionary of stage -> histogram summary, in pipeline order
+        """
+        with self._lock:
+            return {
+                stage: histogram.summary()
+                for stage, histogram in self._histograms.items()
+                if histogram.count and (stages is None or stage in stages)
+            }
+
+    def reset(self):
+        """Clear every histogram"""
+        with self._lock:
+            self._histograms = {stage: StageHistogram() for stage in STAGES}
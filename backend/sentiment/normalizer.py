@@ -0,0 +1,92 @@
+"""
+Text Normalization for HomeWatch
+
+Precompiled normalization shared by the data processor and the sentiment
+analyzer:
+- clean(): HTML entity decoding, Unicode NFKD and whitespace collapsing
+  for stored content
+- for_analysis(): lowercasing plus URL/email/phone stripping and special
+  character removal ahead of sentiment scoring
+
+Patterns are compiled once at import. Each step is skipped when a cheap
+substring or ASCII check shows it cannot change the text, which is the
+common case for English news content.
+"""
+
+import html
+import re
+import unicodedata
+
+URL_PATTERN = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+PHONE_PATTERN = r'(?:\+?6?01[0-46-9]-*[0-9]{7,8})'
+
+URL_RE = re.compile(URL_PATTERN)
+EMAIL_RE = re.compile(EMAIL_PATTERN)
+PHONE_RE = re.compile(PHONE_PATTERN)
+SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.\!\?\,\-]')
+
+
+def collapse_whitespace(text: str) -> str:
+    """Collapse whitespace runs to single spaces and strip (same as re.sub(r'\\s+', ' ', text).strip())"""
+    return ' '.join(text.split())
+
+
+class TextNormalizer:
+    """
+    Precompiled text normalization pipeline
+    """
+
+    @staticmethod
+    def clean(text: str) -> str:
+        """
+        Decode HTML entities, normalize Unicode and collapse whitespace
+
+        Args:
+            text: Raw text string
+
+        Returns:
+            Cleaned text string
+        """
+        if not text:
+            return ""
+
+        # Entities always contain '&'
+        if '&' in text:
+            text = html.unescape(text)
+
+        # NFKD never changes pure ASCII text
+        if not text.isascii():
+            text = unicodedata.normalize('NFKD', text)
+
+        return collapse_whitespace(text)
+
+    @staticmethod
+    def for_analysis(text: str) -> str:
+        """
+        Prepare text for sentiment scoring
+
+        Args:
+            text: Raw text string
+
+        Returns:
+            Lowercased text without URLs, emails, phone numbers or special characters
+        """
+        text = text.lower()
+
+        # Only run a pattern when its required literal is present
+        if 'http' in text:
+            text = URL_RE.sub('', text)
+        if '@' in text:
+            text = EMAIL_RE.sub('', text)
+        if '01' in text:
+            text = PHONE_RE.sub('', text)
+
+        text = collapse_whitespace(text)
+
+        return SPECIAL_CHARS_RE.sub(' ', text)
+
+    @staticmethod
+    def join(*parts: str) -> str:
+        """Join already-cleaned fields the way clean() would clean their concatenation"""
+        return ' '.join(part for part in parts if part)
@@ -0,0 +1,130 @@
+"""
+Process-pool execution for HomeWatch batch sentiment analysis
+
+VADER, TextBlob and NLTK are pure Python, so batch scoring on the request
+thread gets no parallelism from the threaded Flask server. This module
+fans batches out to a pool of worker processes, each holding its own
+SentimentAnalyzer built once at worker startup with the parent's runtime
+configuration (combine weights, thresholds, keyword weights). A pool
+serves one lexicon_version; the analyzer replaces it when that changes.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Union
+
+from sentiment.columnar import ColumnarBatchResult
+
+logger = logging.getLogger(__name__)
+
+# Analyzer owned by the current worker process (set by _init_worker)
+_worker_analyzer = None
+
+
+def _init_worker(config: Optional[Dict] = None, version: Optional[str] = None):
+    """
+    Build the per-process analyzer once when the worker starts
+    
+    Args:
+        config: Analyzer attributes to apply (see SentimentAnalyzer.worker_config)
+        version: Parent's lexicon_version, checked once config is applied
+    """
+    global _worker_analyzer
+    from sentiment.analyzer import SentimentAnalyzer
+    _worker_analyzer = SentimentAnalyzer(batch_workers=0)
+    for name, value in (config or {}).items():
+        setattr(_worker_analyzer, name, value)
+    if version is not None and _worker_analyzer.lexicon_version() != version:
+        logger.error(f"Sentiment worker version {_worker_analyzer.lexicon_version()} "
+                     f"differs from the parent's {version}")
+
+
+def _analyze_chunk(offset: int, items: List[Dict], mode: Optional[str] = None,
+                   columnar: bool = False) -> Union[List[Dict], ColumnarBatchResult]:
+    """Score one chunk of batch items inside a worker process"""
+    return _worker_analyzer._analyze_batch_items(items, offset, mode, columnar)
+
+
+class ProcessPoolBatchRunner:
+    """
+    Splits batch items into chunks and scores them on a process pool
+
+    Results come back in input order with the same per-item error entries
+    as the in-process batch path.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 64,
+                 config: Optional[Dict] = None, version: Optional[str] = None):
+        """
+        Args:
+            workers: Worker processes (default: CPU count)
+            chunk_size: Items per worker task
+            config: Analyzer attributes applied in each worker
+            version: lexicon_version the workers score with
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.config = config
+        self.version = version
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the pool on first use so idle processes are never spawned"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self.config, self.version)
+                )
+                logger.info(f"Started sentiment process pool with {self.workers} workers")
+            return self._executor
+
+    def run(self, items: List[Dict], chunk_size: Optional[int] = None,
+            mode: Optional[str] = None,
+            columnar: bool = False) -> Union[List[Dict], ColumnarBatchResult]:
+        """
+        Analyze batch items on the process pool
+
+        Args:
+            items: List of dictionaries with 'text', 'id', and optional metadata
+            chunk_size: Optional override of the configured chunk size
+            mode: Optional analysis mode passed to each worker
+            columnar: Have workers return column chunks, joined in order
+
+        Returns:
+            List of sentiment analysis results (or a ColumnarBatchResult) in input order
+        """
+        size = max(1, chunk_size or self.chunk_size)
+        offsets = list(range(0, len(items), size))
+        chunks = [items[offset:offset + size] for offset in offsets]
+
+        executor = self._get_executor()
+        try:
+            chunk_results = executor.map(_analyze_chunk, offsets, chunks,
+                                         [mode] * len(chunks), [columnar] * len(chunks))
+            if columnar:
+                return ColumnarBatchResult.concat(list(chunk_results))
+
+            results = []
+            for chunk in chunk_results:
+                results.extend(chunk)
+            return results
+        except BrokenProcessPool:
+            # A worker died (e.g. killed by the OS); drop the pool so the next
+            # batch starts a fresh one
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -0,0 +1,168 @@
+"""
+Multi-phrase matcher for HomeWatch
+
+Aho-Corasick automaton over word tokens, used to find programme, region,
+keyword and category phrases in a single pass over a document. Matching
+works on whole words, so short phrases such as 'kl' or 'ppr' never match
+inside longer words ('klang', 'pprt').
+"""
+
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+class PhraseMatch(NamedTuple):
+    """A phrase found in a document, located by token positions"""
+    phrase: str
+    label: Any
+    start: int  # Index of the first matched token
+    end: int    # Index one past the last matched token
+
+
+class PhraseMatcher:
+    """
+    Compiled Aho-Corasick automaton mapping phrases to labels
+
+    Build it once (e.g. in a service __init__) and reuse it for every
+    document; matching cost grows with document length, not with the
+    number of phrases.
+    """
+
+    def __init__(self, phrases: Union[Dict[str, Any], Iterable[str],
+                                      Iterable[Tuple[str, Any]]]):
+        """
+        Args:
+            phrases: Mapping of phrase -> label, an iterable of
+                (phrase, label) pairs, or an iterable of phrases (each
+                phrase is then its own label)
+        """
+        if isinstance(phrases, dict):
+            pairs = list(phrases.items())
+        else:
+            pairs = [item if isinstance(item, tuple) else (item, item) for item in phrases]
+
+        # goto[state] maps a token to the next state; state 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, Any, int]]] = [[]]
+
+        for phrase, label in pairs:
+            self._add(phrase, label)
+
+        self._build_failure_links()
+        self.size = len(pairs)
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Split text into the lowercase word tokens the automaton runs on"""
+        return TOKEN_PATTERN.findall(text.lower())
+
+    @staticmethod
+    def words_from_tokens(tokens: Iterable[str]) -> List[str]:
+        """
+        Automaton word tokens from an existing tokenization (e.g. NLTK's)
+
+        Gives the same words as ``tokenize`` on the tokens' text, except
+        where the tokenizer split a word itself (NLTK splits 'cannot' into
+        'can' and 'not').
+        """
+        words = []
+        for token in tokens:
+            token = token.lower()
+            if token.isalnum():
+                words.append(token)
+            else:
+                words.extend(TOKEN_PATTERN.findall(token))
+        return words
+
+    def _add(self, phrase: str, label: Any):
+        """Insert one phrase into the trie"""
+        tokens = self.tokenize(phrase)
+        if not tokens:
+            return
+
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][token] = next_state
+            state = next_state
+
+        self._output[state].append((phrase, label, len(tokens)))
+
+    def _build_failure_links(self):
+        """Breadth-first construction of failure links and merged outputs"""
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[next_state] = target if target != next_state else 0
+
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def find_all(self, text: Optional[str] = None, tokens: Optional[List[str]] = None) -> List[PhraseMatch]:
+        """
+        Find every phrase occurrence in one pass
+
+        Args:
+            text: Raw text to scan (tokenized with ``tokenize``)
+            tokens: Pre-tokenized lowercase words, used instead of ``text``
+
+        Returns:
+            Matches in order of where they end in the document
+        """
+        if tokens is None:
+            tokens = self.tokenize(text or '')
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        root = goto[0]
+        matches = []
+        state = 0
+
+        for position, token in enumerate(tokens):
+            if state == 0:
+                state = root.get(token, 0)
+            else:
+                while state and token not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(token, 0)
+
+            if state and output[state]:
+                for phrase, label, length in output[state]:
+                    matches.append(PhraseMatch(phrase, label, position - length + 1, position + 1))
+
+        return matches
+
+    def labels(self, text: Optional[str] = None, tokens: Optional[List[str]] = None) -> Set[Any]:
+        """Return the distinct labels of every phrase found"""
+        return {match.label for match in self.find_all(text, tokens)}
+
+    def phrases(self, text: Optional[str] = None, tokens: Optional[List[str]] = None) -> List[str]:
+        """Return the distinct phrases found, in order of first occurrence"""
+        found = {}
+        for match in sorted(self.find_all(text, tokens), key=lambda match: match.start):
+            found.setdefault(match.phrase, None)
+        return list(found)
+
+    def first(self, text: Optional[str] = None, tokens: Optional[List[str]] = None) -> Optional[PhraseMatch]:
+        """Return the earliest match in the document (longest on ties)"""
+        matches = self.find_all(text, tokens)
+        if not matches:
+            return None
+        return min(matches, key=lambda match: (match.start, match.start - match.end))
@@ -0,0 +1,179 @@
+"""
+NLP Resource Loading for HomeWatch
+
+NLTK, VADER and TextBlob are expensive to import and build, and NLTK may try
+to download corpora. Resources here are loaded lazily on first use and
+shared by every SentimentAnalyzer in the process:
+- Stopwords come from the bundled lexicons/ directory (no NLTK download)
+- VADER uses the lexicon shipped inside the vaderSentiment package
+- Word tokenization uses NLTK punkt when installed, otherwise a bundled
+  regex sentence splitter in front of NLTK's word tokenizer
+- warm_up() loads everything ahead of the first request
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+LEXICON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lexicons')
+
+# Sentence boundaries for the offline tokenizer fallback
+SENTENCE_BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+')
+
+_resources = {}
+_lock = threading.RLock()
+
+
+def _load_once(name: str, loader: Callable):
+    """Build a resource on first request and reuse it afterwards"""
+    resource = _resources.get(name)
+    if resource is None:
+        with _lock:
+            resource = _resources.get(name)
+            if resource is None:
+                start = time.perf_counter()
+                resource = loader()
+                _resources[name] = resource
+                logger.debug(f"Loaded NLP resource {name} in {time.perf_counter() - start:.3f}s")
+    return resource
+
+
+def load_stopword_list(language: str) -> FrozenSet[str]:
+    """
+    Read a bundled stopword list
+
+    Args:
+        language: List name, e.g. 'english' or 'malay'
+
+    Returns:
+        Frozen set of stopwords
+    """
+    path = os.path.join(LEXICON_DIR, f'stopwords_{language}.txt')
+    with open(path, 'r', encoding='utf-8') as f:
+        return frozenset(line.strip() for line in f if line.strip())
+
+
+def get_english_stopwords() -> FrozenSet[str]:
+    """English stopwords (same list as the NLTK stopwords corpus)"""
+    return _load_once('stopwords_english', lambda: load_stopword_list('english'))
+
+
+def get_stopwords() -> FrozenSet[str]:
+    """English plus common Malay stopwords"""
+    return _load_once(
+        'stopwords', lambda: get_english_stopwords() | load_stopword_list('malay')
+    )
+
+
+def get_vader():
+    """Shared VADER SentimentIntensityAnalyzer"""
+    def load():
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        return SentimentIntensityAnalyzer()
+
+    return _load_once('vader', load)
+
+
+def get_stemmer():
+    """Shared NLTK PorterStemmer"""
+    def load():
+        from nltk.stem import PorterStemmer
+        return PorterStemmer()
+
+    return _load_once('stemmer', load)
+
+
+def _load_word_tokenizer() -> Callable[[str], List[str]]:
+    """Use NLTK punkt when installed, otherwise the offline fallback"""
+    from nltk.tokenize import word_tokenize as nltk_word_tokenize
+
+    try:
+        nltk_word_tokenize('Warm up.')
+        return nltk_word_tokenize
+    except LookupError:
+        logger.warning("NLTK punkt data not found; using bundled sentence splitter for tokenization")
+
+    from nltk.tokenize.destructive import NLTKWordTokenizer
+    tokenizer = NLTKWordTokenizer()
+
+    def offline_word_tokenize(text: str) -> List[str]:
+        return [
+            token
+            for sentence in SENTENCE_BOUNDARY_RE.split(text)
+            for token in tokenizer.tokenize(sentence)
+        ]
+
+    return offline_word_tokenize
+
+
+def word_tokenize(text: str) -> List[str]:
+    """Tokenize text into words with the lazily loaded tokenizer"""
+    return _load_once('word_tokenizer', _load_word_tokenizer)(text)
+
+
+def _load_textblob():
+    from textblob import TextBlob
+    return TextBlob
+
+
+def textblob_sentiment(text: str) -> Tuple[float, float]:
+    """
+    Score text with TextBlob
+
+    Returns:
+        Tuple of (polarity, subjectivity)
+    """
+    sentiment = _load_once('textblob', _load_textblob)(text).sentiment
+    return sentiment.polarity, sentiment.subjectivity
+
+
+def ensure_nltk_data():
+    """Download the optional NLTK data (punkt) if it is missing"""
+    import nltk
+
+    for resource, package in [('tokenizers/punkt', 'punkt'), ('tokenizers/punkt_tab', 'punkt_tab')]:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            try:
+                nltk.download(package, quiet=True)
+            except Exception as e:
+                logger.warning(f"Could not download {package}: {e}")
+
+    # Pick up the downloaded data on the next tokenization
+    _resources.pop('word_tokenizer', None)
+
+
+def warm_up(download_missing: bool = False) -> Dict[str, float]:
+    """
+    Load every NLP resource and run each scorer once
+
+    Args:
+        download_missing: Download missing optional NLTK data first (see
+            ensure_nltk_data)
+
+    Returns:
+        Seconds spent loading each resource
+    """
+    timings = {}
+    steps = [('nltk_data', ensure_nltk_data)] if download_missing else []
+    steps += [
+        ('stopwords', get_stopwords),
+        ('word_tokenizer', lambda: word_tokenize('Rumah mampu milik. Affordable housing!')),
+        ('vader', lambda: get_vader().polarity_scores('affordable housing is good')),
+        ('textblob', lambda: textblob_sentiment('affordable housing is good')),
+        ('stemmer', lambda: get_stemmer().stem('housing')),
+    ]
+
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - start
+
+    logger.info(f"NLP resources warmed up in {sum(timings.values()):.2f}s")
+    return timings
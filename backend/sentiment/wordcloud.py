@@ -0,0 +1,161 @@
+"""
+Word Cloud Term Counting for HomeWatch
+
+Builds stemmed word frequencies for the frontend word cloud:
+- Stopword and boost sets are frozen once at construction
+- Tokens are counted with a single Counter pass over the whitespace-split
+  text, so filtering and stemming run once per distinct word instead of once
+  per occurrence
+- Stems and boost decisions are memoized in bounded LRU tables shared
+  across calls
+
+Output matches tokenizing the whole text with NLTK word_tokenize: plain
+alphabetic tokens are taken as-is, and only tokens NLTK would split
+(contractions such as 'cannot', leftover Unicode punctuation) are passed
+through the tokenizer.
+"""
+
+import re
+import string
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from sentiment import resources
+
+# Custom stopwords relevant to housing discussions
+CUSTOM_STOPWORDS = frozenset({
+    'housing', 'house', 'home', 'property', 'malaysia', 'malaysian',
+    'government', 'scheme', 'program', 'programme', 'policy', 'policies',
+    'affordable', 'low', 'cost', 'income', 'price', 'prices',
+    'rm', 'ringgit', 'thousand', 'million', 'billion',
+    'people', 'person', 'individual', 'citizen', 'citizens',
+    'country', 'nation', 'national', 'state', 'federal',
+    'would', 'could', 'should', 'will', 'shall', 'may', 'might',
+    'one', 'two', 'three', 'many', 'much', 'more', 'most',
+    'also', 'even', 'still', 'yet', 'however', 'therefore',
+    'said', 'says', 'according', 'reported', 'stated'
+})
+
+# Stem fragments whose words get a frequency boost
+HOUSING_BOOST_TERMS = frozenset({
+    'pr1ma', 'rumawip', 'pprt', 'ppr', 'mydeposit', 'myfirst',
+    'develop', 'construct', 'build', 'project', 'unit',
+    'owner', 'buyer', 'purchase', 'rent', 'rental',
+    'loan', 'mortgage', 'financ', 'fund', 'subsidi',
+    'eligibl', 'criteria', 'qualifi', 'applic',
+    'kuala', 'lumpur', 'selangor', 'johor', 'penang',
+    'perak', 'sabah', 'sarawak', 'kedah', 'negeri'
+})
+
+BOOST_FACTOR = 1.5
+MIN_WORD_LENGTH = 4
+
+# Punctuation and digits are stripped before tokenizing
+STRIP_TRANSLATION = str.maketrans('', '', string.punctuation + string.digits)
+
+
+class WordCloudEngine:
+    """
+    Stemmed word frequency counter with memoized stemming
+    """
+
+    def __init__(self, stopwords: Optional[Iterable[str]] = None,
+                 boost_terms: Iterable[str] = HOUSING_BOOST_TERMS, memo_size: int = 50000):
+        """
+        Args:
+            stopwords: Words to drop; defaults to the English stopwords plus
+                CUSTOM_STOPWORDS
+            boost_terms: Substrings marking stems whose counts are boosted
+            memo_size: Maximum entries in each memo table
+        """
+        if stopwords is None:
+            stopwords = resources.get_english_stopwords() | CUSTOM_STOPWORDS
+        self.stopwords: FrozenSet[str] = frozenset(stopwords)
+        self.boost_terms: FrozenSet[str] = frozenset(boost_terms)
+
+        # Any boost term occurring inside a word, in one regex search
+        self._boost_pattern = re.compile('|'.join(re.escape(term) for term in sorted(self.boost_terms))) \
+            if self.boost_terms else None
+
+        # NLTK contraction rules split alphabetic tokens such as 'cannot' or 'gonna'
+        from nltk.tokenize.destructive import NLTKWordTokenizer
+        self._contraction_patterns = tuple(NLTKWordTokenizer.CONTRACTIONS2 + NLTKWordTokenizer.CONTRACTIONS3)
+
+        stemmer = resources.get_stemmer()
+        self.stem = lru_cache(maxsize=memo_size)(stemmer.stem)
+        self.is_boosted = lru_cache(maxsize=memo_size)(self._is_boosted)
+        self._split = lru_cache(maxsize=memo_size)(self._split_token)
+
+    def _is_boosted(self, word: str) -> bool:
+        return bool(self._boost_pattern and self._boost_pattern.search(word))
+
+    def _split_token(self, token: str) -> Tuple[str, ...]:
+        """Words NLTK produces for one whitespace-separated token"""
+        if token.isalpha() and not any(pattern.search(token) for pattern in self._contraction_patterns):
+            return (token,)
+        return tuple(resources.word_tokenize(token))
+
+    def count_terms(self, texts: Iterable[str]) -> Counter:
+        """
+        Count stemmed, filtered words across texts
+
+        Args:
+            texts: Text strings to count
+
+        Returns:
+            Counter of stem -> occurrences, in order of first occurrence
+        """
+        cleaned_text = ' '.join(texts).lower().translate(STRIP_TRANSLATION)
+        token_counts = Counter(cleaned_text.split())
+
+        stopwords = self.stopwords
+        stem = self.stem
+        split = self._split
+        counts = Counter()
+
+        for token, occurrences in token_counts.items():
+            for word in split(token):
+                if len(word) >= MIN_WORD_LENGTH and word.isalpha() and word not in stopwords:
+                    counts[stem(word)] += occurrences
+
+        return counts
+
+    def top_terms(self, counts: Counter, max_words: int = 100) -> Dict[str, int]:
+        """
+        Select the most frequent stems and boost housing terms
+
+        Args:
+            counts: Counter from count_terms
+            max_words: Maximum number of words to return
+
+        Returns:
+            Dictionary of word frequencies
+        """
+        top_words = dict(counts.most_common(max_words))
+
+        for word, count in top_words.items():
+            if self.is_boosted(word):
+                top_words[word] = int(count * BOOST_FACTOR)  # Boost relevance
+
+        return top_words
+
+    def generate(self, texts: List[str], max_words: int = 100) -> Dict[str, int]:
+        """
+        Generate word frequency data for word cloud visualization
+
+        Args:
+            texts: List of text strings to analyze
+            max_words: Maximum number of words to return
+
+        Returns:
+            Dictionary of word frequencies
+        """
+        return self.top_terms(self.count_terms(texts), max_words)
+
+    def memo_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters of the memo tables"""
+        return {
+            name: table.cache_info()._asdict()
+            for name, table in (('stem', self.stem), ('boost', self.is_boosted), ('split', self._split))
+        }
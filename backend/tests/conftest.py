@@ -0,0 +1,32 @@
+"""
+Shared fixtures for the backend tests
+"""
+
+import os
+
+import pytest
+
+from database.manager import DatabaseManager
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Initialized DatabaseManager on a fresh SQLite file"""
+    monkeypatch.setenv('DB_TYPE', 'sqlite')
+    monkeypatch.setenv('DB_PATH', str(tmp_path / 'homewatch.db'))
+    manager = DatabaseManager()
+    manager.initialize()
+    return manager
+
+
+@pytest.fixture(scope='session')
+def server(tmp_path_factory):
+    """The Flask app module on a temporary database, with rate limits off"""
+    os.environ['DB_TYPE'] = 'sqlite'
+    os.environ['DB_PATH'] = str(tmp_path_factory.mktemp('server') / 'homewatch.db')
+    os.environ['SENTIMENT_CACHE_PERSIST'] = 'false'
+    import app as server
+
+    server.db_manager.initialize()
+    server.limiter.enabled = False
+    return server
@@ -0,0 +1,150 @@
+"""
+SentimentCache and its use by SentimentAnalyzer batches
+
+Run from the backend directory: python -m pytest tests
+"""
+
+import pytest
+
+from sentiment.analyzer import SentimentAnalyzer
+from sentiment.cache import SentimentCache
+from sentiment.dedup import NearDuplicateIndex
+
+TEXTS = [
+    "Harga rumah di Kuala Lumpur terlalu mahal untuk anak muda",
+    "PR1MA launched affordable homes and buyers are happy with the quality",
+    "The new housing scheme is a scam, the developer abandoned the project",
+    "Rent keeps rising while wages stay flat, this is terrible",
+    "Great news: the government extended the first home buyer stamp duty exemption",
+    "Mortgage approval took months but we finally got the keys",
+]
+
+
+class RecordingDatabase:
+    """Persistent tier double recording every batch of cache writes"""
+
+    def __init__(self):
+        self.rows = {}
+        self.writes = []
+
+    def get_cached_sentiment(self, cache_key):
+        return self.rows.get(cache_key)
+
+    def cache_sentiments(self, entries):
+        self.writes.append(len(entries))
+        for cache_key, _, data, _ in entries:
+            self.rows[cache_key] = data
+
+
+@pytest.fixture
+def items():
+    return [{'id': index, 'text': text} for index, text in enumerate(TEXTS)]
+
+
+def make_analyzer(workers, **kwargs):
+    return SentimentAnalyzer(batch_workers=workers, batch_chunk_size=2, **kwargs)
+
+
+def scores(results):
+    return [(result['id'], result['sentiment_label'], result['scores']) for result in results]
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_batches_hit_the_cache(items, workers):
+    database = RecordingDatabase()
+    cache = SentimentCache(db_manager=database)
+    analyzer = make_analyzer(workers, cache=cache)
+    try:
+        first = analyzer.analyze_batch(items)
+        assert cache.stats()['misses'] == len(items)
+        assert database.writes == [len(items)]  # one deferred write per batch
+
+        second = analyzer.analyze_batch(items)
+        assert cache.stats()['hits'] == len(items)
+        assert database.writes == [len(items)]
+        assert scores(second) == scores(first)
+    finally:
+        if analyzer._batch_runner is not None:
+            analyzer._batch_runner.shutdown()
+
+
+def test_pool_batches_match_in_process_batches(items):
+    items = items + [{'text': TEXTS[0]}, {'id': 'empty', 'text': ''}]
+    pooled = make_analyzer(2, cache=SentimentCache())
+    try:
+        pooled_results = pooled.analyze_batch([dict(item) for item in items])
+        columnar = pooled.analyze_batch([dict(item) for item in items], columnar=True).to_list()
+    finally:
+        pooled._batch_runner.shutdown()
+    serial_results = make_analyzer(0, cache=SentimentCache()).analyze_batch([dict(item) for item in items])
+
+    assert [result['id'] for result in pooled_results] == [result['id'] for result in serial_results]
+    assert pooled_results[-2]['id'] == 'batch_6'
+    assert 'error' in pooled_results[-1] and 'error' in columnar[-1]
+    assert scores(pooled_results[:-1]) == scores(serial_results[:-1]) == scores(columnar[:-1])
+
+
+def test_pool_batches_reuse_near_duplicates(items):
+    analyzer = make_analyzer(2, cache=SentimentCache(), dedup_index=NearDuplicateIndex(threshold=0.7))
+    edited = [{'id': item['id'], 'text': item['text'] + ' today'} for item in items]
+    try:
+        analyzer.analyze_batch(items)
+        results = analyzer.analyze_batch(edited)
+    finally:
+        analyzer._batch_runner.shutdown()
+
+    assert all('near_duplicate_of' in result for result in results)
+
+
+def test_changing_the_analyzer_version_invalidates_entries(database, items):
+    cache = SentimentCache(db_manager=database)
+    analyzer = make_analyzer(0, cache=cache)
+    analyzer.analyze_batch(items)
+    old_version = analyzer.lexicon_version()
+
+    analyzer.set_combine_weights({'vader': 0.8, 'textblob': 0.1, 'housing': 0.1})
+    assert analyzer.lexicon_version() != old_version
+
+    analyzer.analyze_batch(items)
+    stats = cache.stats()
+    assert stats['invalidations'] == len(items)
+    assert stats['misses'] == 2 * len(items)
+    assert stats['version'] == analyzer.lexicon_version()
+
+    # Persisted rows of the old version stay unreachable until purged
+    assert cache.purge_stale(analyzer.lexicon_version()) == len(items)
+    assert cache.purge_stale(analyzer.lexicon_version()) == 0
+
+
+def test_persistent_tier_survives_a_restart(database, items):
+    make_analyzer(0, cache=SentimentCache(db_manager=database)).analyze_batch(items)
+
+    cache = SentimentCache(db_manager=database)
+    make_analyzer(0, cache=cache).analyze_batch(items)
+    assert cache.stats()['disk_hits'] == len(items)
+    assert cache.stats()['misses'] == 0
+
+
+def test_persistent_tier_is_pruned(database):
+    cache = SentimentCache(db_manager=database, max_db_entries=20)
+    keys = [f"key-{index}" for index in range(25)]
+    for index, key in enumerate(keys):
+        cache.put(key, 'v1', {'index': index})
+
+    # Pruned after every second write (a tenth of the limit): the 25th row waits
+    assert cache.stats()['db_writes'] == 25
+    assert cache.stats()['db_pruned'] == 4
+    assert cache.prune() == 1
+    assert cache.prune() == 0
+    assert sum(database.get_cached_sentiment(key) is not None for key in keys) == 20
+
+
+def test_deferred_writes_are_persisted_once(database):
+    cache = SentimentCache(db_manager=database)
+    with cache.deferred_writes():
+        cache.put('key', 'v1', {'value': 1})
+        cache.put('key', 'v1', {'value': 2})
+        assert database.get_cached_sentiment('key') is None
+
+    assert database.get_cached_sentiment('key') == {'value': 2}
+    assert cache.stats()['db_writes'] == 1
@@ -0,0 +1,103 @@
+"""
+Incremental collection state: advancing the high-water mark
+"""
+
+from datetime import datetime, timedelta
+
+from data.collection_state import SourceState, state_key
+
+BASE = datetime(2025, 6, 1, 12, 0)
+OVERLAP = timedelta(hours=1)
+
+
+def at(minutes):
+    return BASE + timedelta(minutes=minutes)
+
+
+def run(state, entries, cutoff, limit=None):
+    """Collect like the collectors do: examine the window, keep new entries up to limit"""
+    start = state.window_start(cutoff, OVERLAP)
+    candidates = []
+    for entry_id, published in sorted(entries.items(), key=lambda item: item[1]):
+        if published < start:
+            continue
+        state.examine(entry_id, published)
+        if state.is_new(entry_id):
+            candidates.append(entry_id)
+    collected = candidates[:limit] if limit is not None else candidates
+    state.advance(candidates[len(collected):], OVERLAP)
+    return collected
+
+
+def test_mark_moves_to_the_newest_handled_entry():
+    state = SourceState('rss:test')
+    for entry_id, minutes in (('a', 0), ('b', 30), ('c', 90)):
+        state.examine(entry_id, at(minutes))
+    state.advance([], OVERLAP)
+
+    assert state.last_published == at(90)
+    # Only ids within the overlap before the mark are remembered
+    assert set(state.seen_ids) == {'b', 'c'}
+    assert state.examined == {}
+
+
+def test_pending_entries_hold_the_mark_back():
+    state = SourceState('rss:test')
+    for entry_id, minutes in (('a', 0), ('b', 30), ('c', 60), ('d', 90)):
+        state.examine(entry_id, at(minutes))
+    state.advance(['c', 'd', 'never-examined'], OVERLAP)
+
+    assert state.last_published == at(60)
+    assert set(state.seen_ids) == {'a', 'b'}
+    assert state.is_new('c') and state.is_new('d') and not state.is_new('b')
+    assert state.window_start(at(-600), OVERLAP) <= at(60)
+
+
+def test_empty_run_keeps_the_mark():
+    state = SourceState('rss:test', last_published=at(90), seen_ids={'x': at(80).isoformat()})
+    state.advance([], OVERLAP)
+    assert state.last_published == at(90)
+    assert state.seen_ids == {'x': at(80).isoformat()}
+
+    assert SourceState('rss:empty').advance([], OVERLAP) is None
+    assert SourceState('rss:empty').window_start(at(-600), OVERLAP) == at(-600)
+
+
+def test_seen_ids_are_capped_newest_first():
+    state = SourceState('rss:test')
+    for minute in range(10):
+        state.examine(f"id{minute}", at(minute))
+    state.advance([], OVERLAP, max_seen=3)
+    assert set(state.seen_ids) == {'id7', 'id8', 'id9'}
+
+
+def test_limited_runs_collect_every_entry_once():
+    entries = {f"id{index}": at(index * 10) for index in range(10)}
+    state = SourceState('rss:test')
+
+    collected = []
+    for _ in range(4):
+        collected.extend(run(state, entries, cutoff=at(-600), limit=3))
+    assert collected == [f"id{index}" for index in range(10)]
+
+    entries.update({'late': at(85), 'new': at(120)})  # One inside the overlap, one past the mark
+    assert sorted(run(state, entries, cutoff=at(-600))) == ['late', 'new']
+    assert run(state, entries, cutoff=at(-600)) == []
+
+
+def test_state_round_trips_through_the_database(database):
+    state = SourceState('rss:test', cursor='1790')
+    state.examine('a', at(0))
+    state.examine('b', at(30))
+    state.advance([], OVERLAP)
+    state.save(database)
+
+    loaded = SourceState.load(database, 'rss:test')
+    assert (loaded.last_published, loaded.seen_ids, loaded.cursor) == (at(30), state.seen_ids, '1790')
+    assert SourceState.load(database, 'rss:other') == SourceState('rss:other')
+
+
+def test_state_key_ignores_term_order_and_case():
+    assert state_key('rss:thestar', ['Rumah', 'PPR ']) == state_key('rss:thestar', ['ppr', 'rumah'])
+    assert state_key('rss:thestar', ['rumah']) != state_key('rss:thestar', ['rumah', 'ppr'])
+    assert state_key('rss:thestar', ['rumah']) != state_key('rss:nst', ['rumah'])
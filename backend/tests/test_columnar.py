@@ -0,0 +1,142 @@
+"""
+ColumnarBatchResult round trips against the per-item dictionary results
+"""
+
+import json
+import math
+
+import pytest
+
+from sentiment.analyzer import SentimentAnalyzer
+from sentiment.columnar import MISSING, SCORE_COLUMNS, ColumnarBatchResult
+
+TEXTS = [
+    "Harga rumah di Kuala Lumpur terlalu mahal untuk anak muda",
+    "PR1MA launched affordable homes in Selangor and buyers are happy",
+    "The housing scheme is a scam, the developer abandoned the project",
+    "The weather was fine",
+    "",
+    "Great news: RUMAWIP units in Putrajaya are finally ready",
+]
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return SentimentAnalyzer(batch_workers=0)
+
+
+def items():
+    return [{'id': f"item-{index}", 'text': text, 'metadata': {'row': index}} for index, text in enumerate(TEXTS)]
+
+
+def without_timestamps(records):
+    return [{key: value for key, value in record.items() if key != 'analyzed_at'} for record in records]
+
+
+def decode_columns(document):
+    """Rebuild per-item dictionaries from a to_columns document"""
+    columns = document['columns']
+    categories = document['categories']
+    records = []
+    for row in range(document['count']):
+        if str(row) in document['errors']:
+            records.append({'id': columns['id'][row], 'error': document['errors'][str(row)]})
+            continue
+
+        scores = {'vader': {}, 'textblob': {}, 'housing_context': {}}
+        for name, key, sub_key in SCORE_COLUMNS:
+            value = columns[name][row]
+            if sub_key is None:
+                scores[key] = value
+            elif value is not None:
+                scores[key][sub_key] = value
+        for key in ('vader', 'textblob', 'housing_context'):
+            scores[key] = scores[key] or None
+
+        decoded = {
+            name: categories[name][columns[name][row]] if columns[name][row] != MISSING else None
+            for name in categories
+        }
+        records.append({
+            'id': columns['id'][row],
+            'text': columns['text'][row],
+            'source': columns['source'][row],
+            'confidence': columns['confidence'][row],
+            'housing_relevance': columns['housing_relevance'][row],
+            'scores': scores,
+            'keywords': columns['keywords'][row],
+            'metadata': columns['metadata'][row],
+            **decoded,
+        })
+    return records
+
+
+@pytest.mark.parametrize('mode', ['full', 'cascade'])
+def test_columnar_records_match_dictionary_results(analyzer, mode):
+    expected = analyzer.analyze_batch(items(), mode=mode)
+    result = analyzer.analyze_batch(items(), mode=mode, columnar=True)
+
+    assert isinstance(result, ColumnarBatchResult)
+    assert len(result) == len(expected)
+    assert without_timestamps(result.to_list()) == without_timestamps(expected)
+    assert 'error' in result[4]
+    assert result.labels()[4] is None
+
+
+def test_indexing_and_slicing(analyzer):
+    result = analyzer.analyze_batch(items(), columnar=True)
+    records = result.to_list()
+
+    assert result[0] == records[0]
+    assert result[-1] == records[-1]
+    assert result[1:4] == records[1:4]
+    assert result[::-2] == records[::-2]
+    assert result[10:] == []
+    with pytest.raises(IndexError):
+        result[len(records)]
+
+
+def test_columns_decode_to_the_records(analyzer):
+    result = analyzer.analyze_batch(items(), columnar=True)
+    document = json.loads(result.to_json())
+
+    assert document['format'] == 'columnar'
+    assert document['count'] == len(TEXTS)
+    fields = ('id', 'text', 'source', 'confidence', 'housing_relevance', 'scores', 'keywords', 'metadata',
+              'sentiment_label', 'region_mentioned', 'program_mentioned', 'analysis_mode', 'error')
+    assert decode_columns(document) == [
+        {field: record[field] for field in fields if field in record} for record in result
+    ]
+
+
+def test_ndjson_lines_are_the_records(analyzer):
+    result = analyzer.analyze_batch(items(), columnar=True)
+    lines = list(result.iter_ndjson())
+
+    assert len(lines) == len(TEXTS)
+    assert all(line.endswith('\n') and '\n' not in line[:-1] for line in lines)
+    assert [json.loads(line) for line in lines] == json.loads(json.dumps(result.to_list()))
+    assert result.to_ndjson() == ''.join(lines)
+
+
+def test_concat_remaps_categories(analyzer):
+    whole = analyzer.analyze_batch(items(), columnar=True)
+    parts = [analyzer.analyze_batch(items()[start:start + 2], columnar=True) for start in range(0, len(TEXTS), 2)]
+    joined = ColumnarBatchResult.concat(parts)
+
+    assert without_timestamps(joined.to_list()) == without_timestamps(whole.to_list())
+    assert sorted(joined.errors) == [4]
+    for name, values in joined.categories.items():
+        assert len(values) == len(set(values)), name
+    assert joined.label_counts() == whole.label_counts()
+
+
+def test_unscored_textblob_is_missing_not_zero(analyzer):
+    result = analyzer.analyze_batch(items(), mode='cascade', columnar=True)
+    textblob = result.column('textblob_compound')
+
+    for record, value in zip(result, textblob.tolist()):
+        if 'error' in record:
+            continue
+        assert (record['scores']['textblob'] is None) == math.isnan(value)
+        assert ('textblob' in record['scorers_run']) != math.isnan(value)
@@ -0,0 +1,123 @@
+"""
+MinHash/LSH near-duplicate detection: threshold and eviction
+"""
+
+import pytest
+
+from data.processors import DataProcessor
+from sentiment.dedup import MinHasher, NearDuplicateIndex, lsh_parameters
+
+WORDS = [f"word{index}" for index in range(200)]
+
+
+def text_with_edits(edits, offset=0):
+    """A 100-word text with the first `edits` words replaced"""
+    words = WORDS[offset:offset + 100]
+    return ' '.join([f"edit{index}" for index in range(edits)] + words[edits:])
+
+
+def jaccard(first, second):
+    first, second = set(MinHasher.shingles(first)), set(MinHasher.shingles(second))
+    return len(first & second) / len(first | second)
+
+
+def test_signatures_are_stable_and_skip_empty_text():
+    text = text_with_edits(0)
+    assert (MinHasher(seed=3).signature(text) == MinHasher(seed=3).signature(text)).all()
+    assert not (MinHasher(seed=3).signature(text) == MinHasher(seed=4).signature(text)).all()
+    assert MinHasher().signature('  ...  ') is None
+    assert MinHasher.shingles('Rumah Mampu') == ['rumah mampu']
+
+
+@pytest.mark.parametrize('edits', [0, 2, 5, 10, 20])
+def test_similarity_estimates_jaccard(edits):
+    hasher = MinHasher(num_perm=256)
+    original, edited = text_with_edits(0), text_with_edits(edits)
+    estimate = hasher.similarity(hasher.signature(original), hasher.signature(edited))
+    assert estimate == pytest.approx(jaccard(original, edited), abs=0.1)
+
+
+@pytest.mark.parametrize('threshold', [0.5, 0.8, 0.9])
+def test_lsh_parameters_turn_near_the_threshold(threshold):
+    bands, rows = lsh_parameters(threshold, 128)
+    assert bands * rows <= 128
+    assert (1 / bands) ** (1 / rows) == pytest.approx(threshold, abs=0.1)
+
+
+def test_query_applies_the_threshold():
+    index = NearDuplicateIndex(threshold=0.8)
+    original = text_with_edits(0)
+    index.add('original', index.signature(original))
+
+    near = text_with_edits(2)  # Jaccard ~0.9
+    far = text_with_edits(30)  # Jaccard ~0.5
+    assert jaccard(original, near) > 0.85 and jaccard(original, far) < 0.6
+
+    key, similarity = index.query(index.signature(near))
+    assert key == 'original' and similarity >= 0.8
+    assert index.query(index.signature(far)) is None
+    assert index.query(index.signature(text_with_edits(0, offset=100))) is None
+    assert index.query(None) is None
+    assert index.stats()['matches'] == 1
+
+
+def test_the_most_similar_document_wins():
+    index = NearDuplicateIndex(threshold=0.7)
+    index.add('loose', index.signature(text_with_edits(8)))
+    index.add('close', index.signature(text_with_edits(1)))
+    assert index.query(index.signature(text_with_edits(0)))[0] == 'close'
+
+
+def test_oldest_documents_are_evicted():
+    index = NearDuplicateIndex(threshold=0.9, max_entries=3)
+    texts = {key: text_with_edits(0, offset=key * 20) + f" doc{key}" for key in range(5)}
+    for key, text in texts.items():
+        index.add(key, index.signature(text))
+    index.add(4, index.signature(texts[0]))  # Existing keys are not re-indexed
+
+    assert len(index) == 3
+    assert index.query(index.signature(texts[0])) is None
+    assert index.query(index.signature(texts[1])) is None
+    assert [index.query(index.signature(texts[key]))[0] for key in (2, 3, 4)] == [2, 3, 4]
+    # Evicted documents leave no keys behind in the LSH buckets
+    assert {key for bucket in index._buckets.values() for key in bucket} == {2, 3, 4}
+
+    index.remove(3)
+    index.remove('missing')
+    assert len(index) == 2 and index.query(index.signature(texts[3])) is None
+    index.clear()
+    assert len(index) == 0 and not index._buckets
+
+
+def test_threshold_is_validated():
+    for threshold in (0, -0.5, 1.5):
+        with pytest.raises(ValueError):
+            NearDuplicateIndex(threshold=threshold)
+
+
+def test_deduplicate_links_duplicates_without_mutating_items():
+    items = [
+        {'id': 'a', 'combined_text': text_with_edits(0)},
+        {'id': 'b', 'combined_text': text_with_edits(1)},
+        {'id': 'c', 'combined_text': text_with_edits(0, offset=100)},
+        {'id': 'd', 'combined_text': ''},
+        {'id': 'e', 'combined_text': '!!'},
+    ]
+    originals = [dict(item) for item in items]
+
+    unique = DataProcessor().deduplicate(items, threshold=0.8)
+
+    assert [(item['id'], item['near_duplicate_ids']) for item in unique] == [('a', ['b']), ('c', []), ('d', ['e'])]
+    assert items == originals
+
+
+def test_iter_unique_window_forgets_old_items():
+    items = [
+        {'id': 'a', 'combined_text': text_with_edits(0)},
+        {'id': 'b', 'combined_text': text_with_edits(0, offset=100)},
+        {'id': 'c', 'combined_text': text_with_edits(1)},
+    ]
+    processor = DataProcessor()
+
+    assert [item['id'] for item in processor.iter_unique(items, threshold=0.8, window=2)] == ['a', 'b']
+    assert [item['id'] for item in processor.iter_unique(items, threshold=0.8, window=1)] == ['a', 'b', 'c']
@@ -0,0 +1,148 @@
+"""
+Conditional GETs through HttpCache: 304 revalidation, freshness and eviction
+"""
+
+import pytest
+
+from data.http_cache import HttpCache
+from data.http_client import HostPolicy, HttpClient
+from data.transport import ReplayTransport
+
+URL = 'https://news.example.com/article/1'
+
+
+class RecordingReplay(ReplayTransport):
+    """ReplayTransport that keeps the headers of every request it answers"""
+
+    def __init__(self, **kwargs):
+        super().__init__(latency=0, **kwargs)
+        self.requests = []
+
+    def respond(self, request):
+        self.requests.append(dict(request.headers))
+        return super().respond(request)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HttpCache(path=str(tmp_path / 'http_cache.db'))
+
+
+def make_client(cache, transport):
+    return HttpClient(default_policy=HostPolicy(rate=0), host_policies={}, max_retries=0,
+                      cache=cache, transport=transport)
+
+
+def test_unchanged_page_is_revalidated_with_a_304(cache):
+    transport = RecordingReplay()
+    transport.add('GET', URL, headers={'ETag': '"v1"', 'Content-Type': 'text/html'}, body=b'<p>first</p>')
+    client = make_client(cache, transport)
+
+    first = client.get(URL)
+    assert (first.status_code, first.content, first.from_cache) == (200, b'<p>first</p>', False)
+    assert 'If-None-Match' not in transport.requests[0]
+
+    second = client.get(URL)
+    assert transport.requests[1]['If-None-Match'] == '"v1"'
+    assert transport.counters['not_modified'] == 1
+    assert (second.status_code, second.content, second.from_cache) == (200, b'<p>first</p>', True)
+    assert second.headers['Content-Type'] == 'text/html'
+    assert second.cache_url == first.cache_url == URL
+    assert cache.stats()['revalidations'] == 1
+
+
+def test_changed_page_replaces_the_entry(cache):
+    transport = RecordingReplay()
+    transport.add('GET', URL, headers={'ETag': '"v1"'}, body=b'old')
+    transport.add('GET', URL, headers={'ETag': '"v2"'}, body=b'new')
+    client = make_client(cache, transport)
+
+    client.get(URL)
+    cache.store_extracted(URL, 'old text')
+    response = client.get(URL)
+
+    assert (response.content, response.from_cache) == (b'new', False)
+    entry = cache.lookup(URL)
+    assert (entry.body, entry.etag, entry.extracted) == (b'new', '"v2"', None)
+
+
+def test_last_modified_is_sent_back(cache):
+    transport = RecordingReplay()
+    transport.add('GET', URL, headers={'Last-Modified': 'Mon, 02 Jun 2025 10:00:00 GMT'}, body=b'page')
+    client = make_client(cache, transport)
+
+    client.get(URL)
+    client.get(URL)
+    assert transport.requests[1]['If-Modified-Since'] == 'Mon, 02 Jun 2025 10:00:00 GMT'
+    assert 'If-None-Match' not in transport.requests[1]
+
+
+def test_fresh_entries_are_served_without_a_request(cache):
+    transport = RecordingReplay()
+    transport.add('GET', URL, headers={'ETag': '"v1"'}, body=b'page')
+    client = make_client(cache, transport)
+
+    client.get(URL, fresh_for=60)
+    response = client.get(URL, fresh_for=60)
+
+    assert response.from_cache and response.content == b'page'
+    assert len(transport.requests) == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_uncached_requests_bypass_the_cache(cache):
+    transport = RecordingReplay()
+    transport.add('GET', URL + '?apiKey=secret', body=b'private')
+    client = make_client(cache, transport)
+
+    client.get(URL, params={'apiKey': 'secret'}, cached=False)
+    assert cache.stats()['entries'] == 0
+
+
+def test_query_parameters_are_part_of_the_key(cache):
+    transport = RecordingReplay()
+    transport.add('GET', URL + '?page=1', headers={'ETag': '"p1"'}, body=b'one')
+    transport.add('GET', URL + '?page=2', headers={'ETag': '"p2"'}, body=b'two')
+    client = make_client(cache, transport)
+
+    client.get(URL, params={'page': 1})
+    client.get(URL, params={'page': 2})
+    assert client.get(URL, params={'page': 1}).content == b'one'
+    assert cache.lookup(URL + '?page=2').body == b'two'
+
+
+def test_error_responses_are_not_cached(cache):
+    transport = RecordingReplay()
+    transport.add('GET', URL, status=404, headers={'ETag': '"gone"'}, body=b'missing')
+    make_client(cache, transport).get(URL)
+    assert cache.lookup(URL) is None
+
+
+def test_entries_expire_after_max_age(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('data.http_cache.time.time', lambda: now[0])
+    cache.max_age = 60
+    cache.store(URL, 200, {'ETag': '"v1"'}, b'page')
+
+    now[0] += 30
+    cache.mark_validated(URL)
+    now[0] += 45
+    assert cache.lookup(URL) is not None
+    now[0] += 30
+    assert cache.lookup(URL) is None
+
+
+def test_least_recently_used_entries_are_evicted(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('data.http_cache.time.time', lambda: now[0])
+    cache.max_bytes = 10
+    for name in ('a', 'b', 'c'):
+        now[0] += 1
+        cache.store(f"{URL}/{name}", 200, {}, b'1234')
+        if name == 'b':
+            now[0] += 1
+            cache.lookup(f"{URL}/a")
+
+    assert [cache.lookup(f"{URL}/{name}") is not None for name in ('a', 'b', 'c')] == [True, False, True]
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] == 8
@@ -0,0 +1,155 @@
+"""
+HttpClient retries, Retry-After handling and per-host token buckets
+"""
+
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import requests
+
+from data.http_client import HostPolicy, HttpClient, TokenBucket, parse_host_policies
+from data.transport import ReplayTransport
+
+URL = 'https://news.example.com/feed'
+
+
+class FakeClock:
+    """Stands in for time.monotonic and time.sleep; sleeping advances the clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr('data.http_client.time.monotonic', clock.monotonic)
+    monkeypatch.setattr('data.http_client.time.sleep', clock.sleep)
+    return clock
+
+
+def make_client(transport, **kwargs):
+    options = dict(default_policy=HostPolicy(rate=0), host_policies={}, max_retries=3,
+                   backoff_base=0.5, backoff_max=10, transport=transport)
+    options.update(kwargs)
+    return HttpClient(**options)
+
+
+def replay(*statuses, headers=None):
+    transport = ReplayTransport(latency=0)
+    for status in statuses:
+        transport.add('GET', URL, status=status, headers=headers if status != 200 else None, body=b'ok')
+    return transport
+
+
+def test_transient_statuses_are_retried_with_jittered_backoff(clock):
+    client = make_client(replay(503, 502, 200))
+
+    response = client.get(URL)
+
+    assert response.status_code == 200 and response.content == b'ok'
+    assert len(clock.sleeps) == 2
+    assert 0 <= clock.sleeps[0] <= 0.5 and 0 <= clock.sleeps[1] <= 1.0
+    stats = client.stats()['news.example.com']
+    assert (stats['requests'], stats['retries'], stats['statuses']) == (3, 2, {'200': 1, '502': 1, '503': 1})
+
+
+def test_retry_after_seconds_are_honoured_and_capped(clock):
+    assert make_client(replay(429, 200, headers={'Retry-After': '7'})).get(URL).status_code == 200
+    assert clock.sleeps == [7.0]
+
+    clock.sleeps.clear()
+    make_client(replay(503, 200, headers={'Retry-After': '120'})).get(URL)
+    assert clock.sleeps == [10]
+
+
+def test_retry_after_http_dates(clock):
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=5), usegmt=True)
+    make_client(replay(503, 200, headers={'Retry-After': later})).get(URL)
+    assert 3 < clock.sleeps[0] <= 5
+
+    clock.sleeps.clear()
+    earlier = format_datetime(datetime.now(timezone.utc) - timedelta(hours=1), usegmt=True)
+    make_client(replay(503, 200, headers={'Retry-After': earlier})).get(URL)
+    assert clock.sleeps == []
+
+
+def test_unparseable_retry_after_falls_back_to_backoff(clock):
+    make_client(replay(503, 200, headers={'Retry-After': 'soon'})).get(URL)
+    assert len(clock.sleeps) == 1 and 0 <= clock.sleeps[0] <= 0.5
+
+
+def test_last_retryable_response_is_returned(clock):
+    client = make_client(replay(503), max_retries=2)
+
+    assert client.get(URL).status_code == 503
+    stats = client.stats()['news.example.com']
+    assert (stats['requests'], stats['retries']) == (3, 2)
+
+
+def test_other_statuses_are_not_retried(clock):
+    client = make_client(replay(404, 200))
+    assert client.get(URL).status_code == 404
+    assert clock.sleeps == []
+
+
+def test_connection_errors_are_retried_then_raised(clock):
+    client = make_client(ReplayTransport(latency=0, connection_error_rate=1.0), max_retries=2)
+
+    with pytest.raises(requests.ConnectionError):
+        client.get(URL)
+    stats = client.stats()['news.example.com']
+    assert (stats['requests'], stats['errors'], stats['retries']) == (3, 3, 2)
+
+
+def test_token_bucket_allows_a_burst_then_the_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+
+    assert [bucket.reserve() for _ in range(5)] == [0.0, 0.0, 0.0, 0.5, 1.0]
+    clock.now += 1.5  # Repays the two borrowed tokens and earns one
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.5
+    clock.now += 60  # Refill stops at capacity
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.0, 0.5]
+
+
+def test_unlimited_bucket_never_waits(clock):
+    bucket = TokenBucket(rate=0, capacity=1)
+    assert all(bucket.acquire() == 0.0 for _ in range(100))
+
+
+def test_hosts_are_throttled_independently(clock):
+    transport = ReplayTransport(latency=0)
+    for url in ('https://a.example.com/', 'https://b.example.com/'):
+        transport.add('GET', url, body=b'ok')
+    client = make_client(transport, default_policy=HostPolicy(rate=1, burst=1),
+                         host_policies={'b.example.com': HostPolicy(rate=4, burst=2)})
+
+    for _ in range(3):
+        client.get('https://a.example.com/')
+    for _ in range(3):
+        client.get('https://b.example.com/')
+
+    stats = client.stats()
+    assert stats['a.example.com']['throttled_seconds'] == pytest.approx(2.0)
+    assert stats['b.example.com']['throttled_seconds'] == pytest.approx(0.25)
+
+
+def test_host_policies_are_parsed():
+    default = HostPolicy(rate=2, burst=1, pool_size=4)
+    policies = parse_host_policies(' NewsAPI.org=1 , api.twitter.com=0.5:3:8,,', default)
+
+    assert policies == {
+        'newsapi.org': HostPolicy(rate=1.0, burst=1, pool_size=4),
+        'api.twitter.com': HostPolicy(rate=0.5, burst=3, pool_size=8),
+    }
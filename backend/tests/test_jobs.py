@@ -0,0 +1,159 @@
+"""
+Background analysis jobs: cancellation and resuming from a checkpoint
+"""
+
+import threading
+import time
+
+import pytest
+
+from jobs.manager import FINISHED_STATUSES, JobManager
+from sentiment.analyzer import SentimentAnalyzer
+
+TEXTS = [
+    "Harga rumah di Kuala Lumpur terlalu mahal",
+    "PR1MA homes in Selangor are good value",
+    "The developer abandoned the project",
+    "Rent keeps rising in Penang",
+    "First home buyers got a stamp duty exemption",
+    "Mortgage approval took months",
+]
+
+
+class GatedAnalyzer:
+    """SentimentAnalyzer that blocks one chosen analyze_batch call until released"""
+
+    def __init__(self, analyzer, gate_call):
+        self.analyzer = analyzer
+        self.gate_call = gate_call
+        self.calls = 0
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def __getattr__(self, name):
+        return getattr(self.analyzer, name)
+
+    def analyze_batch(self, texts, **kwargs):
+        self.calls += 1
+        if self.calls == self.gate_call:
+            self.entered.set()
+            assert self.release.wait(30)
+        return self.analyzer.analyze_batch(texts, **kwargs)
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return SentimentAnalyzer(batch_workers=0)
+
+
+def wait_until_finished(manager, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in FINISHED_STATUSES:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish: {manager.get(job_id)}")
+
+
+def stored_texts(database):
+    _, max_id = database.get_sentiment_id_range()
+    return [row['text'] for row in database.get_sentiment_texts(0, max_id, 1000)]
+
+
+def test_cancel_stops_after_the_running_chunk(database, analyzer):
+    gated = GatedAnalyzer(analyzer, gate_call=1)
+    manager = JobManager(gated, database, workers=1, chunk_size=2)
+    try:
+        job = manager.submit('batch', {'texts': TEXTS})
+        assert gated.entered.wait(30)
+        assert manager.cancel(job['id'])['status'] == 'running'
+        gated.release.set()
+
+        job = wait_until_finished(manager, job['id'])
+    finally:
+        manager.stop()
+
+    assert job['status'] == 'cancelled'
+    assert (job['processed'], job['checkpoint']) == (2, 2)
+    assert stored_texts(database) == TEXTS[:2]
+
+
+def test_queued_job_is_cancelled_without_running(database, analyzer):
+    manager = JobManager(analyzer, database, workers=1, chunk_size=2)
+    database.create_analysis_job('queued-job', 'batch', {'texts': TEXTS, 'source': 'user_post', 'mode': None},
+                                 len(TEXTS))
+
+    job = manager.cancel('queued-job')
+    assert job['status'] == 'cancelled'
+    assert job['processed'] == 0
+    assert manager.cancel('missing') is None
+
+    # A cancelled job is not picked up again on start
+    manager.start()
+    manager.stop()
+    assert stored_texts(database) == []
+
+
+def test_interrupted_job_resumes_from_its_checkpoint(database, analyzer):
+    gated = GatedAnalyzer(analyzer, gate_call=2)
+    manager = JobManager(gated, database, workers=1, chunk_size=2)
+    job = manager.submit('batch', {'texts': TEXTS, 'source': 'survey'})
+    assert gated.entered.wait(30)
+
+    stopping = threading.Thread(target=manager.stop)
+    stopping.start()
+    while not manager._stopping.is_set():
+        time.sleep(0.01)
+    gated.release.set()
+    stopping.join(30)
+
+    # The chunk in flight is committed, then the job stops but stays active
+    interrupted = manager.get(job['id'])
+    assert interrupted['status'] == 'running'
+    assert (interrupted['processed'], interrupted['checkpoint']) == (4, 4)
+    assert stored_texts(database) == TEXTS[:4]
+
+    notifications = []
+    resumed = JobManager(analyzer, database, workers=1, chunk_size=2,
+                         on_results_stored=lambda job_type, finished: notifications.append((job_type, finished)))
+    resumed.start()
+    try:
+        job = wait_until_finished(resumed, job['id'])
+    finally:
+        resumed.stop()
+
+    assert job['status'] == 'completed'
+    assert (job['processed'], job['errors'], job['progress']) == (6, 0, 1.0)
+    assert stored_texts(database) == TEXTS
+    assert notifications == [('batch', False), ('batch', True)]
+
+
+def test_rescore_updates_rows_in_place(database, analyzer):
+    manager = JobManager(analyzer, database, workers=1, chunk_size=4)
+    notifications = []
+    manager.on_results_stored = lambda job_type, finished: notifications.append((job_type, finished))
+    try:
+        batch = wait_until_finished(manager, manager.submit('batch', {'texts': TEXTS})['id'])
+        rescore = wait_until_finished(manager, manager.submit('rescore', {'mode': 'cascade'})['id'])
+    finally:
+        manager.stop()
+
+    assert batch['status'] == rescore['status'] == 'completed'
+    assert rescore['total'] == rescore['processed'] == len(TEXTS)
+    assert database.get_sentiment_id_range()[0] == len(TEXTS)
+    assert notifications[-1] == ('rescore', True)
+    assert ('rescore', False) not in notifications
+
+
+def test_invalid_jobs_are_rejected(database, analyzer):
+    manager = JobManager(analyzer, database, corpus_dir='dataset')
+    with pytest.raises(ValueError):
+        manager.submit('unknown', {})
+    with pytest.raises(ValueError):
+        manager.submit('batch', {'texts': []})
+    with pytest.raises(ValueError):
+        manager.submit('batch', {'texts': TEXTS, 'mode': 'fast'})
+    with pytest.raises(ValueError, match='inside the dataset directory'):
+        manager.submit('corpus', {'path': '../app.py'})
+    assert manager.list_jobs() == []
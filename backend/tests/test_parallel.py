@@ -0,0 +1,78 @@
+"""
+Process-pool batch scoring must agree with in-process scoring
+
+Run from the backend directory: python -m pytest tests
+"""
+
+import threading
+
+import pytest
+
+from sentiment.analyzer import SentimentAnalyzer
+
+TEXTS = [
+    "Harga rumah di Kuala Lumpur terlalu mahal untuk anak muda",
+    "PR1MA launched affordable homes and buyers are happy with the quality",
+    "The new housing scheme is a scam, the developer abandoned the project",
+    "Rent keeps rising while wages stay flat, this is terrible",
+    "Great news: the government extended the first home buyer stamp duty exemption",
+    "Mortgage approval took months but we finally got the keys",
+]
+
+
+@pytest.fixture
+def analyzer():
+    analyzer = SentimentAnalyzer(batch_workers=2, batch_chunk_size=2)
+    yield analyzer
+    if analyzer._batch_runner is not None:
+        analyzer._batch_runner.shutdown()
+
+
+def scores(results):
+    return [(result['sentiment_label'], result['scores']) for result in results]
+
+
+def test_pool_scores_follow_reweighting(analyzer):
+    items = [{'id': index, 'text': text} for index, text in enumerate(TEXTS)]
+    before = analyzer.analyze_batch(items)
+    assert scores(before) == scores(analyzer.analyze_batch(items, workers=0))
+
+    analyzer.set_combine_weights({'vader': 0.1, 'textblob': 0.1, 'housing': 0.8})
+    pooled = analyzer.analyze_batch(items)
+    serial = analyzer.analyze_batch(items, workers=0)
+
+    assert scores(pooled) == scores(serial)
+    assert scores(pooled) != scores(before)
+    assert analyzer._batch_runner.version == analyzer.lexicon_version()
+
+
+def test_replaced_pool_outlives_running_batches(analyzer):
+    items = [{'id': index, 'text': text} for index, text in enumerate(TEXTS)]
+    with analyzer._use_batch_runner(2) as held:
+        held.run(items, 2)
+        # Another request reweights and runs a batch while this one holds the old pool
+        analyzer.set_combine_weights({'vader': 0.1, 'textblob': 0.1, 'housing': 0.8})
+        replaced = analyzer.analyze_batch(items)
+        assert analyzer._batch_runner is not held
+        assert held._executor is not None
+        assert len(held.run(items, 2)) == len(items)
+    assert held._executor is None
+    assert scores(replaced) == scores(analyzer.analyze_batch(items, workers=0))
+
+
+def test_concurrent_batches_share_one_pool(analyzer):
+    items = [{'id': index, 'text': text} for index, text in enumerate(TEXTS * 4)]
+    serial = analyzer.analyze_batch(items, workers=0)
+    results = {}
+
+    def run(name):
+        results[name] = analyzer.analyze_batch(items)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [scores(result) for result in results.values()] == [scores(serial)] * len(threads)
+    assert analyzer._batch_runner_users == {}
@@ -0,0 +1,68 @@
+"""
+PhraseMatcher word-boundary matching
+"""
+
+import pytest
+
+from sentiment.phrase_matcher import PhraseMatch, PhraseMatcher
+from sentiment.resources import word_tokenize
+
+
+@pytest.fixture
+def matcher():
+    return PhraseMatcher({
+        'kl': 'region',
+        'kuala lumpur': 'region',
+        'ppr': 'programme',
+        'rumah mampu milik': 'programme',
+        'mampu milik': 'keyword',
+        'rent': 'keyword',
+    })
+
+
+def test_short_phrases_only_match_whole_words(matcher):
+    assert matcher.find_all('Klang and PPRT projects, current rentals') == []
+    assert matcher.phrases('New PPR flats in KL, rent from RM124') == ['ppr', 'kl', 'rent']
+
+
+def test_punctuation_separates_words(matcher):
+    assert matcher.phrases('(KL)-based PPR/rent-to-own') == ['kl', 'ppr', 'rent']
+
+
+def test_multi_word_phrases_need_consecutive_words(matcher):
+    assert matcher.find_all('Kuala the Lumpur') == []
+    assert matcher.find_all('Moving to Kuala Lumpur') == [PhraseMatch('kuala lumpur', 'region', 2, 4)]
+
+
+def test_overlapping_phrases_are_all_found(matcher):
+    matches = matcher.find_all('skim rumah mampu milik baharu')
+    assert {(match.phrase, match.start, match.end) for match in matches} == {
+        ('rumah mampu milik', 1, 4),
+        ('mampu milik', 2, 4),
+    }
+    assert matcher.labels('skim rumah mampu milik baharu') == {'programme', 'keyword'}
+    assert matcher.first('skim rumah mampu milik baharu').phrase == 'rumah mampu milik'
+
+
+def test_failure_links_recover_partial_matches():
+    matcher = PhraseMatcher(['a b c', 'b c d'])
+    assert [match.phrase for match in matcher.find_all('a b c d')] == ['a b c', 'b c d']
+    assert [match.phrase for match in matcher.find_all('a b b c d')] == ['b c d']
+
+
+def test_pairs_and_plain_phrases_are_accepted():
+    assert PhraseMatcher([('kl', 'region')]).labels('KL') == {'region'}
+    assert PhraseMatcher(['kl']).labels('KL') == {'kl'}
+    assert PhraseMatcher(['', '!!']).size == 2
+    assert PhraseMatcher(['', '!!']).find_all('anything') == []
+
+
+@pytest.mark.parametrize('text', [
+    "Harga rumah di K.L. naik 5% tahun ini!",
+    "PR1MA's new-launch units (Kuala Lumpur) sold out",
+    "Rent-to-own: RM1,200/month in Selangor",
+])
+def test_words_from_tokens_match_tokenize(matcher, text):
+    words = PhraseMatcher.words_from_tokens(word_tokenize(text))
+    assert words == PhraseMatcher.tokenize(text)
+    assert matcher.find_all(tokens=words) == matcher.find_all(text)
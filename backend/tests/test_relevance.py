@@ -0,0 +1,68 @@
+"""
+Relevance ordering: bounded top_k selection against a full sort
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from data.processors import DataProcessor
+
+NOW = datetime(2025, 6, 1, 12, 0)
+
+
+def make_items(count, seed=7):
+    rng = random.Random(seed)
+    items = []
+    for index in range(count):
+        published = NOW - timedelta(days=rng.randint(0, 40), hours=rng.randint(0, 23))
+        if index % 3 == 0:
+            published = published.replace(tzinfo=timezone(timedelta(hours=8)))
+        items.append({
+            'id': index,
+            # Few distinct values, so many items tie
+            'housing_keywords': ['rumah'] * rng.randint(0, 3),
+            'published_date': published.isoformat() if index % 5 else None,
+            'engagement': {'likes': rng.choice([0, 10]), 'shares': rng.choice([0, 5])},
+        })
+    return items
+
+
+def ids(items):
+    return [item['id'] for item in items]
+
+
+@pytest.mark.parametrize('top_k', [0, 1, 5, 50, 199, 200, 500])
+def test_top_k_matches_a_full_sort(top_k):
+    processor = DataProcessor()
+    full = processor.sort_by_relevance(make_items(200), now=NOW)
+    assert ids(processor.sort_by_relevance(make_items(200), top_k=top_k, now=NOW)) == ids(full[:top_k])
+    assert ids(processor.top_by_relevance(iter(make_items(200)), top_k)) == \
+        ids(processor.sort_by_relevance(make_items(200), top_k=top_k))
+
+
+def test_full_sort_is_stable_and_descending():
+    ranked = DataProcessor().sort_by_relevance(make_items(200), now=NOW)
+    scores = [item['relevance_score'] for item in ranked]
+
+    assert scores == sorted(scores, reverse=True)
+    for first, second in zip(ranked, ranked[1:]):
+        if first['relevance_score'] == second['relevance_score']:
+            assert first['id'] < second['id']
+
+
+def test_relevance_scores_match_calculate_relevance():
+    processor = DataProcessor()
+    for item in processor.sort_by_relevance(make_items(50), now=NOW):
+        assert item['relevance_score'] == processor.calculate_relevance(item, now=NOW)
+
+
+def test_naive_and_aware_dates_score_alike():
+    processor = DataProcessor()
+    naive = {'published_date': (NOW - timedelta(days=10)).isoformat()}
+    aware = {'published_date': (NOW - timedelta(days=10)).astimezone(timezone.utc).isoformat()}
+    invalid = {'published_date': 'yesterday'}
+
+    assert processor.calculate_relevance(naive, now=NOW) == processor.calculate_relevance(aware, now=NOW) == 20
+    assert processor.calculate_relevance(invalid, now=NOW) == 0
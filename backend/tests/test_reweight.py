@@ -0,0 +1,111 @@
+"""
+SQL re-weighting of stored results against SentimentAnalyzer's Python blend
+"""
+
+import pytest
+
+from sentiment.analyzer import SentimentAnalyzer
+
+TEXTS = [
+    "Harga rumah di Kuala Lumpur terlalu mahal untuk anak muda",
+    "PR1MA launched affordable homes and buyers are very happy",
+    "The housing scheme is a scam, the developer abandoned the project",
+    "The weather was fine",
+    "Rent keeps rising while wages stay flat",
+    "The new township has a school and a clinic",
+    "Great news: stamp duty exemption extended for first home buyers",
+    "Mortgage approval took months but we finally got the keys",
+]
+
+
+def stored_rows(database):
+    with database.get_connection() as conn:
+        rows = conn.execute('''
+            SELECT text, compound_score, positive_score, negative_score, neutral_score,
+                   sentiment_label, confidence
+            FROM sentiment_results ORDER BY id
+        ''').fetchall()
+    return [dict(row) for row in rows]
+
+
+def python_blend(analyzer, result):
+    scores = result['scores']
+    combined = analyzer._combine_scores(scores['vader'], scores['textblob'], scores['housing_context'])
+    label, confidence = analyzer._determine_sentiment(combined)
+    return {
+        'compound_score': combined['compound'],
+        'positive_score': combined['positive'],
+        'negative_score': combined['negative'],
+        'neutral_score': combined['neutral'],
+        'sentiment_label': label,
+        'confidence': confidence,
+    }
+
+
+@pytest.mark.parametrize('weights', [
+    {'vader': 0.2, 'textblob': 0.2, 'housing': 0.6},
+    {'vader': 1.0, 'textblob': 0.0, 'housing': 0.0},
+    {'vader': 0.0, 'textblob': 1.0, 'housing': 0.5},
+    {'vader': 3.0, 'textblob': 1.0, 'housing': 1.0},
+])
+def test_sql_reweight_matches_the_python_blend(database, weights):
+    analyzer = SentimentAnalyzer(batch_workers=0)
+    results = analyzer.analyze_batch([{'id': index, 'text': text} for index, text in enumerate(TEXTS)],
+                                     mode='cascade')
+    # Both branches of the rescaling: rows with and without TextBlob scores
+    assert len({'textblob' in result['scorers_run'] for result in results}) == 2
+    database.store_sentiment_results(results)
+
+    analyzer.set_combine_weights(weights)
+    assert database.reweight_sentiment_results(analyzer.combine_weights, analyzer.sentiment_thresholds) == len(TEXTS)
+
+    for row, result in zip(stored_rows(database), results):
+        expected = python_blend(analyzer, result)
+        assert row.pop('text') == result['text']
+        assert row.pop('sentiment_label') == expected.pop('sentiment_label'), result['text']
+        assert row == pytest.approx(expected, abs=1e-9)
+
+
+def test_rows_without_component_scores_are_left_alone(database):
+    analyzer = SentimentAnalyzer(batch_workers=0)
+    result = analyzer.analyze(TEXTS[1])
+    legacy = dict(result, scores={key: value for key, value in result['scores'].items()
+                                  if key in ('compound', 'positive', 'negative', 'neutral')})
+    database.store_sentiment_result(legacy)
+    before = stored_rows(database)
+
+    assert database.reweight_sentiment_results({'vader': 0.0, 'textblob': 0.0, 'housing': 1.0},
+                                               analyzer.sentiment_thresholds) == 0
+    assert stored_rows(database) == before
+
+
+@pytest.mark.parametrize('weights', [
+    {'vader': 1.0, 'textblob': 1.0},
+    {'vader': 1.0, 'textblob': 1.0, 'housing': float('nan')},
+])
+def test_invalid_weights_are_rejected(database, weights):
+    with pytest.raises(ValueError):
+        database.reweight_sentiment_results(weights, {'positive': 0.05, 'negative': -0.05})
+
+
+def test_combine_weights_setting_round_trips(database):
+    assert database.get_setting('sentiment_combine_weights') is None
+
+    database.save_setting('sentiment_combine_weights', {'vader': 0.5, 'textblob': 0.2, 'housing': 0.3})
+    database.save_setting('sentiment_combine_weights', {'vader': 0.2, 'textblob': 0.2, 'housing': 0.6})
+    assert database.get_setting('sentiment_combine_weights') == {'vader': 0.2, 'textblob': 0.2, 'housing': 0.6}
+
+
+@pytest.mark.parametrize('value, message', [
+    ('vader=0.5,textblob', 'expected scorer=weight'),
+    ('vader=half', 'weight of vader is not a number'),
+])
+def test_malformed_combine_weights_are_reported(value, message):
+    with pytest.raises(ValueError, match=message):
+        SentimentAnalyzer.parse_combine_weights(value)
+
+
+def test_malformed_environment_weights_fall_back_to_defaults(monkeypatch):
+    default = SentimentAnalyzer(batch_workers=0).combine_weights
+    monkeypatch.setenv('SENTIMENT_COMBINE_WEIGHTS', 'vader=lots')
+    assert SentimentAnalyzer(batch_workers=0).combine_weights == default
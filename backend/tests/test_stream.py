@@ -0,0 +1,81 @@
+"""
+NDJSON framing of /api/sentiment/stream
+"""
+
+import io
+import json
+
+import pytest
+
+
+def post_stream(server, body, **params):
+    response = server.app.test_client().post(
+        '/api/sentiment/stream', query_string=params, data=body, content_type='application/x-ndjson'
+    )
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.get_data(as_text=True).endswith('\n')
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def parse(server, body, max_line_bytes=64):
+    return list(server._iter_ndjson_items(io.BytesIO(body), max_line_bytes))
+
+
+def test_lines_are_parsed_with_their_numbers(server):
+    body = b'{"text": "a"}\r\n\n   \n{"text": "b", "id": 7}\n[1, 2]\n{"text": \n{"text": "c"}'
+    items = parse(server, body)
+
+    assert [(number, item) for number, item, error in items if error is None] == [
+        (1, {'text': 'a'}), (4, {'text': 'b', 'id': 7}), (7, {'text': 'c'})
+    ]
+    errors = {number: error for number, _, error in items if error is not None}
+    assert errors[5] == 'Each line must be a JSON object'
+    assert errors[6].startswith('Invalid JSON')
+
+
+def test_oversized_lines_are_skipped_whole(server):
+    body = b'{"text": "' + b'x' * 200 + b'"}\n{"text": "after"}\n' + b'y' * 65 + b'\n'
+    items = parse(server, body)
+
+    assert items[0] == (1, None, 'Line exceeds 64 bytes')
+    assert items[1] == (2, {'text': 'after'}, None)
+    assert items[2] == (3, None, 'Line exceeds 64 bytes')
+    assert len(items) == 3
+
+
+def test_line_at_the_limit_is_accepted(server):
+    line = json.dumps({'text': 'z' * 50}).encode('utf-8')
+    line = line[:-2] + b'z' * (63 - len(line)) + line[-2:]
+    assert len(line) == 63
+    assert parse(server, line + b'\n') == [(1, json.loads(line), None)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 100])
+def test_results_keep_input_order_with_a_summary(server, chunk_size):
+    lines = [
+        json.dumps({'text': 'Affordable housing in Selangor is great', 'id': 'first'}),
+        'not json',
+        json.dumps({'text': 'Rent in Kuala Lumpur is too expensive'}),
+        json.dumps({'text': ''}),
+        json.dumps(['text']),
+        json.dumps({'text': 'PR1MA homes were delivered late', 'metadata': {'platform': 'forum'}}),
+    ]
+    output = post_stream(server, '\n'.join(lines) + '\n', chunk_size=chunk_size)
+
+    results, summary = output[:-1], output[-1]
+    assert [result['id'] for result in results] == ['first', 'line_2', 'line_3', 'line_4', 'line_5', 'line_6']
+    assert ['error' in result for result in results] == [False, True, False, True, True, False]
+    assert results[1]['error'].startswith('Invalid JSON')
+    assert results[4]['error'] == 'Each line must be a JSON object'
+    assert results[5]['metadata']['platform'] == 'forum'
+    assert summary == {'summary': {'count': 6, 'stored': 3, 'errors': 3}}
+
+
+def test_empty_body_returns_only_a_summary(server):
+    assert post_stream(server, b'') == [{'summary': {'count': 0, 'stored': 0, 'errors': 0}}]
+
+
+def test_invalid_mode_is_rejected(server):
+    response = server.app.test_client().post('/api/sentiment/stream?mode=fast', data=b'{"text": "a"}\n')
+    assert response.status_code == 400
@@ -0,0 +1,137 @@
+"""
+Record/replay transports: recorded fixtures and deterministic failure injection
+"""
+
+import json
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+import requests
+
+from data.http_client import HostPolicy, HttpClient
+from data.transport import RecordTransport, ReplayTransport, redact_url
+
+URLS = [f"https://news.example.com/article/{index}" for index in range(200)]
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path, _, query = self.path.partition('?')
+        body = json.dumps({'path': path, 'page': parse_qs(query).get('page')}).encode('utf-8')
+        self.send_response(200 if not self.path.startswith('/missing') else 404)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', f'"{len(self.path)}"')
+        self.send_header('Set-Cookie', 'session=secret')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def live_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(transport, max_retries=0):
+    return HttpClient(default_policy=HostPolicy(rate=0), host_policies={}, max_retries=max_retries,
+                      backoff_base=0, transport=transport)
+
+
+def replay_all(transport, urls, attempts=3):
+    outcomes = {}
+    adapter = transport.adapter(4)
+    for url in urls:
+        for attempt in range(attempts):
+            request = requests.Request('GET', url).prepare()
+            try:
+                outcomes[(url, attempt)] = adapter.send(request).status_code
+            except requests.ConnectionError:
+                outcomes[(url, attempt)] = 'connection error'
+    return outcomes
+
+
+def faulty_transport(seed=0):
+    transport = ReplayTransport(latency=0, error_rate=0.2, connection_error_rate=0.1, seed=seed)
+    for url in URLS:
+        transport.add('GET', url, body=b'ok')
+    return transport
+
+
+def test_injected_failures_do_not_depend_on_scheduling():
+    expected = replay_all(faulty_transport(), URLS)
+    shuffled = URLS[:]
+    random.Random(1).shuffle(shuffled)
+
+    transport = faulty_transport()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        parts = list(pool.map(lambda url: replay_all(transport, [url]), shuffled))
+    concurrent = {key: outcome for part in parts for key, outcome in part.items()}
+
+    assert concurrent == expected
+    outcomes = list(expected.values())
+    assert 0.1 < outcomes.count(503) / len(outcomes) < 0.3
+    assert 0.03 < outcomes.count('connection error') / len(outcomes) < 0.2
+
+
+def test_seed_changes_the_injected_failures():
+    assert replay_all(faulty_transport(seed=1), URLS) != replay_all(faulty_transport(seed=2), URLS)
+
+
+def test_retries_recover_from_injected_failures():
+    transport = faulty_transport()
+    client = make_client(transport, max_retries=5)
+
+    assert all(client.get(url).content == b'ok' for url in URLS[:50])
+    assert transport.counters['errors'] + transport.counters['connection_errors'] > 0
+
+
+def test_recorded_exchanges_replay_offline(live_server, tmp_path):
+    path = str(tmp_path / 'fixtures' / 'http.jsonl')
+    urls = [f"{live_server}/feed?page=1", f"{live_server}/feed?page=2", f"{live_server}/missing"]
+    recorder = RecordTransport(path)
+    recording = make_client(recorder)
+    live = [recording.get(url, headers={'Authorization': 'Bearer token'}) for url in urls]
+    live.append(recording.get(f"{live_server}/feed", params={'apiKey': 'secret', 'q': 'rumah'}))
+
+    with open(path, encoding='utf-8') as f:
+        fixture = f.read()
+    assert recorder.stats()['recorded'] == 4
+    assert 'secret' not in fixture and 'token' not in fixture
+    assert 'apiKey=REDACTED' in fixture
+
+    replayer = ReplayTransport(path, latency=0)
+    replaying = make_client(replayer)
+    replayed = [replaying.get(url) for url in urls]
+    replayed.append(replaying.get(f"{live_server}/feed", params={'apiKey': 'other', 'q': 'rumah'}))
+
+    assert [(r.status_code, r.content, r.headers.get('ETag')) for r in replayed] == \
+        [(r.status_code, r.content, r.headers.get('ETag')) for r in live]
+    assert replayed[0].headers['Content-Type'] == 'application/json'
+    assert replaying.get(f"{live_server}/never-recorded").status_code == 404
+    assert replayer.stats()['missing'] == 1
+
+
+def test_repeated_recordings_replay_in_order():
+    transport = ReplayTransport(latency=0)
+    transport.add('GET', URLS[0], body=b'first')
+    transport.add('GET', URLS[0], body=b'second')
+    client = make_client(transport)
+
+    assert [client.get(URLS[0]).content for _ in range(3)] == [b'first', b'second', b'second']
+
+
+def test_secret_parameters_are_redacted():
+    assert redact_url('https://newsapi.org/v2/everything?q=rumah&apiKey=abc&Token=x') == \
+        'https://newsapi.org/v2/everything?q=rumah&apiKey=REDACTED&Token=REDACTED'
+    assert redact_url('https://example.com/feed') == 'https://example.com/feed'